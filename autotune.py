@@ -0,0 +1,123 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from config import GridConfig
+from cost_model import TransferCostModel
+from stride_idx_vec_fns import read_tiles_granular_with_direction_based_on_num_workers_arrays
+
+
+@dataclass
+class TuningResult:
+    tile_granularity: int
+    num_workers: int
+    step_cost: float  # mean cost of a granularity step
+    total_cost: float  # predicted cost of all ring iterations of one batch
+    candidates: list[tuple[int, int, float]] = field(default_factory=list)
+
+
+def workers_on_link(worker_id: int, num_workers: int, num_links: int) -> int:
+    """Number of workers sharing worker_id's link under round-robin assignment."""
+    link = worker_id % num_links
+    return len(range(link, num_workers, num_links))
+
+
+def chunk_piece_cost(
+    cfg: GridConfig,
+    chunk_idx: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    num_workers: int,
+    cost_model: TransferCostModel,
+    num_links: int = 1
+) -> tuple[float, int, int]:
+    """
+    Predicted cost of one chunk piece for both directions and all workers.
+    Each direction has num_links links and workers are assigned to them
+    round-robin. As in cost_model.estimate_op_cost, the workers on a link run
+    concurrently and share its bandwidth, and the piece takes as long as the
+    slowest worker.
+    Returns (cost, granularity steps, tiles), steps and tiles summed over workers.
+    """
+    direction_costs = []
+    num_steps = 0
+    num_tiles = 0
+    for direction in [0, 1]:
+        worker_costs = []
+        for worker_id in range(num_workers):
+            _, _, step_offsets = read_tiles_granular_with_direction_based_on_num_workers_arrays(
+                worker_id=worker_id,
+                start_tile_row_in_mm_M_block=0,
+                start_chunk_col_in_tiles=0,
+                start_mm_core_idx=0,
+                last_mm_core_idx=last_mm_core_idx,
+                tile_granularity=tile_granularity,
+                chunk_idx=chunk_idx,
+                direction=direction,
+                num_workers=num_workers,
+                mm_block_unit_ht=cfg.mm_block_unit_ht,
+                chunk_width_in_tiles=cfg.chunk_width_in_tiles,
+                N_block_wt=cfg.N_block_wt,
+                N_block_idx=0,
+                M_block_idx=0,
+                tiles_ht_per_core=cfg.tiles_ht_per_core,
+                slice_Wt=cfg.slice_Wt,
+                slice_actual_idx=0,
+                global_Wt=cfg.global_Wt,
+            )
+            tiles_per_step = np.diff(step_offsets)
+            worker_costs.append(cost_model.step_times(
+                tiles_per_step, workers_on_link(worker_id, num_workers, num_links)
+            ).sum())
+            num_steps += len(tiles_per_step)
+            num_tiles += int(tiles_per_step.sum())
+        direction_costs.append(max(worker_costs))
+    return max(direction_costs), num_steps, num_tiles
+
+
+def autotune_granularity_and_workers(
+    cfg: GridConfig,
+    ring_size: int,
+    cost_model: TransferCostModel,
+    last_mm_core_idx: int = 0,
+    tile_granularities: list[int] = (1, 2, 4, 8, 16, 32, 64),
+    worker_counts: list[int] = (1, 2, 3, 4, 6, 8),
+    num_links: int = 1,
+) -> TuningResult:
+    """
+    Sweep tile_granularity and num_workers and return the cheapest setting.
+    The total cost covers every chunk, chunk piece, M block and ring iteration
+    of one batch; chunk pieces only differ by chunk_idx (tail chunks), so each
+    chunk is costed once.
+    """
+    if ring_size <= 0:
+        raise ValueError("ring_size must be greater than 0")
+    if num_links <= 0:
+        raise ValueError("num_links must be greater than 0")
+
+    chunks_per_mm_N_block = -(-cfg.N_block_wt // cfg.chunk_width_in_tiles)
+    pieces_per_chunk = cfg.mm_N_blocks_per_slice * cfg.mm_M_unit_blocks_per_core * ring_size
+
+    best = None
+    candidates = []
+    for tile_granularity in tile_granularities:
+        for num_workers in worker_counts:
+            total_cost = 0.0
+            total_steps = 0
+            total_tiles = 0
+            for chunk_idx in range(chunks_per_mm_N_block):
+                cost, num_steps, num_tiles = chunk_piece_cost(
+                    cfg, chunk_idx, last_mm_core_idx, tile_granularity, num_workers,
+                    cost_model, num_links
+                )
+                total_cost += cost * pieces_per_chunk
+                total_steps += num_steps
+                total_tiles += num_tiles
+            candidates.append((tile_granularity, num_workers, total_cost))
+            if best is None or total_cost < best.total_cost:
+                step_cost = float(cost_model.step_times(
+                    total_tiles / max(total_steps, 1), workers_on_link(0, num_workers, num_links)
+                ))
+                best = TuningResult(tile_granularity, num_workers, step_cost, total_cost)
+    best.candidates = candidates
+    return best
@@ -0,0 +1,233 @@
+import itertools
+from dataclasses import dataclass
+
+from loop_simulation import iter_iteration_params
+from stride_fns import how_many_tiles_to_read_formula
+from stride_idx_fns import (
+    get_effective_chunk_width_in_tiles,
+    read_tiles_granular_with_direction_based_on_num_workers,
+)
+
+
+def balanced_effective_id(worker_id: int, direction: int, num_workers: int, tile_offset: int) -> int:
+    """
+    Position in the 2 * num_workers round-robin a stream reads from when the
+    first tile of the chunk piece is the tile_offset-th tile dealt overall.
+    """
+    return (worker_id + direction * num_workers - tile_offset) % (2 * num_workers)
+
+
+def chunk_piece_num_tiles(
+    start_tile_row_in_mm_M_block: int,
+    start_chunk_col_in_tiles: int,
+    start_mm_core_idx: int,
+    last_mm_core_idx: int,
+    chunk_idx: int,
+    mm_block_unit_ht: int,
+    chunk_width_in_tiles: int,
+    N_block_wt: int,
+) -> int:
+    """Tiles of a chunk piece from the start position to the end of the last core."""
+    effective_chunk_width_in_tiles = get_effective_chunk_width_in_tiles(
+        chunk_idx, chunk_width_in_tiles, N_block_wt
+    )
+    return how_many_tiles_to_read_formula(
+        start_tile_row_in_mm_M_block, start_chunk_col_in_tiles, start_mm_core_idx,
+        1, last_mm_core_idx,
+        mm_block_unit_ht * effective_chunk_width_in_tiles, effective_chunk_width_in_tiles
+    )
+
+
+def read_tiles_granular_with_direction_based_on_num_workers_balanced(
+    worker_id: int,
+    start_tile_row_in_mm_M_block: int,
+    start_chunk_col_in_tiles: int,
+    start_mm_core_idx: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    chunk_idx: int,
+    direction: int,
+    num_workers: int,
+    tile_offset: int,
+    # Config parameters
+    mm_block_unit_ht: int,
+    chunk_width_in_tiles: int,
+    N_block_wt: int,
+    N_block_idx: int,
+    M_block_idx: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    slice_actual_idx: int,
+    global_Wt: int,
+) -> tuple[list[list[int]], list[list[int]]]:
+    """
+    read_tiles_granular_with_direction_based_on_num_workers with the round-robin
+    rotated by tile_offset, the number of tiles dealt to all streams before
+    this chunk piece. Passing the running total keeps every stream within one
+    tile of every other over any sequence of chunk pieces; tile_offset=0 is the
+    current assignment.
+    """
+    if num_workers <= 0:
+        raise ValueError("num_workers must be greater than 0")
+    if direction not in [0, 1]:
+        raise ValueError("direction must be 0 or 1")
+    effective_id = balanced_effective_id(worker_id, direction, num_workers, tile_offset)
+    return read_tiles_granular_with_direction_based_on_num_workers(
+        worker_id=effective_id % num_workers,
+        start_tile_row_in_mm_M_block=start_tile_row_in_mm_M_block,
+        start_chunk_col_in_tiles=start_chunk_col_in_tiles,
+        start_mm_core_idx=start_mm_core_idx,
+        last_mm_core_idx=last_mm_core_idx,
+        tile_granularity=tile_granularity,
+        chunk_idx=chunk_idx,
+        direction=effective_id // num_workers,
+        num_workers=num_workers,
+        mm_block_unit_ht=mm_block_unit_ht,
+        chunk_width_in_tiles=chunk_width_in_tiles,
+        N_block_wt=N_block_wt,
+        N_block_idx=N_block_idx,
+        M_block_idx=M_block_idx,
+        tiles_ht_per_core=tiles_ht_per_core,
+        slice_Wt=slice_Wt,
+        slice_actual_idx=slice_actual_idx,
+        global_Wt=global_Wt,
+    )
+
+
+def iter_balanced_iteration_history(
+    batch_size: int,
+    M_blocks_per_core: int,
+    chunks_per_mm_N_block: int,
+    my_chip_id: int,
+    direction: int,
+    ring_size: int,
+    mm_N_blocks_per_slice: int,
+    worker_id: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    num_workers: int,
+    mm_block_unit_ht: int,
+    chunk_width: int,
+    N_block_wt: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+):
+    """
+    iter_iteration_history in the balanced assignment mode: the round-robin
+    continues across chunk pieces instead of restarting at effective id 0.
+    The two directions reach a slice at different ring iterations, so the
+    tile offset of a chunk piece is not the running total in visiting order
+    but its position in a canonical order, (b, m_block_iter, chunk_idx,
+    actual slice, chunk_piece_idx), that every direction and worker derives
+    the same way. The streams of a chip then still read each tile exactly once.
+    """
+    chunk_base = 0
+    current_chunk = None
+    chunk_piece_tiles = 0
+    for iteration_id, _, read_kwargs in iter_iteration_params(
+        batch_size=batch_size,
+        M_blocks_per_core=M_blocks_per_core,
+        chunks_per_mm_N_block=chunks_per_mm_N_block,
+        my_chip_id=my_chip_id,
+        direction=direction,
+        ring_size=ring_size,
+        mm_N_blocks_per_slice=mm_N_blocks_per_slice,
+        worker_id=worker_id,
+        last_mm_core_idx=last_mm_core_idx,
+        tile_granularity=tile_granularity,
+        num_workers=num_workers,
+        mm_block_unit_ht=mm_block_unit_ht,
+        chunk_width=chunk_width,
+        N_block_wt=N_block_wt,
+        tiles_ht_per_core=tiles_ht_per_core,
+        slice_Wt=slice_Wt,
+    ):
+        # Every chunk piece of a chunk starts at the origin, so they all have
+        # the same number of tiles
+        if iteration_id[:3] != current_chunk:
+            chunk_base += ring_size * mm_N_blocks_per_slice * chunk_piece_tiles
+            current_chunk = iteration_id[:3]
+            chunk_piece_tiles = chunk_piece_num_tiles(
+                read_kwargs["start_tile_row_in_mm_M_block"], read_kwargs["start_chunk_col_in_tiles"],
+                read_kwargs["start_mm_core_idx"], last_mm_core_idx, read_kwargs["chunk_idx"],
+                mm_block_unit_ht, read_kwargs["chunk_width_in_tiles"], N_block_wt
+            )
+        piece_position = read_kwargs["slice_actual_idx"] * mm_N_blocks_per_slice + iteration_id[3]
+        slice_idxs, global_idxs = read_tiles_granular_with_direction_based_on_num_workers_balanced(
+            tile_offset=chunk_base + piece_position * chunk_piece_tiles, **read_kwargs
+        )
+        yield iteration_id, slice_idxs, global_idxs
+
+
+def get_balanced_iteration_history(*args, **kwargs) -> list:
+    """List form of iter_balanced_iteration_history."""
+    return list(iter_balanced_iteration_history(*args, **kwargs))
+
+
+@dataclass
+class ImbalanceReport:
+    """
+    Tiles per (direction, worker_id) stream over a whole schedule.
+    spread: max minus min tiles over streams
+    max_chunk_piece_spread: largest spread within a single chunk piece
+    """
+    stream_tiles: dict[tuple[int, int], int]
+    spread: int
+    max_chunk_piece_spread: int
+
+    @property
+    def slowest_stream(self) -> tuple[int, int]:
+        return max(self.stream_tiles, key=self.stream_tiles.get)
+
+
+def worker_imbalance_report(
+    batch_size: int,
+    M_blocks_per_core: int,
+    chunks_per_mm_N_block: int,
+    ring_size: int,
+    mm_N_blocks_per_slice: int,
+    last_mm_core_idx: int,
+    num_workers: int,
+    mm_block_unit_ht: int,
+    chunk_width: int,
+    N_block_wt: int,
+    balanced: bool = False,
+) -> ImbalanceReport:
+    """
+    Per-stream tile counts of one chip's schedule under the current (restart
+    per chunk piece) or the balanced assignment, from closed-form counts.
+    Chunk pieces are dealt in the canonical order of
+    iter_balanced_iteration_history; per-stream counts only depend on the set
+    of (tile_offset, chunk piece size) pairs, not on the visiting order.
+    """
+    if num_workers <= 0:
+        raise ValueError("num_workers must be greater than 0")
+    chunk_width_in_tiles = chunk_width * mm_block_unit_ht
+    num_streams = 2 * num_workers
+    streams = list(itertools.product([0, 1], range(num_workers)))
+    stream_tiles = dict.fromkeys(streams, 0)
+    max_chunk_piece_spread = 0
+    tile_offset = 0
+    pieces_per_chunk = ring_size * mm_N_blocks_per_slice
+    for _ in range(batch_size * M_blocks_per_core):
+        for chunk_idx in range(chunks_per_mm_N_block):
+            num_tiles = chunk_piece_num_tiles(
+                0, 0, 0, last_mm_core_idx, chunk_idx, mm_block_unit_ht, chunk_width_in_tiles, N_block_wt
+            )
+            for _ in range(pieces_per_chunk):
+                piece_tiles = []
+                for direction, worker_id in streams:
+                    effective_id = balanced_effective_id(
+                        worker_id, direction, num_workers, tile_offset if balanced else 0
+                    )
+                    # Same count as how_many_tiles_to_read_formula from effective_id
+                    tiles = (num_tiles - effective_id + num_streams - 1) // num_streams
+                    piece_tiles.append(max(tiles, 0))
+                    stream_tiles[(direction, worker_id)] += piece_tiles[-1]
+                max_chunk_piece_spread = max(max_chunk_piece_spread, max(piece_tiles) - min(piece_tiles))
+                tile_offset += num_tiles
+    return ImbalanceReport(
+        stream_tiles=stream_tiles,
+        spread=max(stream_tiles.values()) - min(stream_tiles.values()),
+        max_chunk_piece_spread=max_chunk_piece_spread,
+    )
@@ -0,0 +1,240 @@
+"""
+Benchmarks for the stride_fns advance variants and the stride_idx_fns generators.
+
+    python bench_stride_fns.py --save-baseline   # record bench_baselines.json
+    python bench_stride_fns.py --check           # exit 1 on regressions
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from config import GridConfig
+from loop_simulation import get_iteration_history
+from schedule_templates import get_iteration_history_from_templates
+from stride_fns import (
+    get_next_tile_coordinates,
+    get_next_tile_coordinates_2,
+    get_next_tile_coordinates_flat,
+    get_next_tile_coordinates_optimized,
+)
+from stride_idx_fns import read_tiles_granular_with_direction_based_on_num_workers
+from stride_idx_vec_fns import read_tiles_granular_with_direction_based_on_num_workers_vec
+
+
+# Shapes roughly following production matmul blockings
+BENCH_SHAPES = {
+    "small": GridConfig(
+        mm_block_unit_wt=2, mm_blocks_per_N_block=4, chunk_width_in_mm_units=2,
+        mm_block_unit_ht=2, mm_M_unit_blocks_per_core=4, mm_N_blocks_per_slice=2,
+        ring_size=2,
+    ),
+    "medium": GridConfig(
+        mm_block_unit_wt=4, mm_blocks_per_N_block=4, chunk_width_in_mm_units=3,
+        mm_block_unit_ht=4, mm_M_unit_blocks_per_core=4, mm_N_blocks_per_slice=4,
+        ring_size=8,
+    ),
+    "large": GridConfig(
+        mm_block_unit_wt=8, mm_blocks_per_N_block=8, chunk_width_in_mm_units=4,
+        mm_block_unit_ht=8, mm_M_unit_blocks_per_core=8, mm_N_blocks_per_slice=4,
+        ring_size=32,
+    ),
+}
+
+# Advance distributions: worker strides, within a chunk piece, across pieces
+ADVANCE_DISTRIBUTIONS = ("stride", "piece", "multi_piece")
+
+DEFAULT_BASELINE_PATH = "bench_baselines.json"
+
+
+def _sample_advance_args(cfg: GridConfig, distribution: str, count: int, seed: int) -> list:
+    """Sample (row, col, core, advance) states for the advance variants."""
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        if distribution == "stride":
+            advance_by_tiles = 2 * rng.randint(1, 4)
+        elif distribution == "piece":
+            advance_by_tiles = rng.randrange(cfg.chunk_piece_size)
+        else:
+            advance_by_tiles = rng.randrange(cfg.chunk_piece_size, 8 * cfg.chunk_piece_size)
+        samples.append((
+            rng.randrange(cfg.mm_block_unit_ht),
+            rng.randrange(cfg.chunk_width_in_tiles),
+            rng.randrange(4),
+            advance_by_tiles,
+        ))
+    return samples
+
+
+def _time_calls(fn, args_list: list, repeat: int) -> float:
+    """Best-of-repeat nanoseconds per call."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for args in args_list:
+            fn(*args)
+        best = min(best, (time.perf_counter_ns() - start) / len(args_list))
+    return best
+
+
+def bench_advance_variants(calls: int, repeat: int) -> dict[str, dict]:
+    """Time every stride_fns advance variant on every shape and advance distribution."""
+    results = {}
+    for shape_name, cfg in BENCH_SHAPES.items():
+        for distribution in ADVANCE_DISTRIBUTIONS:
+            samples = _sample_advance_args(cfg, distribution, calls, seed=0)
+            with_piece = [
+                (row, col, core, adv, cfg.chunk_piece_size, cfg.chunk_width_in_tiles,
+                 cfg.mm_block_unit_ht)
+                for row, col, core, adv in samples
+            ]
+            without_piece = [
+                (row, col, core, adv, cfg.chunk_width_in_tiles, cfg.mm_block_unit_ht)
+                for row, col, core, adv in samples
+            ]
+            for fn, args_list in (
+                (get_next_tile_coordinates, with_piece),
+                (get_next_tile_coordinates_optimized, with_piece),
+                (get_next_tile_coordinates_2, without_piece),
+                (get_next_tile_coordinates_flat, without_piece),
+            ):
+                ns_per_call = _time_calls(fn, args_list, repeat)
+                results[f"advance/{fn.__name__}/{shape_name}/{distribution}"] = {
+                    "ns_per_call": ns_per_call,
+                    "calls_per_s": 1e9 / ns_per_call,
+                }
+    return results
+
+
+def _generator_kwargs(cfg: GridConfig, num_workers: int) -> dict:
+    return dict(
+        worker_id=0,
+        start_tile_row_in_mm_M_block=0,
+        start_chunk_col_in_tiles=0,
+        start_mm_core_idx=0,
+        last_mm_core_idx=cfg.mm_M_unit_blocks_per_core - 1,
+        tile_granularity=8,
+        chunk_idx=0,
+        direction=0,
+        num_workers=num_workers,
+        mm_block_unit_ht=cfg.mm_block_unit_ht,
+        chunk_width_in_tiles=cfg.chunk_width_in_tiles,
+        N_block_wt=cfg.N_block_wt,
+        N_block_idx=cfg.N_block_idx,
+        M_block_idx=cfg.M_block_idx,
+        tiles_ht_per_core=cfg.tiles_ht_per_core,
+        slice_Wt=cfg.slice_Wt,
+        slice_actual_idx=cfg.slice_actual_idx,
+        global_Wt=cfg.global_Wt,
+    )
+
+
+def _history_kwargs(cfg: GridConfig, num_workers: int) -> dict:
+    chunk_width = cfg.history_chunk_width()
+    return dict(
+        batch_size=2,
+        M_blocks_per_core=cfg.mm_M_unit_blocks_per_core,
+        chunks_per_mm_N_block=-(-cfg.N_block_wt // (chunk_width * cfg.mm_block_unit_ht)),
+        my_chip_id=0,
+        direction=0,
+        ring_size=cfg.ring_size,
+        mm_N_blocks_per_slice=cfg.mm_N_blocks_per_slice,
+        worker_id=0,
+        last_mm_core_idx=cfg.mm_M_unit_blocks_per_core - 1,
+        tile_granularity=8,
+        num_workers=num_workers,
+        mm_block_unit_ht=cfg.mm_block_unit_ht,
+        chunk_width=chunk_width,
+        N_block_wt=cfg.N_block_wt,
+        tiles_ht_per_core=cfg.tiles_ht_per_core,
+        slice_Wt=cfg.slice_Wt,
+    )
+
+
+def _count_tiles(slice_idxs: list) -> int:
+    return sum(len(step) for step in slice_idxs)
+
+
+def bench_generators(repeat: int, num_workers: int = 2) -> dict[str, dict]:
+    """Time the index generators and report tiles per second."""
+    results = {}
+    for shape_name, cfg in BENCH_SHAPES.items():
+        kwargs = _generator_kwargs(cfg, num_workers)
+        tiles = _count_tiles(read_tiles_granular_with_direction_based_on_num_workers(**kwargs)[0])
+        for fn in (read_tiles_granular_with_direction_based_on_num_workers,
+                   read_tiles_granular_with_direction_based_on_num_workers_vec):
+            ns_per_call = _time_calls(lambda: fn(**kwargs), [()], repeat)
+            results[f"generator/{fn.__name__}/{shape_name}"] = {
+                "ns_per_call": ns_per_call,
+                "tiles_per_s": tiles * 1e9 / ns_per_call,
+            }
+
+        kwargs = _history_kwargs(cfg, num_workers)
+        tiles = sum(_count_tiles(slice_idxs) for _, slice_idxs, _ in get_iteration_history(**kwargs))
+        for fn in (get_iteration_history, get_iteration_history_from_templates):
+            ns_per_call = _time_calls(lambda: fn(**kwargs), [()], max(1, repeat // 5))
+            results[f"history/{fn.__name__}/{shape_name}"] = {
+                "ns_per_call": ns_per_call,
+                "tiles_per_s": tiles * 1e9 / ns_per_call,
+            }
+    return results
+
+
+def compare_to_baseline(
+    results: dict[str, dict],
+    baseline: dict[str, dict],
+    threshold: float
+) -> list[str]:
+    """
+    Return one message per benchmark slower than its baseline by more than
+    threshold (0.2 means 20%).
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base_ns = baseline[name]["ns_per_call"]
+        ratio = result["ns_per_call"] / base_ns
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {result['ns_per_call']:.0f} ns vs baseline {base_ns:.0f} ns "
+                f"({(ratio - 1) * 100:.0f}% slower)"
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark stride_fns and the index generators.")
+    parser.add_argument("--calls", type=int, default=2000, help="advance calls per benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats (best is kept)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown for --check")
+    args = parser.parse_args(argv)
+
+    results = bench_advance_variants(args.calls, args.repeat)
+    results.update(bench_generators(args.repeat))
+    for name, result in results.items():
+        rate = ", ".join(f"{key}={value:,.0f}" for key, value in result.items())
+        print(f"{name}: {rate}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 
 
 @dataclass
@@ -49,6 +49,47 @@ class GridConfig:
         print(f"N_block_idx: {self.N_block_idx}")
         print(f"M_block_idx: {self.M_block_idx}")
 
+    def history_chunk_width(self) -> int:
+        """
+        chunk_width argument of get_iteration_history, which multiplies it by
+        mm_block_unit_ht to get the chunk width in tiles.
+        """
+        if self.chunk_width_in_tiles % self.mm_block_unit_ht != 0:
+            raise ValueError(
+                f"chunk_width_in_tiles ({self.chunk_width_in_tiles}) is not a multiple of "
+                f"mm_block_unit_ht ({self.mm_block_unit_ht}); pass chunk_width explicitly"
+            )
+        return self.chunk_width_in_tiles // self.mm_block_unit_ht
+
+    def snapshot(self) -> "GridConfigSnapshot":
+        """Return an immutable snapshot of the current values."""
+        return GridConfigSnapshot(**asdict(self))
+
+
+@dataclass(frozen=True, slots=True)
+class GridConfigSnapshot:
+    """
+    Immutable, hashable copy of a GridConfig, including the derived values.
+    Meant to be passed explicitly through the hot path and used as a cache key.
+    """
+    mm_block_unit_wt: int
+    mm_blocks_per_N_block: int
+    chunk_width_in_mm_units: int
+    mm_block_unit_ht: int
+    mm_M_unit_blocks_per_core: int
+    mm_N_blocks_per_slice: int
+    ring_size: int
+    N_block_idx: int
+    M_block_idx: int
+    slice_actual_idx: int
+
+    N_block_wt: int
+    slice_Wt: int
+    tiles_ht_per_core: int
+    chunk_width_in_tiles: int
+    chunk_piece_size: int
+    global_Wt: int
+
 
 # Global config instance
 cfg = GridConfig()
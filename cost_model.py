@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from loop_simulation import get_iteration_history
+
+
+@dataclass
+class TransferCostModel:
+    """
+    Latency/bandwidth model of one link direction.
+    A worker's granularity step of n tiles takes
+        step_overhead + n * (per_tile_overhead + tile_size_bytes / worker_bandwidth)
+    seconds, where the workers of a direction share link_bandwidth evenly.
+    """
+    step_overhead: float = 1e-6  # seconds
+    per_tile_overhead: float = 0.0  # seconds
+    tile_size_bytes: int = 32 * 32 * 2  # bfloat16 tile
+    link_bandwidth: float = 12.5e9  # bytes per second
+
+    def step_times(self, tiles_per_step, num_workers: int = 1) -> np.ndarray:
+        """Estimated seconds of each step given its tile count."""
+        if num_workers <= 0:
+            raise ValueError("num_workers must be greater than 0")
+        if self.link_bandwidth <= 0:
+            raise ValueError("link_bandwidth must be greater than 0")
+        tiles_per_step = np.asarray(tiles_per_step, dtype=np.float64)
+        worker_bandwidth = self.link_bandwidth / num_workers
+        return self.step_overhead + tiles_per_step * (
+            self.per_tile_overhead + self.tile_size_bytes / worker_bandwidth
+        )
+
+
+@dataclass
+class CostEstimate:
+    """
+    step_times[r]: seconds of each granularity step of record r
+    ring_iteration_times: seconds of each (b, m_block_iter, chunk_idx, ring
+        iteration), i.e. of each group of mm_N_blocks_per_slice records
+    """
+    step_times: list[np.ndarray]
+    ring_iteration_times: np.ndarray
+    total_time: float
+    total_bytes: int
+
+
+def estimate_read_tiles_cost(
+    slice_idxs: list[list[int]],
+    cost_model: TransferCostModel,
+    num_workers: int = 1
+) -> np.ndarray:
+    """
+    Step times of one read_tiles_granular_with_direction_based_on_num_workers
+    result (either of its two index lists).
+    """
+    return cost_model.step_times([len(step) for step in slice_idxs], num_workers)
+
+
+def estimate_iteration_history_cost(
+    iteration_history: list,
+    cost_model: TransferCostModel,
+    mm_N_blocks_per_slice: int,
+    num_workers: int = 1
+) -> CostEstimate:
+    """
+    Cost of one worker's get_iteration_history output, assuming num_workers
+    workers share the link.
+    """
+    return estimate_op_cost([iteration_history], cost_model, mm_N_blocks_per_slice, num_workers)
+
+
+def estimate_op_cost(
+    iteration_histories: list[list],
+    cost_model: TransferCostModel,
+    mm_N_blocks_per_slice: int,
+    num_workers: int = None
+) -> CostEstimate:
+    """
+    Cost of the workers of one direction running their schedules concurrently.
+    Workers proceed in lock step per ring iteration, so a ring iteration takes
+    as long as its slowest worker. step_times are those of the first worker.
+    num_workers defaults to the number of schedules given.
+    """
+    if mm_N_blocks_per_slice <= 0:
+        raise ValueError("mm_N_blocks_per_slice must be greater than 0")
+    if num_workers is None:
+        num_workers = len(iteration_histories)
+
+    ring_iteration_times = None
+    step_times = None
+    total_tiles = 0
+    for iteration_history in iteration_histories:
+        worker_step_times = [
+            estimate_read_tiles_cost(slice_idxs, cost_model, num_workers)
+            for _, slice_idxs, _ in iteration_history
+        ]
+        total_tiles += sum(len(step) for _, slice_idxs, _ in iteration_history for step in slice_idxs)
+        record_times = np.array([times.sum() for times in worker_step_times])
+        if len(record_times) % mm_N_blocks_per_slice:
+            raise ValueError("iteration history length is not a multiple of mm_N_blocks_per_slice")
+        worker_ring_times = record_times.reshape(-1, mm_N_blocks_per_slice).sum(axis=1)
+        if step_times is None:
+            step_times = worker_step_times
+            ring_iteration_times = worker_ring_times
+        else:
+            ring_iteration_times = np.maximum(ring_iteration_times, worker_ring_times)
+
+    if step_times is None:
+        return CostEstimate([], np.zeros(0), 0.0, 0)
+    return CostEstimate(
+        step_times=step_times,
+        ring_iteration_times=ring_iteration_times,
+        total_time=float(ring_iteration_times.sum()),
+        total_bytes=total_tiles * cost_model.tile_size_bytes,
+    )
+
+
+def get_iteration_history_with_cost(
+    batch_size: int,
+    M_blocks_per_core: int,
+    chunks_per_mm_N_block: int,
+    my_chip_id: int,
+    direction: int,
+    ring_size: int,
+    mm_N_blocks_per_slice: int,
+    worker_id: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    num_workers: int,
+    mm_block_unit_ht: int,
+    chunk_width: int,
+    N_block_wt: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    cost_model: TransferCostModel = None,
+) -> tuple[list, CostEstimate]:
+    """get_iteration_history plus its CostEstimate for this worker."""
+    if cost_model is None:
+        cost_model = TransferCostModel()
+    iteration_history = get_iteration_history(
+        batch_size, M_blocks_per_core, chunks_per_mm_N_block, my_chip_id, direction,
+        ring_size, mm_N_blocks_per_slice, worker_id, last_mm_core_idx, tile_granularity,
+        num_workers, mm_block_unit_ht, chunk_width, N_block_wt, tiles_ht_per_core, slice_Wt
+    )
+    return iteration_history, estimate_iteration_history_cost(
+        iteration_history, cost_model, mm_N_blocks_per_slice, num_workers
+    )
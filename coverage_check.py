@@ -0,0 +1,185 @@
+import itertools
+from dataclasses import dataclass
+
+import numpy as np
+
+from stride_idx_fns import (
+    get_effective_chunk_width_in_tiles,
+    read_tiles_granular_with_direction_based_on_num_workers,
+)
+
+
+# Flush buffered indices into the count array once this many are pending
+_FLUSH_THRESHOLD = 1 << 20
+
+
+@dataclass
+class CoverageReport:
+    """
+    Result of a coverage check over a tensor of num_tiles tiles.
+    missing: tiles read fewer times than expected.
+    duplicated: tiles read more times than expected.
+    out_of_range: number of indices outside [0, num_tiles).
+    """
+    num_tiles: int
+    num_reads: int
+    missing: np.ndarray
+    duplicated: np.ndarray
+    out_of_range: int
+
+    @property
+    def ok(self) -> bool:
+        return len(self.missing) == 0 and len(self.duplicated) == 0 and self.out_of_range == 0
+
+
+class TileReadCounter:
+    """Preallocated per-tile read counter fed with index arrays or lists."""
+
+    def __init__(self, num_tiles: int):
+        self.counts = np.zeros(num_tiles, dtype=np.int32)
+        self.num_reads = 0
+        self.out_of_range = 0
+        self._pending = []
+        self._num_pending = 0
+
+    def add(self, idxs) -> None:
+        idxs = np.asarray(idxs, dtype=np.int64).reshape(-1)
+        self._pending.append(idxs)
+        self._num_pending += len(idxs)
+        if self._num_pending >= _FLUSH_THRESHOLD:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        idxs = np.concatenate(self._pending)
+        self._pending = []
+        self._num_pending = 0
+        in_range = (idxs >= 0) & (idxs < len(self.counts))
+        self.num_reads += len(idxs)
+        self.out_of_range += int(len(idxs) - in_range.sum())
+        self.counts += np.bincount(idxs[in_range], minlength=len(self.counts)).astype(np.int32)
+
+    def report(self, expected_reads) -> CoverageReport:
+        """
+        Compare counts to expected_reads, a scalar or a per-tile array
+        (e.g. 1 inside the region under test and 0 elsewhere).
+        """
+        self._flush()
+        return CoverageReport(
+            num_tiles=len(self.counts),
+            num_reads=self.num_reads,
+            missing=np.flatnonzero(self.counts < expected_reads),
+            duplicated=np.flatnonzero(self.counts > expected_reads),
+            out_of_range=self.out_of_range,
+        )
+
+
+def _flat_indices(idxs):
+    """Flatten a generator's per-step index lists; flat arrays pass through."""
+    if isinstance(idxs, np.ndarray):
+        return idxs
+    return list(itertools.chain.from_iterable(idxs))
+
+
+def verify_chunk_piece_partition(
+    start_tile_row_in_mm_M_block: int,
+    start_chunk_col_in_tiles: int,
+    start_mm_core_idx: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    chunk_idx: int,
+    num_workers: int,
+    # Config parameters
+    mm_block_unit_ht: int,
+    chunk_width_in_tiles: int,
+    N_block_wt: int,
+    N_block_idx: int,
+    M_block_idx: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    slice_actual_idx: int,
+    global_Wt: int,
+    read_tiles_fn=read_tiles_granular_with_direction_based_on_num_workers,
+) -> tuple[CoverageReport, CoverageReport]:
+    """
+    Check that all workers in both directions of read_tiles_fn read every tile
+    of the chunk piece exactly once and nothing outside it.
+    read_tiles_fn defaults to the loop generator and may be any function with
+    its signature returning per-step lists or flat arrays first
+    (e.g. read_tiles_granular_with_direction_based_on_num_workers_arrays).
+    Returns (slice_report, global_report).
+    """
+    num_rows = (last_mm_core_idx + 1) * tiles_ht_per_core
+    slice_counter = TileReadCounter(num_rows * slice_Wt)
+    global_counter = TileReadCounter(num_rows * global_Wt)
+    for direction in [0, 1]:
+        for worker_id in range(num_workers):
+            slice_idxs, global_idxs = read_tiles_fn(
+                worker_id=worker_id,
+                start_tile_row_in_mm_M_block=start_tile_row_in_mm_M_block,
+                start_chunk_col_in_tiles=start_chunk_col_in_tiles,
+                start_mm_core_idx=start_mm_core_idx,
+                last_mm_core_idx=last_mm_core_idx,
+                tile_granularity=tile_granularity,
+                chunk_idx=chunk_idx,
+                direction=direction,
+                num_workers=num_workers,
+                mm_block_unit_ht=mm_block_unit_ht,
+                chunk_width_in_tiles=chunk_width_in_tiles,
+                N_block_wt=N_block_wt,
+                N_block_idx=N_block_idx,
+                M_block_idx=M_block_idx,
+                tiles_ht_per_core=tiles_ht_per_core,
+                slice_Wt=slice_Wt,
+                slice_actual_idx=slice_actual_idx,
+                global_Wt=global_Wt,
+            )[:2]
+            slice_counter.add(_flat_indices(slice_idxs))
+            global_counter.add(_flat_indices(global_idxs))
+
+    # Expected region: every flat chunk index from the start to the end of the last core
+    effective_chunk_width_in_tiles = get_effective_chunk_width_in_tiles(
+        chunk_idx, chunk_width_in_tiles, N_block_wt
+    )
+    effective_chunk_piece_size = mm_block_unit_ht * effective_chunk_width_in_tiles
+    chunk_index = np.arange(
+        start_mm_core_idx * effective_chunk_piece_size +
+        start_tile_row_in_mm_M_block * effective_chunk_width_in_tiles +
+        start_chunk_col_in_tiles,
+        (last_mm_core_idx + 1) * effective_chunk_piece_size,
+        dtype=np.int64
+    )
+    mm_core_idx, remaining_tiles = np.divmod(chunk_index, effective_chunk_piece_size)
+    tile_row, chunk_col = np.divmod(remaining_tiles, effective_chunk_width_in_tiles)
+    slice_row = mm_core_idx * tiles_ht_per_core + M_block_idx * mm_block_unit_ht + tile_row
+    slice_col = N_block_idx * N_block_wt + chunk_idx * chunk_width_in_tiles + chunk_col
+
+    expected_slice = np.zeros(num_rows * slice_Wt, dtype=np.int32)
+    expected_slice[slice_row * slice_Wt + slice_col] = 1
+    expected_global = np.zeros(num_rows * global_Wt, dtype=np.int32)
+    expected_global[slice_row * global_Wt + slice_col + slice_actual_idx * slice_Wt] = 1
+    return slice_counter.report(expected_slice), global_counter.report(expected_global)
+
+
+def verify_iteration_history_coverage(
+    iteration_histories,
+    last_mm_core_idx: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    ring_size: int,
+    expected_reads_per_tile: int = 1,
+) -> CoverageReport:
+    """
+    Check the global indices of one or more get_iteration_history runs (or
+    iter_iteration_history streams) against the global tensor.
+    To cover the tensor, pass the runs of every worker and both directions of
+    one chip; expected_reads_per_tile is then the batch size.
+    """
+    num_tiles = (last_mm_core_idx + 1) * tiles_ht_per_core * slice_Wt * ring_size
+    counter = TileReadCounter(num_tiles)
+    for iteration_history in iteration_histories:
+        for _, _, global_idxs in iteration_history:
+            for step_global_idxs in global_idxs:
+                counter.add(step_global_idxs)
+    return counter.report(expected_reads_per_tile)
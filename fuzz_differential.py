@@ -0,0 +1,395 @@
+"""
+Randomized differential tests of the fast engines against the reference loops.
+
+    python fuzz_differential.py --cases 10000 --seed 0
+
+Every case is a sampled GridConfig shape plus loop parameters; failing cases
+are shrunk to a minimal config before they are reported.
+"""
+import argparse
+import functools
+import os
+import random
+import sys
+import tempfile
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import schedule_cli
+from balanced_assignment import read_tiles_granular_with_direction_based_on_num_workers_balanced
+from config import GridConfig
+from incremental_schedule import IncrementalSchedule
+from iteration_table import build_iteration_history_table
+from loop_simulation import get_iteration_history, iter_iteration_history
+from schedule_file import ScheduleFile, write_schedule_file
+from schedule_templates import get_iteration_history_from_templates
+from stride_fns import (
+    get_next_tile_coordinates,
+    get_next_tile_coordinates_2,
+    get_next_tile_coordinates_flat,
+    get_next_tile_coordinates_optimized,
+    how_many_tiles_to_read_formula,
+)
+from stride_idx_fns import (
+    get_effective_chunk_width_in_tiles,
+    get_kth_tile_with_direction_based_on_num_workers,
+    read_tiles_granular_with_direction,
+    read_tiles_granular_with_direction_based_on_num_workers,
+)
+from stride_idx_run_fns import (
+    expand_runs,
+    read_tiles_granular_with_direction_based_on_num_workers_runs,
+)
+from stride_idx_vec_fns import (
+    read_tiles_granular_with_direction_arrays,
+    read_tiles_granular_with_direction_based_on_num_workers_vec,
+    split_by_step_offsets,
+)
+from stride_vec_fns import get_next_tile_coordinates_many
+
+
+GRID_FIELDS = (
+    "mm_block_unit_wt", "mm_blocks_per_N_block", "chunk_width_in_mm_units",
+    "mm_block_unit_ht", "mm_M_unit_blocks_per_core", "mm_N_blocks_per_slice",
+    "ring_size", "N_block_idx", "M_block_idx", "slice_actual_idx",
+)
+
+# Smallest value of every case field, used as the shrinking target
+MIN_CASE = dict(
+    mm_block_unit_wt=1, mm_blocks_per_N_block=1, chunk_width_in_mm_units=1,
+    mm_block_unit_ht=1, mm_M_unit_blocks_per_core=1, mm_N_blocks_per_slice=1,
+    ring_size=1, N_block_idx=0, M_block_idx=0, slice_actual_idx=0,
+    chunk_idx=0, start_tile_row_in_mm_M_block=0, start_chunk_col_in_tiles=0,
+    start_mm_core_idx=0, last_mm_core_idx=0, tile_granularity=1,
+    num_workers=1, worker_id=0, direction=0, advance_by_tiles=0, batch_size=1,
+)
+
+
+def _grid_config(case: dict) -> GridConfig:
+    return GridConfig(**{name: case[name] for name in GRID_FIELDS})
+
+
+def _effective_chunk_width_in_tiles(case: dict) -> int:
+    cfg = _grid_config(case)
+    return get_effective_chunk_width_in_tiles(case["chunk_idx"], cfg.chunk_width_in_tiles, cfg.N_block_wt)
+
+
+def is_valid_case(case: dict) -> bool:
+    """Check the invariants the reference functions assume."""
+    if any(case[name] < MIN_CASE[name] for name in MIN_CASE):
+        return False
+    cfg = _grid_config(case)
+    return (
+        case["N_block_idx"] < case["mm_N_blocks_per_slice"] and
+        case["M_block_idx"] < case["mm_M_unit_blocks_per_core"] and
+        case["slice_actual_idx"] < case["ring_size"] and
+        case["chunk_idx"] * cfg.chunk_width_in_tiles < cfg.N_block_wt and
+        case["start_tile_row_in_mm_M_block"] < case["mm_block_unit_ht"] and
+        case["start_chunk_col_in_tiles"] < _effective_chunk_width_in_tiles(case) and
+        case["start_mm_core_idx"] <= case["last_mm_core_idx"] and
+        case["worker_id"] < case["num_workers"] and
+        case["direction"] in [0, 1]
+    )
+
+
+def sample_case(rng: random.Random) -> dict:
+    """Sample a valid case."""
+    while True:
+        case = dict(
+            mm_block_unit_wt=rng.randint(1, 4),
+            mm_blocks_per_N_block=rng.randint(1, 4),
+            chunk_width_in_mm_units=rng.randint(1, 4),
+            mm_block_unit_ht=rng.randint(1, 4),
+            mm_M_unit_blocks_per_core=rng.randint(1, 4),
+            mm_N_blocks_per_slice=rng.randint(1, 3),
+            ring_size=rng.randint(1, 8),
+            tile_granularity=rng.randint(1, 12),
+            num_workers=rng.randint(1, 6),
+            direction=rng.randint(0, 1),
+            last_mm_core_idx=rng.randint(0, 3),
+            advance_by_tiles=rng.randint(0, 64),
+            batch_size=rng.randint(1, 2),
+        )
+        case["N_block_idx"] = rng.randrange(case["mm_N_blocks_per_slice"])
+        case["M_block_idx"] = rng.randrange(case["mm_M_unit_blocks_per_core"])
+        case["slice_actual_idx"] = rng.randrange(case["ring_size"])
+        case["worker_id"] = rng.randrange(case["num_workers"])
+        case["start_mm_core_idx"] = rng.randint(0, case["last_mm_core_idx"])
+        case["start_tile_row_in_mm_M_block"] = rng.randrange(case["mm_block_unit_ht"])
+        cfg = _grid_config(case)
+        case["chunk_idx"] = rng.randrange(-(-cfg.N_block_wt // cfg.chunk_width_in_tiles))
+        case["start_chunk_col_in_tiles"] = rng.randrange(_effective_chunk_width_in_tiles(case))
+        if is_valid_case(case):
+            return case
+
+
+def _explicit_kwargs(case: dict) -> dict:
+    cfg = _grid_config(case)
+    return dict(
+        worker_id=case["worker_id"],
+        start_tile_row_in_mm_M_block=case["start_tile_row_in_mm_M_block"],
+        start_chunk_col_in_tiles=case["start_chunk_col_in_tiles"],
+        start_mm_core_idx=case["start_mm_core_idx"],
+        last_mm_core_idx=case["last_mm_core_idx"],
+        tile_granularity=case["tile_granularity"],
+        chunk_idx=case["chunk_idx"],
+        direction=case["direction"],
+        num_workers=case["num_workers"],
+        mm_block_unit_ht=cfg.mm_block_unit_ht,
+        chunk_width_in_tiles=cfg.chunk_width_in_tiles,
+        N_block_wt=cfg.N_block_wt,
+        N_block_idx=cfg.N_block_idx,
+        M_block_idx=cfg.M_block_idx,
+        tiles_ht_per_core=cfg.tiles_ht_per_core,
+        slice_Wt=cfg.slice_Wt,
+        slice_actual_idx=cfg.slice_actual_idx,
+        global_Wt=cfg.global_Wt,
+    )
+
+
+def check_advance_variants(case: dict) -> str | None:
+    """The four scalar advance variants and the batched one agree."""
+    width = _effective_chunk_width_in_tiles(case)
+    ht = case["mm_block_unit_ht"]
+    state = (case["start_tile_row_in_mm_M_block"], case["start_chunk_col_in_tiles"],
+             case["start_mm_core_idx"], case["advance_by_tiles"])
+    results = {
+        "get_next_tile_coordinates": get_next_tile_coordinates(*state, ht * width, width, ht),
+        "get_next_tile_coordinates_optimized": get_next_tile_coordinates_optimized(*state, ht * width, width, ht),
+        "get_next_tile_coordinates_2": get_next_tile_coordinates_2(*state, width, ht),
+        "get_next_tile_coordinates_flat": get_next_tile_coordinates_flat(*state, width, ht),
+        "get_next_tile_coordinates_many": tuple(
+            int(value) for value in get_next_tile_coordinates_many(*state, width, ht)
+        ),
+    }
+    if len(set(results.values())) > 1:
+        return f"advance variants disagree: {results}"
+    return None
+
+
+def check_how_many_tiles(case: dict) -> str | None:
+    """how_many_tiles_to_read_formula matches a brute-force walk."""
+    width = _effective_chunk_width_in_tiles(case)
+    ht = case["mm_block_unit_ht"]
+    advance_by_tiles = max(case["advance_by_tiles"], 1)
+    row, col, core = (case["start_tile_row_in_mm_M_block"], case["start_chunk_col_in_tiles"],
+                      case["start_mm_core_idx"])
+    expected = how_many_tiles_to_read_formula(
+        row, col, core, advance_by_tiles, case["last_mm_core_idx"], ht * width, width
+    )
+    count = 0
+    while core <= case["last_mm_core_idx"]:
+        count += 1
+        row, col, core = get_next_tile_coordinates_flat(row, col, core, advance_by_tiles, width, ht)
+    if count != expected:
+        return f"how_many_tiles_to_read_formula returned {expected}, brute force counted {count}"
+    return None
+
+
+def check_num_workers_generators(case: dict) -> str | None:
+    """Vectorized, run-length and k-th tile paths match the loop generator."""
+    kwargs = _explicit_kwargs(case)
+    expected = read_tiles_granular_with_direction_based_on_num_workers(**kwargs)
+    vec = read_tiles_granular_with_direction_based_on_num_workers_vec(**kwargs)
+    if vec != expected:
+        return f"vec generator differs: {vec} != {expected}"
+    slice_runs, global_runs = read_tiles_granular_with_direction_based_on_num_workers_runs(**kwargs)
+    runs = ([expand_runs(step) for step in slice_runs], [expand_runs(step) for step in global_runs])
+    if runs != expected:
+        return f"run-length generator differs: {runs} != {expected}"
+    k = 0
+    for step_idx, (step_slice_idxs, step_global_idxs) in enumerate(zip(*expected)):
+        for slice_tile_idx, global_tile_idx in zip(step_slice_idxs, step_global_idxs):
+            kth = get_kth_tile_with_direction_based_on_num_workers(k, **kwargs)
+            if kth != (slice_tile_idx, global_tile_idx, step_idx):
+                return f"k-th tile {k} differs: {kth} != {(slice_tile_idx, global_tile_idx, step_idx)}"
+            k += 1
+    return None
+
+
+def check_with_direction_generators(case: dict) -> str | None:
+    """The vectorized read_tiles_granular_with_direction matches the loop."""
+    advance_by_tiles = max(case["advance_by_tiles"], 1)
+    args = (case["worker_id"] % advance_by_tiles, case["start_tile_row_in_mm_M_block"],
+            case["start_chunk_col_in_tiles"], case["start_mm_core_idx"], advance_by_tiles,
+            case["last_mm_core_idx"], case["tile_granularity"], case["chunk_idx"], case["direction"])
+    cfg_snapshot = _grid_config(case).snapshot()
+    expected = read_tiles_granular_with_direction(*args, cfg_snapshot=cfg_snapshot)
+    slice_idxs, global_idxs, step_offsets = read_tiles_granular_with_direction_arrays(
+        *args, cfg_snapshot=cfg_snapshot
+    )
+    arrays = (split_by_step_offsets(slice_idxs, step_offsets),
+              split_by_step_offsets(global_idxs, step_offsets))
+    if arrays != expected:
+        return f"vectorized with_direction differs: {arrays} != {expected}"
+    return None
+
+
+def _history_params(case: dict) -> dict:
+    """get_iteration_history arguments for the case's shape and worker."""
+    cfg = _grid_config(case)
+    return dict(
+        batch_size=case["batch_size"],
+        M_blocks_per_core=cfg.mm_M_unit_blocks_per_core,
+        chunks_per_mm_N_block=-(-cfg.N_block_wt // cfg.chunk_width_in_tiles),
+        my_chip_id=case["slice_actual_idx"],
+        direction=case["direction"],
+        ring_size=cfg.ring_size,
+        mm_N_blocks_per_slice=cfg.mm_N_blocks_per_slice,
+        worker_id=case["worker_id"],
+        last_mm_core_idx=case["last_mm_core_idx"],
+        tile_granularity=case["tile_granularity"],
+        num_workers=case["num_workers"],
+        mm_block_unit_ht=cfg.mm_block_unit_ht,
+        chunk_width=cfg.history_chunk_width(),
+        N_block_wt=cfg.N_block_wt,
+        tiles_ht_per_core=cfg.tiles_ht_per_core,
+        slice_Wt=cfg.slice_Wt,
+    )
+
+
+def _history_rows(iteration_history) -> np.ndarray:
+    """get_iteration_history output as schedule CLI rows without the ring_iteration column."""
+    rows = [
+        (*iteration_id, step_idx, slice_tile_idx, global_tile_idx)
+        for iteration_id, slice_idxs, global_idxs in iteration_history
+        for step_idx, (step_slice_idxs, step_global_idxs) in enumerate(zip(slice_idxs, global_idxs))
+        for slice_tile_idx, global_tile_idx in zip(step_slice_idxs, step_global_idxs)
+    ]
+    return np.array(rows, dtype=np.int64).reshape(-1, len(schedule_cli.HISTORY_COLUMNS) - 1)
+
+
+def check_history_engines(case: dict) -> str | None:
+    """
+    Templates, incremental schedule, iteration table, schedule file, balanced
+    generator with tile_offset=0 and the schedule CLI match get_iteration_history.
+    """
+    # get_iteration_history counts chunk widths in mm_block_unit_ht units
+    if _grid_config(case).chunk_width_in_tiles % case["mm_block_unit_ht"] != 0:
+        return None
+    params = _history_params(case)
+    expected = get_iteration_history(**params)
+    balanced = functools.partial(
+        read_tiles_granular_with_direction_based_on_num_workers_balanced, tile_offset=0
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        schedule_path = os.path.join(directory, "schedule.bin")
+        write_schedule_file(schedule_path, **params)
+        histories = {
+            "get_iteration_history_from_templates": get_iteration_history_from_templates(**params),
+            "IncrementalSchedule": IncrementalSchedule(**params).iteration_history,
+            "ScheduleFile": ScheduleFile(schedule_path).to_iteration_history(),
+            "balanced generator": list(iter_iteration_history(**params, read_tiles_fn=balanced)),
+        }
+        for name, iteration_history in histories.items():
+            if iteration_history != expected:
+                return f"{name} differs from get_iteration_history for {params}"
+
+        expected_rows = _history_rows(expected)
+        table = build_iteration_history_table(**params)
+        table_rows = np.stack([
+            table.batch, table.m_block_iter, table.chunk_idx, table.chunk_piece_idx,
+            table.step_idx, table.slice_idx, table.global_idx,
+        ], axis=1).astype(np.int64)
+        if not np.array_equal(table_rows, expected_rows):
+            return f"build_iteration_history_table differs from get_iteration_history for {params}"
+
+        cli_path = os.path.join(directory, "schedule.i8")
+        argv = ["history", "--format", "binary", "-o", cli_path]
+        for name, value in params.items():
+            argv += [f"--{name.replace('_', '-')}", str(value)]
+        schedule_cli.main(argv)
+        cli_rows = np.fromfile(cli_path, dtype="<i8").reshape(-1, len(schedule_cli.HISTORY_COLUMNS))
+        ring_iteration_column = schedule_cli.HISTORY_COLUMNS.index("ring_iteration")
+        if not np.array_equal(np.delete(cli_rows, ring_iteration_column, axis=1), expected_rows):
+            return f"schedule CLI differs from get_iteration_history for {params}"
+    return None
+
+
+CHECKS = {
+    "advance_variants": check_advance_variants,
+    "how_many_tiles": check_how_many_tiles,
+    "num_workers_generators": check_num_workers_generators,
+    "with_direction_generators": check_with_direction_generators,
+    "history_engines": check_history_engines,
+}
+
+
+def run_check(check, case: dict) -> str | None:
+    """Run one check, turning exceptions into failure messages."""
+    try:
+        return check(case)
+    except Exception:
+        return traceback.format_exc(limit=2)
+
+
+def shrink_case(case: dict, check) -> dict:
+    """
+    Greedily lower each field towards MIN_CASE while the case stays valid and
+    check keeps failing. Returns the smallest failing case found.
+    """
+    case = dict(case)
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for name, minimum in MIN_CASE.items():
+            value = case[name]
+            for candidate in sorted({minimum, (minimum + value) // 2, value - 1}):
+                if candidate >= value:
+                    continue
+                trial = {**case, name: candidate}
+                if is_valid_case(trial) and run_check(check, trial) is not None:
+                    case = trial
+                    shrunk = True
+                    break
+    return case
+
+
+def _fuzz_seeds(seeds: list[int]) -> list[tuple[str, dict, str]]:
+    """Worker entry point: run every check on the cases of a batch of seeds."""
+    failures = []
+    for seed in seeds:
+        case = sample_case(random.Random(seed))
+        for name, check in CHECKS.items():
+            if run_check(check, case) is not None:
+                case = shrink_case(case, check)
+                failures.append((name, case, run_check(check, case)))
+    return failures
+
+
+def fuzz(num_cases: int, seed: int = 0, max_workers: int = None) -> list[tuple[str, dict, str]]:
+    """
+    Run num_cases random cases on a process pool.
+    Returns (check name, shrunk case, message) for every failure.
+    max_workers=1 runs in the calling process.
+    """
+    seeds = list(range(seed * num_cases, (seed + 1) * num_cases))
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers == 1:
+        return _fuzz_seeds(seeds)
+
+    batch_size = max(1, len(seeds) // (4 * max_workers))
+    batches = [seeds[i:i + batch_size] for i in range(0, len(seeds), batch_size)]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return [failure for failures in executor.map(_fuzz_seeds, batches) for failure in failures]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Differential fuzzing of the stride engines.")
+    parser.add_argument("--cases", type=int, default=2000, help="number of random cases")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the case batch")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    args = parser.parse_args(argv)
+
+    failures = fuzz(args.cases, args.seed, args.workers)
+    for name, case, message in failures:
+        print(f"FAIL {name}: {case}\n{message}")
+    print(f"{args.cases} cases, {len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+import numpy as np
+
+from loop_simulation import HISTORY_PARAM_NAMES, iter_iteration_params
+from schedule_templates import ScheduleTemplateCache
+from stride_idx_vec_fns import split_by_step_offsets
+
+
+# Which cached layer each get_iteration_history argument invalidates.
+# Arguments not listed (batch_size, M_blocks_per_core, chunks_per_mm_N_block,
+# my_chip_id, mm_N_blocks_per_slice) only change the loop walk: the cached
+# layers are keyed by loop position, so new positions are filled on demand and
+# a new my_chip_id only picks different slice offsets.
+TEMPLATE_FIELDS = frozenset({
+    "worker_id", "direction", "num_workers", "last_mm_core_idx",
+    "mm_block_unit_ht", "chunk_width", "N_block_wt", "tiles_ht_per_core",
+})
+STEP_FIELDS = frozenset({"tile_granularity"})
+SLICE_INDEX_FIELDS = frozenset({"slice_Wt"})
+GLOBAL_INDEX_FIELDS = frozenset({"slice_Wt", "ring_size"})
+
+
+def _check_params(params: dict) -> None:
+    if params["tile_granularity"] <= 0:
+        raise ValueError("tile_granularity must be greater than 0")
+
+
+class IncrementalSchedule:
+    """
+    get_iteration_history output that is patched rather than regenerated when
+    one of its arguments changes.
+
+    Cached layers, from most to least expensive:
+        templates       slice coordinates per (chunk_idx, chunk_piece_idx)
+        step offsets    granularity split per (chunk_idx, chunk_piece_idx)
+        slice indices   per (m_block_iter, chunk_idx, chunk_piece_idx)
+        global bases    global indices per (m_block_iter, chunk_idx,
+                        chunk_piece_idx) before the slice offset
+    A ring step only adds actual_slice_idx * slice_Wt to its global base, and
+    later batches reuse the first batch's arrays.
+    """
+
+    def __init__(self, **history_params):
+        unknown = set(history_params) - set(HISTORY_PARAM_NAMES)
+        missing = set(HISTORY_PARAM_NAMES) - set(history_params)
+        if unknown or missing:
+            raise ValueError(
+                f"unknown parameters {sorted(unknown)}, missing parameters {sorted(missing)}"
+            )
+        _check_params(history_params)
+        self.params = dict(history_params)
+        self.template_builds = 0
+        self._reset(TEMPLATE_FIELDS)
+
+    def _reset(self, changed: set) -> None:
+        if changed & TEMPLATE_FIELDS:
+            p = self.params
+            self._templates = ScheduleTemplateCache(
+                p["worker_id"], p["direction"], p["num_workers"], p["last_mm_core_idx"],
+                p["tile_granularity"], p["mm_block_unit_ht"],
+                p["chunk_width"] * p["mm_block_unit_ht"], p["N_block_wt"], p["tiles_ht_per_core"]
+            )
+            changed = changed | STEP_FIELDS | SLICE_INDEX_FIELDS | GLOBAL_INDEX_FIELDS
+        if changed & STEP_FIELDS:
+            self._step_offsets = {}
+        if changed & SLICE_INDEX_FIELDS:
+            self._slice_idxs = {}
+        if changed & GLOBAL_INDEX_FIELDS:
+            self._global_bases = {}
+        self._iteration_history = None
+
+    def update(self, **changes) -> None:
+        """Change one or more get_iteration_history arguments and drop the affected layers."""
+        unknown = set(changes) - set(HISTORY_PARAM_NAMES)
+        if unknown:
+            raise ValueError(f"unknown parameters {sorted(unknown)}")
+        changed = {name for name, value in changes.items() if self.params[name] != value}
+        if not changed:
+            return
+        _check_params({**self.params, **changes})
+        self.params.update(changes)
+        self._reset(changed)
+
+    def _template(self, chunk_idx: int, chunk_piece_idx: int):
+        num_templates = len(self._templates.templates)
+        template = self._templates.get(chunk_idx, chunk_piece_idx)
+        self.template_builds += len(self._templates.templates) - num_templates
+        return template
+
+    def _get_step_offsets(self, chunk_idx: int, chunk_piece_idx: int) -> np.ndarray:
+        key = (chunk_idx, chunk_piece_idx)
+        step_offsets = self._step_offsets.get(key)
+        if step_offsets is None:
+            # Re-split from the tile count; the template's own step offsets
+            # belong to the granularity it was built with
+            num_tiles = len(self._template(chunk_idx, chunk_piece_idx).slice_row)
+            step_offsets = np.append(
+                np.arange(0, num_tiles, self.params["tile_granularity"], dtype=np.int64),
+                num_tiles
+            )
+            self._step_offsets[key] = step_offsets
+        return step_offsets
+
+    def _get_slice_idxs(self, m_block_iter: int, chunk_idx: int, chunk_piece_idx: int) -> np.ndarray:
+        key = (m_block_iter, chunk_idx, chunk_piece_idx)
+        slice_idxs = self._slice_idxs.get(key)
+        if slice_idxs is None:
+            template = self._template(chunk_idx, chunk_piece_idx)
+            slice_Wt = self.params["slice_Wt"]
+            slice_row = template.slice_row + m_block_iter * self.params["mm_block_unit_ht"]
+            slice_idxs = slice_row * slice_Wt + template.slice_col
+            self._slice_idxs[key] = slice_idxs
+        return slice_idxs
+
+    def _get_global_base(self, m_block_iter: int, chunk_idx: int, chunk_piece_idx: int) -> np.ndarray:
+        key = (m_block_iter, chunk_idx, chunk_piece_idx)
+        global_base = self._global_bases.get(key)
+        if global_base is None:
+            template = self._template(chunk_idx, chunk_piece_idx)
+            global_Wt = self.params["ring_size"] * self.params["slice_Wt"]
+            slice_row = template.slice_row + m_block_iter * self.params["mm_block_unit_ht"]
+            global_base = slice_row * global_Wt + template.slice_col
+            self._global_bases[key] = global_base
+        return global_base
+
+    def iter_arrays(self):
+        """
+        Yield (iteration_id, ring_iteration, slice_idxs, global_idxs, step_offsets)
+        in get_iteration_history order, without building per-step lists.
+        """
+        slice_Wt = self.params["slice_Wt"]
+        for iteration_id, ring_iteration, read_kwargs in iter_iteration_params(**self.params):
+            _, m_block_iter, chunk_idx, chunk_piece_idx = iteration_id
+            global_idxs = (self._get_global_base(m_block_iter, chunk_idx, chunk_piece_idx) +
+                           read_kwargs["slice_actual_idx"] * slice_Wt)
+            yield (iteration_id, ring_iteration,
+                   self._get_slice_idxs(m_block_iter, chunk_idx, chunk_piece_idx),
+                   global_idxs,
+                   self._get_step_offsets(chunk_idx, chunk_piece_idx))
+
+    @property
+    def iteration_history(self) -> list:
+        """The get_iteration_history output for the current parameters."""
+        if self._iteration_history is None:
+            self._iteration_history = [
+                (iteration_id,
+                 split_by_step_offsets(slice_idxs, step_offsets),
+                 split_by_step_offsets(global_idxs, step_offsets))
+                for iteration_id, _, slice_idxs, global_idxs, step_offsets in self.iter_arrays()
+            ]
+        return self._iteration_history
@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from ring_schedule_pool import get_ring_schedules
+
+
+# Producer fields stored per (chip, global tile)
+PRODUCER_FIELDS = (
+    "direction", "worker_id", "ring_iteration", "m_block_iter",
+    "chunk_idx", "chunk_piece_idx", "step_idx",
+)
+
+
+@dataclass(frozen=True)
+class TileProducer:
+    """Who delivers a global tile to a chip."""
+    direction: int
+    worker_id: int
+    ring_iteration: int
+    m_block_iter: int
+    chunk_idx: int
+    chunk_piece_idx: int
+    step_idx: int
+
+
+class InverseTileIndex:
+    """
+    Dense inverse of the ring schedules: for every chip and global tile, the
+    direction, worker, ring iteration, M block, chunk, chunk piece and
+    granularity step that read it. Every batch repeats the same indices, so only
+    the first batch is indexed.
+    fields[name][chip, global_tile_idx] holds the value, -1 for unread tiles.
+    read_counts[chip, global_tile_idx] counts reads within one batch, so any
+    value above 1 is a tile read twice (the last read is the one kept).
+    """
+
+    def __init__(self, ring_size: int, num_global_tiles: int):
+        self.ring_size = ring_size
+        self.num_global_tiles = num_global_tiles
+        self.fields = {
+            name: np.full((ring_size, num_global_tiles), -1, dtype=np.int32)
+            for name in PRODUCER_FIELDS
+        }
+        self.read_counts = np.zeros((ring_size, num_global_tiles), dtype=np.int32)
+
+    @classmethod
+    def from_ring_schedules(
+        cls,
+        schedules: dict[tuple[int, int, int], list],
+        ring_size: int,
+        mm_N_blocks_per_slice: int,
+        num_global_tiles: int
+    ) -> "InverseTileIndex":
+        """
+        Build from get_ring_schedules output (or any dict keyed by
+        (my_chip_id, direction, worker_id) of get_iteration_history results).
+        """
+        index = cls(ring_size, num_global_tiles)
+        for (my_chip_id, direction, worker_id), iteration_history in schedules.items():
+            for n, (iteration_id, _, global_idxs) in enumerate(iteration_history):
+                b, m_block_iter, chunk_idx, chunk_piece_idx = iteration_id
+                if b > 0:
+                    break
+                step_lengths = [len(step) for step in global_idxs]
+                flat = np.fromiter(
+                    (idx for step in global_idxs for idx in step),
+                    dtype=np.int64, count=sum(step_lengths)
+                )
+                if len(flat) and (flat.min() < 0 or flat.max() >= num_global_tiles):
+                    raise ValueError("global tile index outside the global tensor")
+                values = dict(
+                    direction=direction,
+                    worker_id=worker_id,
+                    ring_iteration=n // mm_N_blocks_per_slice % ring_size,
+                    m_block_iter=m_block_iter,
+                    chunk_idx=chunk_idx,
+                    chunk_piece_idx=chunk_piece_idx,
+                    step_idx=np.repeat(np.arange(len(step_lengths)), step_lengths),
+                )
+                for name, value in values.items():
+                    index.fields[name][my_chip_id, flat] = value
+                np.add.at(index.read_counts[my_chip_id], flat, 1)
+        return index
+
+    def lookup(self, my_chip_id: int, global_tile_idx: int) -> TileProducer | None:
+        """Producer of one tile on one chip, or None if the chip never reads it."""
+        if self.read_counts[my_chip_id, global_tile_idx] == 0:
+            return None
+        return TileProducer(*(
+            int(self.fields[name][my_chip_id, global_tile_idx]) for name in PRODUCER_FIELDS
+        ))
+
+    def lookup_many(self, my_chip_id, global_tile_idxs) -> dict[str, np.ndarray]:
+        """
+        Batch lookup; my_chip_id and global_tile_idxs broadcast together.
+        Returns one array per producer field, -1 for unread tiles.
+        """
+        my_chip_id = np.asarray(my_chip_id)
+        global_tile_idxs = np.asarray(global_tile_idxs)
+        return {name: values[my_chip_id, global_tile_idxs] for name, values in self.fields.items()}
+
+    def duplicated_tiles(self, my_chip_id: int) -> np.ndarray:
+        """Global tiles a chip reads more than once per batch."""
+        return np.flatnonzero(self.read_counts[my_chip_id] > 1)
+
+
+def build_inverse_tile_index(
+    M_blocks_per_core: int,
+    chunks_per_mm_N_block: int,
+    ring_size: int,
+    mm_N_blocks_per_slice: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    num_workers: int,
+    mm_block_unit_ht: int,
+    chunk_width: int,
+    N_block_wt: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    max_workers: int = None,
+) -> InverseTileIndex:
+    """Sweep one batch of every chip, direction and worker and index the result."""
+    schedules = get_ring_schedules(
+        batch_size=1,
+        M_blocks_per_core=M_blocks_per_core,
+        chunks_per_mm_N_block=chunks_per_mm_N_block,
+        ring_size=ring_size,
+        mm_N_blocks_per_slice=mm_N_blocks_per_slice,
+        last_mm_core_idx=last_mm_core_idx,
+        tile_granularity=tile_granularity,
+        num_workers=num_workers,
+        mm_block_unit_ht=mm_block_unit_ht,
+        chunk_width=chunk_width,
+        N_block_wt=N_block_wt,
+        tiles_ht_per_core=tiles_ht_per_core,
+        slice_Wt=slice_Wt,
+        max_workers=max_workers,
+    )
+    num_global_tiles = (last_mm_core_idx + 1) * tiles_ht_per_core * slice_Wt * ring_size
+    return InverseTileIndex.from_ring_schedules(
+        schedules, ring_size, mm_N_blocks_per_slice, num_global_tiles
+    )
@@ -0,0 +1,138 @@
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from loop_simulation import iter_iteration_params
+from stride_idx_vec_fns import read_tiles_granular_with_direction_based_on_num_workers_arrays
+
+
+@dataclass
+class IterationHistoryTable:
+    """
+    Columnar form of get_iteration_history: one row per tile read.
+    Every column is a NumPy array of the same length.
+    """
+    batch: np.ndarray
+    m_block_iter: np.ndarray
+    chunk_idx: np.ndarray
+    ring_iteration: np.ndarray
+    actual_slice_idx: np.ndarray
+    chunk_piece_idx: np.ndarray
+    step_idx: np.ndarray
+    slice_idx: np.ndarray
+    global_idx: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.global_idx)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """Return the columns by name."""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def take(self, rows: np.ndarray) -> "IterationHistoryTable":
+        """Return the table restricted to the given row indices or boolean mask."""
+        return IterationHistoryTable(**{
+            name: column[rows] for name, column in self.columns().items()
+        })
+
+    def mask(self, **conditions) -> np.ndarray:
+        """
+        Build a boolean row mask. Each condition is column=value or
+        column=sequence of accepted values.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in conditions.items():
+            column = getattr(self, name)
+            if np.ndim(value) == 0:
+                mask &= column == value
+            else:
+                mask &= np.isin(column, value)
+        return mask
+
+    def filter(self, **conditions) -> "IterationHistoryTable":
+        """Return the rows matching all conditions (see mask)."""
+        return self.take(self.mask(**conditions))
+
+    def group_by(self, *names: str) -> dict[tuple[int, ...], "IterationHistoryTable"]:
+        """Split the table by the distinct values of the given columns."""
+        keys = np.stack([getattr(self, name) for name in names], axis=1)
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[order], np.arange(len(unique_keys) + 1))
+        return {
+            tuple(key.tolist()): self.take(order[bounds[g]:bounds[g + 1]])
+            for g, key in enumerate(unique_keys)
+        }
+
+    def count_by(self, *names: str) -> dict[tuple[int, ...], int]:
+        """Count the tiles for each distinct value of the given columns."""
+        keys = np.stack([getattr(self, name) for name in names], axis=1)
+        unique_keys, counts = np.unique(keys, axis=0, return_counts=True)
+        return {tuple(key.tolist()): int(count) for key, count in zip(unique_keys, counts)}
+
+
+def build_iteration_history_table(
+    batch_size: int,
+    M_blocks_per_core: int,
+    chunks_per_mm_N_block: int,
+    my_chip_id: int,
+    direction: int,
+    ring_size: int,
+    mm_N_blocks_per_slice: int,
+    worker_id: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    num_workers: int,
+    mm_block_unit_ht: int,
+    chunk_width: int,
+    N_block_wt: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+) -> IterationHistoryTable:
+    """
+    Build the columnar table for the same loop get_iteration_history runs.
+    Loop columns are int32, index columns int64.
+    """
+    parts = {f.name: [] for f in fields(IterationHistoryTable)}
+    for iteration_id, ring_iteration, read_kwargs in iter_iteration_params(
+        batch_size=batch_size,
+        M_blocks_per_core=M_blocks_per_core,
+        chunks_per_mm_N_block=chunks_per_mm_N_block,
+        my_chip_id=my_chip_id,
+        direction=direction,
+        ring_size=ring_size,
+        mm_N_blocks_per_slice=mm_N_blocks_per_slice,
+        worker_id=worker_id,
+        last_mm_core_idx=last_mm_core_idx,
+        tile_granularity=tile_granularity,
+        num_workers=num_workers,
+        mm_block_unit_ht=mm_block_unit_ht,
+        chunk_width=chunk_width,
+        N_block_wt=N_block_wt,
+        tiles_ht_per_core=tiles_ht_per_core,
+        slice_Wt=slice_Wt,
+    ):
+        slice_idxs, global_idxs, step_offsets = (
+            read_tiles_granular_with_direction_based_on_num_workers_arrays(**read_kwargs)
+        )
+        num_tiles = len(slice_idxs)
+        b, m_block_iter, chunk_idx, chunk_piece_idx = iteration_id
+        for name, value in (("batch", b), ("m_block_iter", m_block_iter),
+                            ("chunk_idx", chunk_idx), ("ring_iteration", ring_iteration),
+                            ("actual_slice_idx", read_kwargs["slice_actual_idx"]),
+                            ("chunk_piece_idx", chunk_piece_idx)):
+            parts[name].append(np.full(num_tiles, value, dtype=np.int32))
+        parts["step_idx"].append(
+            np.repeat(np.arange(len(step_offsets) - 1, dtype=np.int32), np.diff(step_offsets))
+        )
+        parts["slice_idx"].append(slice_idxs)
+        parts["global_idx"].append(global_idxs)
+
+    dtypes = {name: np.int32 for name in parts}
+    dtypes["slice_idx"] = dtypes["global_idx"] = np.int64
+    return IterationHistoryTable(**{
+        name: np.concatenate(chunks).astype(dtypes[name], copy=False)
+        if chunks else np.zeros(0, dtype=dtypes[name])
+        for name, chunks in parts.items()
+    })
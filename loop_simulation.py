@@ -1,7 +1,19 @@
+import tile_trace
+from profiling import count_history, timed
 from stride_idx_fns import read_tiles_granular_with_direction_based_on_num_workers
+from tile_trace import LoopLevelDone, LoopLevelStarted, RingIterationDone, RingIterationStarted
 
 
-def get_iteration_history(
+# Arguments of get_iteration_history, in order
+HISTORY_PARAM_NAMES = (
+    "batch_size", "M_blocks_per_core", "chunks_per_mm_N_block", "my_chip_id",
+    "direction", "ring_size", "mm_N_blocks_per_slice", "worker_id",
+    "last_mm_core_idx", "tile_granularity", "num_workers", "mm_block_unit_ht",
+    "chunk_width", "N_block_wt", "tiles_ht_per_core", "slice_Wt",
+)
+
+
+def iter_iteration_params(
     batch_size: int,
     M_blocks_per_core: int,
     chunks_per_mm_N_block: int,
@@ -20,43 +32,44 @@ def get_iteration_history(
     slice_Wt: int,
 ):
     """
-    Computes iteration history by iterating through batches, M blocks, chunks,
-    ring iterations, and chunk pieces, calling read_tiles_granular_with_direction_based_on_num_workers
-    for each combination.
+    Walks batches, M blocks, chunks, ring iterations and chunk pieces in the
+    order get_iteration_history uses.
+    Yields (iteration_id, ring_iteration, read_kwargs) where read_kwargs are the
+    keyword arguments of read_tiles_granular_with_direction_based_on_num_workers
+    for that combination.
     """
     chunk_width_in_tiles = chunk_width * mm_block_unit_ht
     global_Wt = ring_size * slice_Wt
-    effective_worker_id = worker_id + direction * num_workers
-
-    iteration_history = []
+    sinks = tile_trace.sinks
 
     for b in range(batch_size):
-        print(f"================================================")
-        print(f"batch: {b} started")
+        if sinks:
+            tile_trace.emit(LoopLevelStarted("batch", b))
         for m_block_iter in range(M_blocks_per_core):
-            print(f"--------------------------------")
-            print(f"m_block_iter: {m_block_iter} started")
+            if sinks:
+                tile_trace.emit(LoopLevelStarted("m_block_iter", m_block_iter))
             for chunk_idx in range(chunks_per_mm_N_block):
-                print(f"chunk_idx: {chunk_idx} started")
+                if sinks:
+                    tile_trace.emit(LoopLevelStarted("chunk_idx", chunk_idx))
                 slice_idx = my_chip_id - 1 if direction == 1 else my_chip_id + 1
                 for i in range(ring_size):
-                    print(f"************************************************")
-                    print(f"ring iteration: {i} started")
-                    print(f"slice_idx: {slice_idx}")
-                    print(f"direction: {direction}")
                     if direction == 1:
                         actual_slice_idx = slice_idx + ring_size if slice_idx < 0 else slice_idx
                     else:
                         actual_slice_idx = slice_idx - ring_size if slice_idx >= ring_size else slice_idx
-                    
-                    print(f"actual_slice_idx: {actual_slice_idx}, m_block_iter: {m_block_iter}, chunk_idx: {chunk_idx}")
+                    if sinks:
+                        tile_trace.emit(RingIterationStarted(
+                            i, slice_idx, direction, actual_slice_idx, m_block_iter, chunk_idx
+                        ))
+
                     first_tile_row_in_mm_M_block = 0
                     first_chunk_col_in_tiles = 0
                     first_mm_core_idx = 0
                     for chunk_piece_idx in range(mm_N_blocks_per_slice):
-                        print(f"chunk_piece_idx: {chunk_piece_idx} started")
+                        if sinks:
+                            tile_trace.emit(LoopLevelStarted("chunk_piece_idx", chunk_piece_idx))
                         iteration_id = (b, m_block_iter, chunk_idx, chunk_piece_idx)
-                        slice_idxs, global_idxs = read_tiles_granular_with_direction_based_on_num_workers(
+                        read_kwargs = dict(
                             worker_id=worker_id,
                             start_tile_row_in_mm_M_block=first_tile_row_in_mm_M_block,
                             start_chunk_col_in_tiles=first_chunk_col_in_tiles,
@@ -76,18 +89,160 @@ def get_iteration_history(
                             slice_actual_idx=actual_slice_idx,
                             global_Wt=global_Wt,
                         )
-                        iteration_history.append((iteration_id, slice_idxs, global_idxs))
-                        print(f"chunk_piece_idx: {chunk_piece_idx} done")
+                        yield iteration_id, i, read_kwargs
+                        if sinks:
+                            tile_trace.emit(LoopLevelDone("chunk_piece_idx", chunk_piece_idx))
                     if direction == 1:
                         slice_idx = slice_idx - 1
                     else:
                         slice_idx = slice_idx + 1
-                    print(f"ring iteration: {i} done")
-                print(f"chunk_idx: {chunk_idx} done")
-            print(f"m_block_iter: {m_block_iter} done")
-        print(f"batch: {b} done")
+                    if sinks:
+                        tile_trace.emit(RingIterationDone(i))
+                if sinks:
+                    tile_trace.emit(LoopLevelDone("chunk_idx", chunk_idx))
+            if sinks:
+                tile_trace.emit(LoopLevelDone("m_block_iter", m_block_iter))
+        if sinks:
+            tile_trace.emit(LoopLevelDone("batch", b))
+
+
+def iter_iteration_history(
+    batch_size: int,
+    M_blocks_per_core: int,
+    chunks_per_mm_N_block: int,
+    my_chip_id: int,
+    direction: int,
+    ring_size: int,
+    mm_N_blocks_per_slice: int,
+    worker_id: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    num_workers: int,
+    mm_block_unit_ht: int,
+    chunk_width: int,
+    N_block_wt: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    read_tiles_fn=read_tiles_granular_with_direction_based_on_num_workers,
+):
+    """
+    Generator version of get_iteration_history.
+    Yields one (iteration_id, slice_idxs, global_idxs) record at a time, so the
+    schedule can be consumed in constant memory.
+    read_tiles_fn may be swapped for any function with the signature of
+    read_tiles_granular_with_direction_based_on_num_workers.
+    """
+    for iteration_id, _, read_kwargs in iter_iteration_params(
+        batch_size=batch_size,
+        M_blocks_per_core=M_blocks_per_core,
+        chunks_per_mm_N_block=chunks_per_mm_N_block,
+        my_chip_id=my_chip_id,
+        direction=direction,
+        ring_size=ring_size,
+        mm_N_blocks_per_slice=mm_N_blocks_per_slice,
+        worker_id=worker_id,
+        last_mm_core_idx=last_mm_core_idx,
+        tile_granularity=tile_granularity,
+        num_workers=num_workers,
+        mm_block_unit_ht=mm_block_unit_ht,
+        chunk_width=chunk_width,
+        N_block_wt=N_block_wt,
+        tiles_ht_per_core=tiles_ht_per_core,
+        slice_Wt=slice_Wt,
+    ):
+        slice_idxs, global_idxs = read_tiles_fn(**read_kwargs)
+        yield iteration_id, slice_idxs, global_idxs
+
+
+def iter_iteration_history_steps(
+    batch_size: int,
+    M_blocks_per_core: int,
+    chunks_per_mm_N_block: int,
+    my_chip_id: int,
+    direction: int,
+    ring_size: int,
+    mm_N_blocks_per_slice: int,
+    worker_id: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    num_workers: int,
+    mm_block_unit_ht: int,
+    chunk_width: int,
+    N_block_wt: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    read_tiles_fn=read_tiles_granular_with_direction_based_on_num_workers,
+):
+    """
+    Generator version of get_iteration_history at granularity-step resolution.
+    Yields (iteration_id, step_idx, step_slice_idxs, step_global_idxs) for every
+    granularity step of every record.
+    """
+    for iteration_id, slice_idxs, global_idxs in iter_iteration_history(
+        batch_size=batch_size,
+        M_blocks_per_core=M_blocks_per_core,
+        chunks_per_mm_N_block=chunks_per_mm_N_block,
+        my_chip_id=my_chip_id,
+        direction=direction,
+        ring_size=ring_size,
+        mm_N_blocks_per_slice=mm_N_blocks_per_slice,
+        worker_id=worker_id,
+        last_mm_core_idx=last_mm_core_idx,
+        tile_granularity=tile_granularity,
+        num_workers=num_workers,
+        mm_block_unit_ht=mm_block_unit_ht,
+        chunk_width=chunk_width,
+        N_block_wt=N_block_wt,
+        tiles_ht_per_core=tiles_ht_per_core,
+        slice_Wt=slice_Wt,
+        read_tiles_fn=read_tiles_fn,
+    ):
+        for step_idx, (step_slice_idxs, step_global_idxs) in enumerate(zip(slice_idxs, global_idxs)):
+            yield iteration_id, step_idx, step_slice_idxs, step_global_idxs
+
 
-    return iteration_history
+@timed(count_history)
+def get_iteration_history(
+    batch_size: int,
+    M_blocks_per_core: int,
+    chunks_per_mm_N_block: int,
+    my_chip_id: int,
+    direction: int,
+    ring_size: int,
+    mm_N_blocks_per_slice: int,
+    worker_id: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    num_workers: int,
+    mm_block_unit_ht: int,
+    chunk_width: int,
+    N_block_wt: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+):
+    """
+    Computes iteration history by iterating through batches, M blocks, chunks,
+    ring iterations, and chunk pieces, calling read_tiles_granular_with_direction_based_on_num_workers
+    for each combination.
+    """
+    return list(iter_iteration_history(
+        batch_size=batch_size,
+        M_blocks_per_core=M_blocks_per_core,
+        chunks_per_mm_N_block=chunks_per_mm_N_block,
+        my_chip_id=my_chip_id,
+        direction=direction,
+        ring_size=ring_size,
+        mm_N_blocks_per_slice=mm_N_blocks_per_slice,
+        worker_id=worker_id,
+        last_mm_core_idx=last_mm_core_idx,
+        tile_granularity=tile_granularity,
+        num_workers=num_workers,
+        mm_block_unit_ht=mm_block_unit_ht,
+        chunk_width=chunk_width,
+        N_block_wt=N_block_wt,
+        tiles_ht_per_core=tiles_ht_per_core,
+        slice_Wt=slice_Wt,
+    ))
 
 
 if __name__ == "__main__":
@@ -251,6 +406,8 @@ if __name__ == "__main__":
     print(f"effective_worker_id: {effective_worker_id}")
     print(f"effective_advance_by_tiles: {effective_advance_by_tiles}")
 
+    tile_trace.add_sink(tile_trace.TextSink())
+
     # Get iteration history using the function
     iteration_history = get_iteration_history(
         batch_size=batch_size,
@@ -0,0 +1,168 @@
+import asyncio
+import itertools
+import selectors
+from dataclasses import dataclass, field
+
+from stride_idx_fns import read_tiles_granular_with_direction_based_on_num_workers
+
+
+class _VirtualClockSelector(selectors.SelectSelector):
+    """Selector that jumps the virtual clock to the next timer instead of waiting."""
+
+    def __init__(self):
+        super().__init__()
+        self.now = 0.0
+
+    def select(self, timeout=None):
+        if timeout is not None and timeout > 0:
+            self.now += timeout
+            timeout = 0
+        return super().select(timeout)
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop on a discrete-event clock: asyncio.sleep advances loop.time()
+    by exactly the requested delay without waiting, so modeled latencies, not
+    the host, determine every reported time.
+    """
+
+    def __init__(self):
+        self._clock = _VirtualClockSelector()
+        super().__init__(self._clock)
+
+    def time(self) -> float:
+        return self._clock.now
+
+
+@dataclass
+class DmaConfig:
+    """
+    Mock pipeline parameters.
+    queue_depth: granularity steps each circular buffer holds (2 = double buffering)
+    produce_latency_per_tile: time a producer needs to make a tile available
+    step_latency, tile_latency: DMA cost of a step of n tiles is
+        step_latency + n * tile_latency
+    num_engines: DMA engines shared by all streams
+    All times are in seconds of the virtual clock.
+    """
+    queue_depth: int = 2
+    produce_latency_per_tile: float = 0.0
+    step_latency: float = 0.0
+    tile_latency: float = 0.0
+    num_engines: int = 1
+
+
+@dataclass
+class StreamStats:
+    """Counters of one (direction, worker_id) stream."""
+    steps: int = 0
+    tiles: int = 0
+    producer_stalls: int = 0  # puts that found the buffer full
+    producer_stall_seconds: float = 0.0
+    consumer_stalls: int = 0  # gets that found the buffer empty
+    consumer_stall_seconds: float = 0.0
+    high_water: int = 0  # most steps buffered at once
+
+
+@dataclass
+class DmaReport:
+    elapsed_seconds: float
+    streams: dict[tuple[int, int], StreamStats] = field(default_factory=dict)
+
+    @property
+    def tiles(self) -> int:
+        return sum(stats.tiles for stats in self.streams.values())
+
+    @property
+    def tiles_per_second(self) -> float:
+        return self.tiles / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    @property
+    def producer_stalls(self) -> int:
+        return sum(stats.producer_stalls for stats in self.streams.values())
+
+    @property
+    def consumer_stalls(self) -> int:
+        return sum(stats.consumer_stalls for stats in self.streams.values())
+
+
+async def _produce(steps: list, queue: asyncio.Queue, stats: StreamStats, dma_config: DmaConfig) -> None:
+    loop = asyncio.get_running_loop()
+    for step in steps:
+        if dma_config.produce_latency_per_tile > 0:
+            await asyncio.sleep(len(step) * dma_config.produce_latency_per_tile)
+        if queue.full():
+            stats.producer_stalls += 1
+            start = loop.time()
+            await queue.put(step)
+            stats.producer_stall_seconds += loop.time() - start
+        else:
+            queue.put_nowait(step)
+        stats.high_water = max(stats.high_water, queue.qsize())
+    await queue.put(None)
+
+
+async def _consume(queue: asyncio.Queue, engines: asyncio.Semaphore, stats: StreamStats,
+                   dma_config: DmaConfig) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        if queue.empty():
+            start = loop.time()
+            step = await queue.get()
+            # Waiting for the end marker is not a stall
+            if step is not None:
+                stats.consumer_stalls += 1
+                stats.consumer_stall_seconds += loop.time() - start
+        else:
+            step = queue.get_nowait()
+        if step is None:
+            return
+        async with engines:
+            await asyncio.sleep(dma_config.step_latency + len(step) * dma_config.tile_latency)
+        stats.steps += 1
+        stats.tiles += len(step)
+
+
+async def simulate_dma(read_kwargs: dict, num_workers: int, dma_config: DmaConfig) -> DmaReport:
+    """
+    Stream the granularity steps of every worker and direction of one
+    read_tiles_granular_with_direction_based_on_num_workers configuration
+    through bounded queues into the mock DMA engines.
+    read_kwargs are that function's arguments without worker_id, direction
+    and num_workers.
+    """
+    if dma_config.queue_depth <= 0:
+        raise ValueError("queue_depth must be greater than 0")
+    if dma_config.num_engines <= 0:
+        raise ValueError("num_engines must be greater than 0")
+
+    engines = asyncio.Semaphore(dma_config.num_engines)
+    report = DmaReport(elapsed_seconds=0.0)
+    tasks = []
+    for direction, worker_id in itertools.product([0, 1], range(num_workers)):
+        _, global_idxs = read_tiles_granular_with_direction_based_on_num_workers(
+            worker_id=worker_id, direction=direction, num_workers=num_workers, **read_kwargs
+        )
+        stats = report.streams[(direction, worker_id)] = StreamStats()
+        queue = asyncio.Queue(maxsize=dma_config.queue_depth)
+        tasks.append(_produce(global_idxs, queue, stats, dma_config))
+        tasks.append(_consume(queue, engines, stats, dma_config))
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.gather(*tasks)
+    report.elapsed_seconds = loop.time() - start
+    return report
+
+
+def run_mock_dma(read_kwargs: dict, num_workers: int, dma_config: DmaConfig = None) -> DmaReport:
+    """
+    Run simulate_dma on a VirtualTimeEventLoop; the report is deterministic
+    for a given configuration.
+    """
+    loop = VirtualTimeEventLoop()
+    try:
+        return loop.run_until_complete(simulate_dma(read_kwargs, num_workers, dma_config or DmaConfig()))
+    finally:
+        loop.close()
@@ -0,0 +1,219 @@
+import contextlib
+import functools
+import sys
+import time
+import types
+from collections import Counter
+
+import tile_trace
+from tile_trace import LoopLevelDone, LoopLevelStarted, RingIterationDone, RingIterationStarted
+
+
+# Functions registered by counted and timed: fn -> (kind, count_tiles).
+# The decorators return fn itself, so nothing is paid outside profiling().
+# profiling() rebinds the module globals and function defaults that refer to
+# fn to a counting wrapper, and binds them back on exit.
+_registry = {}
+_TIMED, _COUNTED = "timed", "counted"
+
+# Profile collecting counters, or None
+active = None
+
+
+def _function_name(fn) -> str:
+    return f"{fn.__module__}.{fn.__name__}"
+
+
+def count_step_lists(result) -> int:
+    return sum(len(step) for step in result[0])
+
+
+def count_flat_array(result) -> int:
+    return len(result[0])
+
+
+def count_runs(result) -> int:
+    return sum(count for step in result[0] for _, _, count in step)
+
+
+def count_history(result) -> int:
+    return sum(len(step) for _, slice_idxs, _ in result for step in slice_idxs)
+
+
+def _register(fn, kind: str, count_tiles=None):
+    _registry[fn] = (kind, count_tiles)
+    return fn
+
+
+def counted(fn):
+    """Decorator for hot helpers: only calls are counted."""
+    return _register(fn, _COUNTED)
+
+
+def timed(count_tiles=None):
+    """
+    Decorator for generators: calls are counted and timed, and the tiles they
+    return are counted with count_tiles(result) when given.
+    """
+    return lambda fn: _register(fn, _TIMED, count_tiles)
+
+
+def _is_profiled(value, wrappers: dict) -> bool:
+    return isinstance(value, types.FunctionType) and value in wrappers
+
+
+def _bind_wrappers(wrappers: dict, swapped_globals: list, swapped_defaults: list) -> None:
+    """
+    Rebind every module global and module-level function default that refers
+    to a profiled function to its wrapper, recording the (namespace, name, fn)
+    globals and (fn, defaults) defaults to put back.
+    """
+    for module in list(sys.modules.values()):
+        namespace = getattr(module, "__dict__", None)
+        if not isinstance(namespace, dict):
+            continue
+        for name, value in list(namespace.items()):
+            if not isinstance(value, types.FunctionType):
+                continue
+            defaults = value.__defaults__
+            if defaults and any(_is_profiled(default, wrappers) for default in defaults):
+                swapped_defaults.append((value, defaults))
+                value.__defaults__ = tuple(
+                    wrappers[default] if _is_profiled(default, wrappers) else default for default in defaults
+                )
+            if value in wrappers:
+                swapped_globals.append((namespace, name, value))
+                namespace[name] = wrappers[value]
+
+
+def _counted(fn, profile: "Profile"):
+    name = _function_name(fn)
+    calls = profile.calls
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        calls[name] += 1
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def _timed(fn, count_tiles, profile: "Profile"):
+    name = _function_name(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile.calls[name] += 1
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            profile.seconds[name] += time.perf_counter() - start
+        if count_tiles is not None:
+            profile.tiles[name] += count_tiles(result)
+        return result
+    return wrapper
+
+
+class Profile:
+    """
+    Counters collected by profiling().
+    calls[name]: number of calls
+    seconds[name]: inclusive wall time of timed functions
+    tiles[name]: tiles returned by timed functions
+    level_seconds[level]: inclusive wall time of get_iteration_history levels
+        (batch, m_block_iter, chunk_idx, ring_iteration, chunk_piece_idx)
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+        self.seconds = Counter()
+        self.tiles = Counter()
+        self.level_seconds = Counter()
+        self.level_calls = Counter()
+        self._level_starts = {}
+
+    def __call__(self, event) -> None:
+        """Trace sink timing the get_iteration_history levels."""
+        if isinstance(event, LoopLevelStarted):
+            self._level_starts[event.level] = time.perf_counter()
+        elif isinstance(event, LoopLevelDone):
+            self._level_done(event.level)
+        elif isinstance(event, RingIterationStarted):
+            self._level_starts["ring_iteration"] = time.perf_counter()
+        elif isinstance(event, RingIterationDone):
+            self._level_done("ring_iteration")
+
+    def _level_done(self, level: str) -> None:
+        self.level_seconds[level] += time.perf_counter() - self._level_starts.pop(level)
+        self.level_calls[level] += 1
+
+    def tiles_per_second(self, name: str) -> float:
+        seconds = self.seconds[name]
+        return self.tiles[name] / seconds if seconds > 0 else 0.0
+
+    def report(self) -> str:
+        """Text report: timed functions by time spent, then levels, then call counts."""
+        width = max([len(name) for name in self.calls] + [len("counted function")])
+        lines = [f"{'function':<{width}} {'calls':>10} {'seconds':>10} {'tiles':>10} {'tiles/s':>12}"]
+        for name, seconds in self.seconds.most_common():
+            lines.append(
+                f"{name:<{width}} {self.calls[name]:>10} {seconds:>10.4f} "
+                f"{self.tiles[name]:>10} {self.tiles_per_second(name):>12,.0f}"
+            )
+        if self.level_seconds:
+            lines.append("")
+            lines.append(f"{'level':<{width}} {'count':>10} {'seconds':>10}")
+            for level, seconds in self.level_seconds.most_common():
+                lines.append(f"{level:<{width}} {self.level_calls[level]:>10} {seconds:>10.4f}")
+        lines.append("")
+        lines.append(f"{'counted function':<{width}} {'calls':>10}")
+        for name, calls in self.calls.most_common():
+            if name not in self.seconds:
+                lines.append(f"{name:<{width}} {calls:>10}")
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def profiling(levels: bool = False):
+    """
+    Count and time the stride functions for the duration of a with block:
+
+        from loop_simulation import get_iteration_history
+        with profiling() as profile:
+            get_iteration_history(...)
+        print(profile.report())
+
+    The functions marked with counted and timed are replaced by counting
+    wrappers wherever a loaded module refers to them: module globals, which
+    covers from-imports, and defaults of module-level functions, such as
+    read_tiles_fn. References taken before entry anywhere else (locals,
+    closures, containers) keep calling the plain function. The rebinding is
+    process-wide and is not safe while other threads run the stride functions.
+    Everything is bound back on exit, also when the block raises.
+    levels=True also attaches a trace sink timing the get_iteration_history
+    levels; tracing makes the generators emit per-tile events, which inflates
+    their times, so it is off by default.
+    """
+    global active
+    if active is not None:
+        raise ValueError("profiling() is already active")
+    profile = Profile()
+    wrappers = {
+        fn: _timed(fn, count_tiles, profile) if kind == _TIMED else _counted(fn, profile)
+        for fn, (kind, count_tiles) in _registry.items()
+    }
+    active = profile
+    swapped_globals, swapped_defaults = [], []
+    try:
+        _bind_wrappers(wrappers, swapped_globals, swapped_defaults)
+        if levels:
+            tile_trace.add_sink(profile)
+        yield profile
+    finally:
+        if levels and profile in tile_trace.sinks:
+            tile_trace.remove_sink(profile)
+        for namespace, name, fn in swapped_globals:
+            namespace[name] = fn
+        for fn, defaults in swapped_defaults:
+            fn.__defaults__ = defaults
+        active = None
@@ -0,0 +1,65 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from schedule_templates import get_iteration_history_from_templates
+
+
+def _get_schedule(key_and_kwargs):
+    """Worker entry point: compute one (my_chip_id, direction, worker_id) schedule."""
+    key, kwargs = key_and_kwargs
+    my_chip_id, direction, worker_id = key
+    return key, get_iteration_history_from_templates(
+        my_chip_id=my_chip_id, direction=direction, worker_id=worker_id, **kwargs
+    )
+
+
+def get_ring_schedules(
+    batch_size: int,
+    M_blocks_per_core: int,
+    chunks_per_mm_N_block: int,
+    ring_size: int,
+    mm_N_blocks_per_slice: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    num_workers: int,
+    mm_block_unit_ht: int,
+    chunk_width: int,
+    N_block_wt: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    max_workers: int = None,
+) -> dict[tuple[int, int, int], list]:
+    """
+    Computes the iteration history of every my_chip_id x direction x worker_id
+    combination on a process pool.
+    Returns a dict keyed by (my_chip_id, direction, worker_id).
+    max_workers=1 runs in the calling process.
+    """
+    kwargs = dict(
+        batch_size=batch_size,
+        M_blocks_per_core=M_blocks_per_core,
+        chunks_per_mm_N_block=chunks_per_mm_N_block,
+        ring_size=ring_size,
+        mm_N_blocks_per_slice=mm_N_blocks_per_slice,
+        last_mm_core_idx=last_mm_core_idx,
+        tile_granularity=tile_granularity,
+        num_workers=num_workers,
+        mm_block_unit_ht=mm_block_unit_ht,
+        chunk_width=chunk_width,
+        N_block_wt=N_block_wt,
+        tiles_ht_per_core=tiles_ht_per_core,
+        slice_Wt=slice_Wt,
+    )
+    tasks = [
+        (key, kwargs)
+        for key in itertools.product(range(ring_size), [0, 1], range(num_workers))
+    ]
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers == 1:
+        return dict(map(_get_schedule, tasks))
+
+    chunksize = max(1, len(tasks) // (4 * max_workers))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return dict(executor.map(_get_schedule, tasks, chunksize=chunksize))
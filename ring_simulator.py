@@ -0,0 +1,119 @@
+import itertools
+from dataclasses import dataclass
+
+import numpy as np
+
+from schedule_templates import ScheduleTemplateCache
+
+
+def ring_slice_order(my_chip_id: int, direction: int, ring_size: int) -> np.ndarray:
+    """
+    actual_slice_idx of every ring iteration of a chip; modular form of the
+    slice_idx wrap in iter_iteration_params.
+    """
+    if direction not in [0, 1]:
+        raise ValueError("direction must be 0 or 1")
+    ring_steps = np.arange(1, ring_size + 1)
+    if direction == 1:
+        return (my_chip_id - ring_steps) % ring_size
+    return (my_chip_id + ring_steps) % ring_size
+
+
+@dataclass
+class RingTimeline:
+    """
+    Link occupancy of the whole ring.
+    Links are identified by (receiving chip, direction). Slot s covers one
+    granularity step of one (iteration, ring_iteration, chunk_piece_idx), with
+    all chips in lock step; a chunk piece lasts as many slots as its longest
+    worker.
+    slots[s]: ((b, m_block_iter, chunk_idx), ring_iteration, chunk_piece_idx, step_idx)
+    tiles[s, chip, direction]: tiles received on the link, summed over workers
+    slice_ids[s, chip, direction]: slice carried, -1 when the link is idle
+    A chip's schedule depends on the chip only through the slice it carries, so
+    every chip has the same tile counts in a slot; load differences show up
+    across slots and directions, not across chips.
+    """
+    slots: list[tuple[tuple[int, int, int], int, int, int]]
+    tiles: np.ndarray
+    slice_ids: np.ndarray
+
+    def link_totals(self) -> np.ndarray:
+        """Tiles per link over the whole timeline, shape (ring_size, 2)."""
+        return self.tiles.sum(axis=0)
+
+    def busy_fraction(self) -> np.ndarray:
+        """Fraction of slots in which each link carries tiles, shape (ring_size, 2)."""
+        if len(self.slots) == 0:
+            return np.zeros(self.tiles.shape[1:])
+        return (self.tiles > 0).mean(axis=0)
+
+
+def simulate_ring(
+    batch_size: int,
+    M_blocks_per_core: int,
+    chunks_per_mm_N_block: int,
+    ring_size: int,
+    mm_N_blocks_per_slice: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    num_workers: int,
+    mm_block_unit_ht: int,
+    chunk_width: int,
+    N_block_wt: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+) -> RingTimeline:
+    """
+    Run every chip, direction and worker of the ring together and record the
+    tiles each link carries per ring iteration and granularity step.
+    Tile counts come from the per-worker templates, so slice_Wt only matters
+    through the templates' geometry.
+    """
+    if ring_size <= 0:
+        raise ValueError("ring_size must be greater than 0")
+    chunk_width_in_tiles = chunk_width * mm_block_unit_ht
+    caches = {
+        (direction, worker_id): ScheduleTemplateCache(
+            worker_id, direction, num_workers, last_mm_core_idx, tile_granularity,
+            mm_block_unit_ht, chunk_width_in_tiles, N_block_wt, tiles_ht_per_core
+        )
+        for direction, worker_id in itertools.product([0, 1], range(num_workers))
+    }
+    # slice_orders[ring_iteration, chip, direction]
+    slice_orders = np.stack([
+        np.stack([ring_slice_order(chip, direction, ring_size) for direction in [0, 1]], axis=1)
+        for chip in range(ring_size)
+    ], axis=1)
+
+    slots = []
+    tiles_blocks = []
+    slice_id_blocks = []
+    for b, m_block_iter, chunk_idx in itertools.product(
+        range(batch_size), range(M_blocks_per_core), range(chunks_per_mm_N_block)
+    ):
+        for ring_iteration in range(ring_size):
+            for chunk_piece_idx in range(mm_N_blocks_per_slice):
+                tiles_per_step = {
+                    key: np.diff(cache.get(chunk_idx, chunk_piece_idx).step_offsets)
+                    for key, cache in caches.items()
+                }
+                num_steps = max(len(steps) for steps in tiles_per_step.values())
+                # Every chip runs the same chunk piece; only the slice differs
+                block = np.zeros((num_steps, 2), dtype=np.int64)
+                for (direction, _), steps in tiles_per_step.items():
+                    block[:len(steps), direction] += steps
+                block = np.broadcast_to(block[:, None, :], (num_steps, ring_size, 2))
+                tiles_blocks.append(block)
+                slice_id_blocks.append(
+                    np.where(block > 0, slice_orders[ring_iteration][None, :, :], -1)
+                )
+                slots.extend(
+                    ((b, m_block_iter, chunk_idx), ring_iteration, chunk_piece_idx, step_idx)
+                    for step_idx in range(num_steps)
+                )
+
+    if not slots:
+        empty = np.zeros((0, ring_size, 2), dtype=np.int64)
+        return RingTimeline(slots, empty, empty.copy())
+    return RingTimeline(slots, np.concatenate(tiles_blocks), np.concatenate(slice_id_blocks))
@@ -0,0 +1,267 @@
+"""
+Command-line schedule generator.
+
+    python schedule_cli.py history --config shape.json --format csv -o schedule.csv
+    python schedule_cli.py generator --mm-block-unit-ht 4 --num-workers 2 --format jsonl
+
+Parameters come from a flat JSON object (--config) and/or flags; flags win.
+GridConfig fields fill in any get_iteration_history geometry not given
+explicitly. Output is streamed record by record:
+    jsonl   one object per granularity step
+    csv     one row per tile
+    binary  one row per tile of little-endian int64 columns, in csv column order
+"""
+import argparse
+import csv
+import json
+import sys
+
+import numpy as np
+
+from config import GridConfig
+from loop_simulation import iter_iteration_params
+from stride_idx_vec_fns import read_tiles_granular_with_direction_based_on_num_workers_arrays
+
+
+GRID_FIELDS = (
+    "mm_block_unit_wt", "mm_blocks_per_N_block", "chunk_width_in_mm_units",
+    "mm_block_unit_ht", "mm_M_unit_blocks_per_core", "mm_N_blocks_per_slice",
+    "ring_size", "N_block_idx", "M_block_idx", "slice_actual_idx",
+)
+# GridConfig fields that only place a single generator call; the history loop
+# derives them itself
+GENERATOR_ONLY_GRID_FIELDS = ("N_block_idx", "M_block_idx", "slice_actual_idx")
+HISTORY_GRID_FIELDS = tuple(name for name in GRID_FIELDS if name not in GENERATOR_ONLY_GRID_FIELDS)
+# get_iteration_history arguments that are not GridConfig fields
+HISTORY_GEOMETRY_FIELDS = (
+    "M_blocks_per_core", "chunks_per_mm_N_block", "chunk_width",
+    "N_block_wt", "tiles_ht_per_core", "slice_Wt",
+)
+HISTORY_LOOP_DEFAULTS = dict(
+    batch_size=1, my_chip_id=0, direction=0, worker_id=0,
+    last_mm_core_idx=0, tile_granularity=8, num_workers=1,
+)
+GENERATOR_LOOP_DEFAULTS = dict(
+    worker_id=0, start_tile_row_in_mm_M_block=0, start_chunk_col_in_tiles=0,
+    start_mm_core_idx=0, last_mm_core_idx=0, tile_granularity=8, chunk_idx=0,
+    direction=0, num_workers=1,
+)
+
+HISTORY_COLUMNS = (
+    "batch", "m_block_iter", "chunk_idx", "chunk_piece_idx", "ring_iteration",
+    "step_idx", "slice_idx", "global_idx",
+)
+GENERATOR_COLUMNS = ("step_idx", "slice_idx", "global_idx")
+
+FORMATS = ("jsonl", "csv", "binary")
+
+
+def _check_positive(params: dict, names) -> None:
+    for name in names:
+        if params[name] <= 0:
+            raise ValueError(f"{name} must be greater than 0")
+
+
+def _check_non_negative(params: dict, names) -> None:
+    for name in names:
+        if params[name] < 0:
+            raise ValueError(f"{name} must not be negative")
+
+
+def _check_loop_params(params: dict) -> None:
+    """Checks shared by the history and generator parameters."""
+    _check_positive(params, ("tile_granularity", "num_workers", "mm_block_unit_ht"))
+    _check_non_negative(params, ("last_mm_core_idx",))
+    if params["direction"] not in [0, 1]:
+        raise ValueError("direction must be 0 or 1")
+    if not 0 <= params["worker_id"] < params["num_workers"]:
+        raise ValueError("worker_id must be in [0, num_workers)")
+
+
+def history_params(params: dict) -> dict:
+    """
+    get_iteration_history arguments from a flat parameter dict. Geometry not
+    given explicitly is derived from the GridConfig fields present; a chunk
+    width that is not a whole number of mm_block_unit_ht must be given as
+    chunk_width.
+    """
+    cfg = GridConfig(**{name: params[name] for name in GRID_FIELDS if name in params})
+    resolved = {name: params.get(name, default) for name, default in HISTORY_LOOP_DEFAULTS.items()}
+    resolved.update(
+        M_blocks_per_core=params.get("M_blocks_per_core", cfg.mm_M_unit_blocks_per_core),
+        ring_size=cfg.ring_size,
+        mm_N_blocks_per_slice=cfg.mm_N_blocks_per_slice,
+        mm_block_unit_ht=cfg.mm_block_unit_ht,
+        N_block_wt=params.get("N_block_wt", cfg.N_block_wt),
+        tiles_ht_per_core=params.get("tiles_ht_per_core", cfg.tiles_ht_per_core),
+        slice_Wt=params.get("slice_Wt", cfg.slice_Wt),
+    )
+    resolved["chunk_width"] = (
+        params["chunk_width"] if "chunk_width" in params else cfg.history_chunk_width()
+    )
+    chunk_width_in_tiles = resolved["chunk_width"] * resolved["mm_block_unit_ht"]
+    resolved["chunks_per_mm_N_block"] = params.get(
+        "chunks_per_mm_N_block", -(-resolved["N_block_wt"] // chunk_width_in_tiles)
+    )
+    _check_loop_params(resolved)
+    _check_positive(resolved, ("ring_size", "chunk_width", "N_block_wt", "tiles_ht_per_core", "slice_Wt"))
+    _check_non_negative(resolved, (
+        "batch_size", "M_blocks_per_core", "chunks_per_mm_N_block", "mm_N_blocks_per_slice",
+    ))
+    if not 0 <= resolved["my_chip_id"] < resolved["ring_size"]:
+        raise ValueError("my_chip_id must be in [0, ring_size)")
+    return resolved
+
+
+def generator_params(params: dict) -> dict:
+    """read_tiles_granular_with_direction_based_on_num_workers arguments from a flat parameter dict."""
+    cfg = GridConfig(**{name: params[name] for name in GRID_FIELDS if name in params})
+    loop_params = {name: params.get(name, default) for name, default in GENERATOR_LOOP_DEFAULTS.items()}
+    resolved = dict(
+        **loop_params,
+        mm_block_unit_ht=cfg.mm_block_unit_ht,
+        chunk_width_in_tiles=cfg.chunk_width_in_tiles,
+        N_block_wt=cfg.N_block_wt,
+        N_block_idx=cfg.N_block_idx,
+        M_block_idx=cfg.M_block_idx,
+        tiles_ht_per_core=cfg.tiles_ht_per_core,
+        slice_Wt=cfg.slice_Wt,
+        slice_actual_idx=cfg.slice_actual_idx,
+        global_Wt=cfg.global_Wt,
+    )
+    _check_loop_params(resolved)
+    _check_positive(resolved, ("chunk_width_in_tiles", "N_block_wt", "tiles_ht_per_core", "slice_Wt"))
+    _check_non_negative(resolved, (
+        "start_tile_row_in_mm_M_block", "start_chunk_col_in_tiles", "start_mm_core_idx", "chunk_idx",
+        "N_block_idx", "M_block_idx", "slice_actual_idx",
+    ))
+    if resolved["start_mm_core_idx"] > resolved["last_mm_core_idx"]:
+        raise ValueError("start_mm_core_idx must not be greater than last_mm_core_idx")
+    if resolved["chunk_idx"] * resolved["chunk_width_in_tiles"] >= resolved["N_block_wt"]:
+        raise ValueError("chunk_idx is past the end of the N block")
+    return resolved
+
+
+def _record_rows(prefix: tuple, slice_idxs: np.ndarray, global_idxs: np.ndarray,
+                 step_offsets: np.ndarray) -> np.ndarray:
+    """(num_tiles, len(prefix) + 3) int64 rows: prefix columns, step_idx, slice_idx, global_idx."""
+    step_idx = np.repeat(np.arange(len(step_offsets) - 1, dtype=np.int64), np.diff(step_offsets))
+    rows = np.empty((len(slice_idxs), len(prefix) + 3), dtype=np.int64)
+    rows[:, :len(prefix)] = prefix
+    rows[:, -3] = step_idx
+    rows[:, -2] = slice_idxs
+    rows[:, -1] = global_idxs
+    return rows
+
+
+def iter_history_records(params: dict):
+    """Yield (prefix, slice_idxs, global_idxs, step_offsets) per get_iteration_history record."""
+    for iteration_id, ring_iteration, read_kwargs in iter_iteration_params(**params):
+        yield ((*iteration_id, ring_iteration),
+               *read_tiles_granular_with_direction_based_on_num_workers_arrays(**read_kwargs))
+
+
+def iter_generator_records(params: dict):
+    """Yield the single generator record in the iter_history_records form."""
+    yield ((), *read_tiles_granular_with_direction_based_on_num_workers_arrays(**params))
+
+
+def write_records(records, columns: tuple, fmt: str, out) -> int:
+    """
+    Stream records to a binary file object in the given format.
+    Returns the number of tiles written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    num_prefix = len(columns) - 3
+    num_tiles = 0
+    if fmt == "csv":
+        text = _TextWriter(out)
+        writer = csv.writer(text, lineterminator="\n")
+        writer.writerow(columns)
+    for prefix, slice_idxs, global_idxs, step_offsets in records:
+        num_tiles += len(slice_idxs)
+        if fmt == "jsonl":
+            bounds = step_offsets.tolist()
+            slice_list = slice_idxs.tolist()
+            global_list = global_idxs.tolist()
+            for s in range(len(bounds) - 1):
+                line = dict(zip(columns[:num_prefix], prefix))
+                line.update(step_idx=s,
+                            slice_idxs=slice_list[bounds[s]:bounds[s + 1]],
+                            global_idxs=global_list[bounds[s]:bounds[s + 1]])
+                out.write(json.dumps(line).encode() + b"\n")
+            continue
+        rows = _record_rows(prefix, slice_idxs, global_idxs, step_offsets)
+        if fmt == "csv":
+            writer.writerows(rows.tolist())
+        else:
+            out.write(rows.astype("<i8").tobytes())
+    return num_tiles
+
+
+class _TextWriter:
+    """Minimal text adapter so csv.writer can write to a binary stream."""
+
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, text: str) -> None:
+        self.out.write(text.encode())
+
+
+def _add_param_flags(parser: argparse.ArgumentParser, names) -> None:
+    for name in names:
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int, default=None)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate tile schedules.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    history = subparsers.add_parser("history", help="run get_iteration_history")
+    generator = subparsers.add_parser(
+        "generator", help="run read_tiles_granular_with_direction_based_on_num_workers once"
+    )
+    _add_param_flags(history, HISTORY_GRID_FIELDS + tuple(HISTORY_LOOP_DEFAULTS) + HISTORY_GEOMETRY_FIELDS)
+    _add_param_flags(generator, GRID_FIELDS + tuple(GENERATOR_LOOP_DEFAULTS))
+    for subparser in (history, generator):
+        subparser.add_argument("--config", help="JSON file with a flat object of parameters")
+        subparser.add_argument("--format", choices=FORMATS, default="jsonl")
+        subparser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    params = {}
+    if args.config:
+        with open(args.config) as f:
+            params = json.load(f)
+    known = {action.dest for action in (history if args.command == "history" else generator)._actions}
+    unknown = set(params) - known
+    if unknown:
+        parser.error(f"unknown parameters in {args.config}: {sorted(unknown)}")
+    params.update({
+        name: value for name, value in vars(args).items()
+        if value is not None and name not in ("command", "config", "format", "output")
+    })
+
+    # Every parameter is checked here, before any output is written
+    try:
+        if args.command == "history":
+            records = iter_history_records(history_params(params))
+            columns = HISTORY_COLUMNS
+        else:
+            records = iter_generator_records(generator_params(params))
+            columns = GENERATOR_COLUMNS
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.output:
+        with open(args.output, "wb") as out:
+            write_records(records, columns, args.format, out)
+    else:
+        write_records(records, columns, args.format, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+import dataclasses
+import fcntl
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+import config
+import tile_trace
+from loop_simulation import get_iteration_history
+from stride_idx_fns import (
+    read_tiles_granular,
+    read_tiles_granular_with_direction,
+    read_tiles_granular_with_direction_based_on_num_workers,
+)
+from stride_idx_vec_fns import (
+    emit_step_events,
+    read_tiles_granular_with_direction_based_on_num_workers_vec,
+)
+
+
+# Bump whenever a cached function's output changes, so old entries stop matching
+ALGORITHM_VERSION = 1
+
+# Functions the cache can front, by the shape of what they return:
+# "history": list of (iteration_id, slice_idxs, global_idxs)
+# "steps": (slice_idxs, global_idxs)
+CACHEABLE_FUNCTIONS = {
+    get_iteration_history: "history",
+    read_tiles_granular: "steps",
+    read_tiles_granular_with_direction: "steps",
+    read_tiles_granular_with_direction_based_on_num_workers: "steps",
+    read_tiles_granular_with_direction_based_on_num_workers_vec: "steps",
+}
+
+# Errors np.load and _decode raise on a truncated or otherwise corrupt entry
+_CORRUPT_ENTRY_ERRORS = (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile)
+
+# Stored index dtypes, narrowest first
+_INDEX_DTYPES = (np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32, np.int64)
+
+_ENTRY_SUFFIX = ".npz"
+_LOCK_NAME = ".lock"
+
+
+def _narrowest(values: np.ndarray) -> np.ndarray:
+    """values in the smallest integer dtype that holds their range."""
+    low, high = (int(values.min()), int(values.max())) if values.size else (0, 0)
+    for dtype in _INDEX_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def _encode(records: list) -> dict[str, np.ndarray]:
+    """
+    Flatten (iteration_id, slice_idxs, global_idxs) records into arrays, each
+    in the narrowest integer dtype that fits it.
+    """
+    iteration_ids = np.array([iteration_id for iteration_id, _, _ in records], dtype=np.int64)
+    iteration_ids = iteration_ids.reshape(len(records), -1) if records else np.zeros((0, 4), dtype=np.int64)
+    steps_per_record = np.array([len(slice_idxs) for _, slice_idxs, _ in records], dtype=np.int64)
+    step_lengths = [len(step) for _, slice_idxs, _ in records for step in slice_idxs]
+    step_offsets = np.zeros(len(step_lengths) + 1, dtype=np.int64)
+    np.cumsum(step_lengths, out=step_offsets[1:])
+    num_tiles = int(step_offsets[-1])
+    slice_flat = np.fromiter(
+        (idx for _, slice_idxs, _ in records for step in slice_idxs for idx in step),
+        dtype=np.int64, count=num_tiles
+    )
+    global_flat = np.fromiter(
+        (idx for _, _, global_idxs in records for step in global_idxs for idx in step),
+        dtype=np.int64, count=num_tiles
+    )
+    arrays = dict(iteration_ids=iteration_ids,
+                  steps_per_record=steps_per_record, step_offsets=step_offsets,
+                  slice_idxs=slice_flat, global_idxs=global_flat)
+    return {name: _narrowest(values) for name, values in arrays.items()}
+
+
+def _decode(arrays) -> list:
+    """Inverse of _encode."""
+    bounds = arrays["step_offsets"].tolist()
+    slice_flat = arrays["slice_idxs"].tolist()
+    global_flat = arrays["global_idxs"].tolist()
+    records = []
+    step = 0
+    for iteration_id, num_steps in zip(arrays["iteration_ids"].tolist(),
+                                       arrays["steps_per_record"].tolist()):
+        records.append((
+            tuple(iteration_id),
+            [slice_flat[bounds[s]:bounds[s + 1]] for s in range(step, step + num_steps)],
+            [global_flat[bounds[s]:bounds[s + 1]] for s in range(step, step + num_steps)],
+        ))
+        step += num_steps
+    return records
+
+
+def _emit_trace_events(arrays) -> None:
+    """Replay the StepStarted and TileEmitted events of every encoded record."""
+    step_offsets = arrays["step_offsets"]
+    slice_flat = arrays["slice_idxs"]
+    global_flat = arrays["global_idxs"]
+    step = 0
+    for num_steps in arrays["steps_per_record"].tolist():
+        record_offsets = step_offsets[step:step + num_steps + 1]
+        start, end = record_offsets[0], record_offsets[-1]
+        emit_step_events(slice_flat[start:end], global_flat[start:end], record_offsets - start)
+        step += num_steps
+
+
+def _json_default(value):
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    raise TypeError(f"cannot hash argument of type {type(value).__name__}")
+
+
+class ScheduleDiskCache:
+    """
+    On-disk cache of schedule generator results.
+
+    Entries are compressed .npz files named by the sha256 of the function, every bound
+    argument and ALGORITHM_VERSION. Writes go to a temporary file that is
+    renamed into place, so readers in other processes never see partial
+    entries. Reads refresh an entry's mtime; when the directory grows past
+    max_bytes, the least recently used entries are removed under an exclusive
+    lock. Entries that cannot be read are removed and recomputed.
+
+    Hits replay the StepStarted and TileEmitted trace events of the cached
+    result when a sink is attached. The get_iteration_history level events
+    (LoopLevelStarted, RingIterationStarted, ...) are not stored, so hits do
+    not emit them.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than 0")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, fn, arguments: dict) -> str:
+        """Stable hash of a call."""
+        payload = json.dumps(
+            {"fn": f"{fn.__module__}.{fn.__name__}", "version": ALGORITHM_VERSION,
+             "arguments": arguments},
+            sort_keys=True, default=_json_default,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _bind(self, fn, args, kwargs) -> dict:
+        bound = inspect.signature(fn).bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        # Functions reading the global config are keyed by its current values
+        if "cfg_snapshot" in arguments and arguments["cfg_snapshot"] is None:
+            arguments["cfg_snapshot"] = config.cfg.snapshot()
+        return arguments
+
+    def call(self, fn, *args, **kwargs):
+        """Return fn(*args, **kwargs), from disk when an entry exists."""
+        kind = CACHEABLE_FUNCTIONS.get(fn)
+        if kind is None:
+            raise ValueError(f"{fn.__name__} is not a cacheable schedule function")
+        arguments = self._bind(fn, args, kwargs)
+        path = os.path.join(self.directory, self.key(fn, arguments) + _ENTRY_SUFFIX)
+
+        try:
+            with np.load(path) as arrays:
+                arrays = dict(arrays)
+            records = _decode(arrays)
+        except FileNotFoundError:
+            pass
+        except _CORRUPT_ENTRY_ERRORS:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        else:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            self.hits += 1
+            if tile_trace.sinks:
+                _emit_trace_events(arrays)
+            return records if kind == "history" else (records[0][1], records[0][2])
+
+        self.misses += 1
+        result = fn(**arguments)
+        records = result if kind == "history" else [((), *result)]
+        self._write(path, _encode(records))
+        self.evict()
+        return result
+
+    def _write(self, path: str, arrays: dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_ENTRY_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        with open(os.path.join(self.directory, _LOCK_NAME), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def clear(self) -> None:
+        with open(os.path.join(self.directory, _LOCK_NAME), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            for _, _, path in self._entries():
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,212 @@
+"""
+Binary schedule file for get_iteration_history output.
+
+Layout (little-endian):
+    header      magic, version, tile dtype size, GridConfig flag,
+                16 get_iteration_history parameters, 16 GridConfig fields,
+                counts and section offsets (fixed size, see HEADER_STRUCT)
+    tiles       (num_tiles, 2) int32 or int64: slice_idx, global_idx
+    step_offs   (num_steps + 1,) int64: tile offset of each granularity step
+    records     (num_records, 7) int64: batch, m_block_iter, chunk_idx,
+                chunk_piece_idx, ring_iteration, first_step, num_steps
+
+The loader maps the file with np.memmap, so any record can be sliced without
+parsing the rest.
+"""
+import struct
+from dataclasses import fields
+
+import numpy as np
+
+from config import GridConfig, GridConfigSnapshot
+from loop_simulation import HISTORY_PARAM_NAMES, iter_iteration_params
+from stride_idx_vec_fns import (
+    read_tiles_granular_with_direction_based_on_num_workers_arrays,
+    split_by_step_offsets,
+)
+
+
+MAGIC = b"STRDSCHD"
+VERSION = 1
+
+GRID_CONFIG_FIELD_NAMES = tuple(f.name for f in fields(GridConfigSnapshot))
+
+RECORD_COLUMNS = (
+    "batch", "m_block_iter", "chunk_idx", "chunk_piece_idx",
+    "ring_iteration", "first_step", "num_steps",
+)
+
+# magic, version, tile dtype size, has GridConfig, history params, GridConfig fields,
+# num_records, num_steps, num_tiles, tiles offset, step offsets offset, records offset
+HEADER_STRUCT = struct.Struct(
+    f"<8sIII{len(HISTORY_PARAM_NAMES)}q{len(GRID_CONFIG_FIELD_NAMES)}q6q"
+)
+# Keep the tile section 8-byte aligned
+HEADER_SIZE = (HEADER_STRUCT.size + 7) // 8 * 8
+
+
+def _pack_header(
+    tile_dtype_size: int,
+    history_params: dict,
+    cfg: GridConfig,
+    counts_and_offsets: tuple[int, ...]
+) -> bytes:
+    grid_values = (
+        [getattr(cfg, name) for name in GRID_CONFIG_FIELD_NAMES]
+        if cfg is not None else [0] * len(GRID_CONFIG_FIELD_NAMES)
+    )
+    header = HEADER_STRUCT.pack(
+        MAGIC, VERSION, tile_dtype_size, int(cfg is not None),
+        *[history_params[name] for name in HISTORY_PARAM_NAMES],
+        *grid_values,
+        *counts_and_offsets,
+    )
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+def write_schedule_file(
+    path: str,
+    batch_size: int,
+    M_blocks_per_core: int,
+    chunks_per_mm_N_block: int,
+    my_chip_id: int,
+    direction: int,
+    ring_size: int,
+    mm_N_blocks_per_slice: int,
+    worker_id: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    num_workers: int,
+    mm_block_unit_ht: int,
+    chunk_width: int,
+    N_block_wt: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    cfg: GridConfig = None,
+) -> None:
+    """
+    Generate the get_iteration_history schedule for these parameters and write
+    it to path. Tiles are streamed to disk as they are generated; only the step
+    offsets and the record index are kept in memory.
+    cfg, if given, is stored in the header for reference.
+    """
+    history_params = dict(
+        batch_size=batch_size,
+        M_blocks_per_core=M_blocks_per_core,
+        chunks_per_mm_N_block=chunks_per_mm_N_block,
+        my_chip_id=my_chip_id,
+        direction=direction,
+        ring_size=ring_size,
+        mm_N_blocks_per_slice=mm_N_blocks_per_slice,
+        worker_id=worker_id,
+        last_mm_core_idx=last_mm_core_idx,
+        tile_granularity=tile_granularity,
+        num_workers=num_workers,
+        mm_block_unit_ht=mm_block_unit_ht,
+        chunk_width=chunk_width,
+        N_block_wt=N_block_wt,
+        tiles_ht_per_core=tiles_ht_per_core,
+        slice_Wt=slice_Wt,
+    )
+    global_num_tiles = (last_mm_core_idx + 1) * tiles_ht_per_core * slice_Wt * ring_size
+    tile_dtype = np.int32 if global_num_tiles < np.iinfo(np.int32).max // 2 else np.int64
+    tile_dtype_max = np.iinfo(tile_dtype).max
+
+    step_offsets = [0]
+    records = []
+    num_tiles = 0
+    with open(path, "wb") as f:
+        f.write(_pack_header(np.dtype(tile_dtype).itemsize, history_params, cfg, (0,) * 6))
+        for iteration_id, ring_iteration, read_kwargs in iter_iteration_params(**history_params):
+            slice_idxs, global_idxs, record_step_offsets = (
+                read_tiles_granular_with_direction_based_on_num_workers_arrays(**read_kwargs)
+            )
+            if len(global_idxs) and max(slice_idxs.max(), global_idxs.max()) > tile_dtype_max:
+                raise ValueError("tile index does not fit the schedule file dtype")
+            f.write(np.stack([slice_idxs, global_idxs], axis=1).astype(tile_dtype).tobytes())
+            records.append((*iteration_id, ring_iteration,
+                            len(step_offsets) - 1, len(record_step_offsets) - 1))
+            step_offsets.extend((record_step_offsets[1:] + num_tiles).tolist())
+            num_tiles += len(slice_idxs)
+
+        step_offsets_offset = f.tell()
+        f.write(np.asarray(step_offsets, dtype=np.int64).tobytes())
+        records_offset = f.tell()
+        f.write(np.asarray(records, dtype=np.int64).reshape(-1, len(RECORD_COLUMNS)).tobytes())
+
+        f.seek(0)
+        f.write(_pack_header(
+            np.dtype(tile_dtype).itemsize, history_params, cfg,
+            (len(records), len(step_offsets) - 1, num_tiles,
+             HEADER_SIZE, step_offsets_offset, records_offset)
+        ))
+
+
+class ScheduleFile:
+    """
+    Zero-copy reader for files written by write_schedule_file.
+    tiles, step_offsets and records are read-only np.memmap views.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            values = HEADER_STRUCT.unpack(f.read(HEADER_STRUCT.size))
+        magic, version, tile_dtype_size, has_grid_config = values[:4]
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a schedule file")
+        if version != VERSION:
+            raise ValueError(f"unsupported schedule file version {version}")
+        values = values[4:]
+        self.history_params = dict(zip(HISTORY_PARAM_NAMES, values[:len(HISTORY_PARAM_NAMES)]))
+        values = values[len(HISTORY_PARAM_NAMES):]
+        grid_values = values[:len(GRID_CONFIG_FIELD_NAMES)]
+        self.grid_config = (
+            GridConfigSnapshot(**dict(zip(GRID_CONFIG_FIELD_NAMES, grid_values)))
+            if has_grid_config else None
+        )
+        (num_records, num_steps, num_tiles,
+         tiles_offset, step_offsets_offset, records_offset) = values[len(GRID_CONFIG_FIELD_NAMES):]
+
+        tile_dtype = np.int32 if tile_dtype_size == 4 else np.int64
+        self.tiles = np.memmap(path, dtype=tile_dtype, mode="r",
+                               offset=tiles_offset, shape=(num_tiles, 2))
+        self.step_offsets = np.memmap(path, dtype=np.int64, mode="r",
+                                      offset=step_offsets_offset, shape=(num_steps + 1,))
+        self.records = np.memmap(path, dtype=np.int64, mode="r",
+                                 offset=records_offset, shape=(num_records, len(RECORD_COLUMNS)))
+        self._record_index = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def find(self, iteration_id: tuple[int, int, int, int], ring_iteration: int) -> int:
+        """Return the record number of an (iteration_id, ring_iteration) pair."""
+        if self._record_index is None:
+            self._record_index = {
+                (tuple(row[:4]), row[4]): n for n, row in enumerate(self.records[:, :5].tolist())
+            }
+        return self._record_index[(tuple(iteration_id), ring_iteration)]
+
+    def record(self, n: int) -> tuple[tuple[int, int, int, int], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return (iteration_id, slice_idxs, global_idxs, step_offsets) of record n.
+        The index arrays are views into the file; step_offsets are relative to
+        the start of the record.
+        """
+        b, m_block_iter, chunk_idx, chunk_piece_idx, _, first_step, num_steps = self.records[n].tolist()
+        step_offsets = self.step_offsets[first_step:first_step + num_steps + 1]
+        tiles = self.tiles[step_offsets[0]:step_offsets[-1]]
+        return ((b, m_block_iter, chunk_idx, chunk_piece_idx),
+                tiles[:, 0], tiles[:, 1], step_offsets - step_offsets[0])
+
+    def iter_iteration_history(self):
+        """Yield records in get_iteration_history form."""
+        for n in range(len(self)):
+            iteration_id, slice_idxs, global_idxs, step_offsets = self.record(n)
+            yield (iteration_id,
+                   split_by_step_offsets(slice_idxs, step_offsets),
+                   split_by_step_offsets(global_idxs, step_offsets))
+
+    def to_iteration_history(self) -> list:
+        """Materialize the whole schedule in get_iteration_history form."""
+        return list(self.iter_iteration_history())
@@ -0,0 +1,186 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+import tile_trace
+from loop_simulation import iter_iteration_params
+from profiling import count_history, timed
+from stride_idx_vec_fns import (
+    emit_step_events,
+    read_tiles_granular_with_direction_based_on_num_workers_coordinates,
+    split_by_step_offsets,
+)
+
+
+@dataclass
+class ScheduleTemplate:
+    """
+    Tiles of one (chunk_idx, chunk_piece_idx) read by one worker, computed for
+    M_block_idx=0 and slice_actual_idx=0.
+    """
+    slice_row: np.ndarray
+    slice_col: np.ndarray
+    step_offsets: np.ndarray
+
+    def instantiate(
+        self,
+        M_block_idx: int,
+        slice_actual_idx: int,
+        mm_block_unit_ht: int,
+        slice_Wt: int,
+        global_Wt: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Shift the template to an M block and slice.
+        Returns flat slice_idxs and global_idxs arrays.
+        """
+        M_block_row_offset = M_block_idx * mm_block_unit_ht
+        slice_idxs = (self.slice_row * slice_Wt + self.slice_col +
+                      M_block_row_offset * slice_Wt)
+        global_idxs = (self.slice_row * global_Wt + self.slice_col +
+                       M_block_row_offset * global_Wt + slice_actual_idx * slice_Wt)
+        return slice_idxs, global_idxs
+
+
+class ScheduleTemplateCache:
+    """
+    Per-worker templates keyed by (chunk_idx, chunk_piece_idx).
+    The indices of every other M block and slice only differ from the template
+    by a constant offset, so each template is computed once.
+    """
+
+    def __init__(
+        self,
+        worker_id: int,
+        direction: int,
+        num_workers: int,
+        last_mm_core_idx: int,
+        tile_granularity: int,
+        mm_block_unit_ht: int,
+        chunk_width_in_tiles: int,
+        N_block_wt: int,
+        tiles_ht_per_core: int,
+    ):
+        self.worker_id = worker_id
+        self.direction = direction
+        self.num_workers = num_workers
+        self.last_mm_core_idx = last_mm_core_idx
+        self.tile_granularity = tile_granularity
+        self.mm_block_unit_ht = mm_block_unit_ht
+        self.chunk_width_in_tiles = chunk_width_in_tiles
+        self.N_block_wt = N_block_wt
+        self.tiles_ht_per_core = tiles_ht_per_core
+        self.templates = {}
+
+    def get(self, chunk_idx: int, chunk_piece_idx: int) -> ScheduleTemplate:
+        """Return the template for a chunk and chunk piece, computing it on first use."""
+        key = (chunk_idx, chunk_piece_idx)
+        template = self.templates.get(key)
+        if template is None:
+            template = ScheduleTemplate(
+                *read_tiles_granular_with_direction_based_on_num_workers_coordinates(
+                    worker_id=self.worker_id,
+                    start_tile_row_in_mm_M_block=0,
+                    start_chunk_col_in_tiles=0,
+                    start_mm_core_idx=0,
+                    last_mm_core_idx=self.last_mm_core_idx,
+                    tile_granularity=self.tile_granularity,
+                    chunk_idx=chunk_idx,
+                    direction=self.direction,
+                    num_workers=self.num_workers,
+                    mm_block_unit_ht=self.mm_block_unit_ht,
+                    chunk_width_in_tiles=self.chunk_width_in_tiles,
+                    N_block_wt=self.N_block_wt,
+                    N_block_idx=chunk_piece_idx,
+                    M_block_idx=0,
+                    tiles_ht_per_core=self.tiles_ht_per_core,
+                )
+            )
+            self.templates[key] = template
+        return template
+
+
+@timed(count_history)
+def get_iteration_history_from_templates(
+    batch_size: int,
+    M_blocks_per_core: int,
+    chunks_per_mm_N_block: int,
+    my_chip_id: int,
+    direction: int,
+    ring_size: int,
+    mm_N_blocks_per_slice: int,
+    worker_id: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    num_workers: int,
+    mm_block_unit_ht: int,
+    chunk_width: int,
+    N_block_wt: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    cache: ScheduleTemplateCache = None,
+):
+    """
+    Same output as get_iteration_history, derived from per-(chunk, chunk piece)
+    templates shifted by M block and slice offsets. Batches after the first
+    repeat the first batch's indices. Emits the same trace events as
+    get_iteration_history.
+    """
+    chunk_width_in_tiles = chunk_width * mm_block_unit_ht
+    global_Wt = ring_size * slice_Wt
+    if cache is None:
+        cache = ScheduleTemplateCache(
+            worker_id, direction, num_workers, last_mm_core_idx, tile_granularity,
+            mm_block_unit_ht, chunk_width_in_tiles, N_block_wt, tiles_ht_per_core
+        )
+
+    iteration_history = []
+    first_batch_records = {}
+    for iteration_id, ring_iteration, read_kwargs in iter_iteration_params(
+        batch_size=batch_size,
+        M_blocks_per_core=M_blocks_per_core,
+        chunks_per_mm_N_block=chunks_per_mm_N_block,
+        my_chip_id=my_chip_id,
+        direction=direction,
+        ring_size=ring_size,
+        mm_N_blocks_per_slice=mm_N_blocks_per_slice,
+        worker_id=worker_id,
+        last_mm_core_idx=last_mm_core_idx,
+        tile_granularity=tile_granularity,
+        num_workers=num_workers,
+        mm_block_unit_ht=mm_block_unit_ht,
+        chunk_width=chunk_width,
+        N_block_wt=N_block_wt,
+        tiles_ht_per_core=tiles_ht_per_core,
+        slice_Wt=slice_Wt,
+    ):
+        b, m_block_iter, chunk_idx, chunk_piece_idx = iteration_id
+        record_key = (m_block_iter, chunk_idx, ring_iteration, chunk_piece_idx)
+        if b > 0:
+            flat_slice_idxs, flat_global_idxs, step_offsets, slice_idxs, global_idxs = (
+                first_batch_records[record_key]
+            )
+            if tile_trace.sinks:
+                emit_step_events(flat_slice_idxs, flat_global_idxs, step_offsets)
+            iteration_history.append((
+                iteration_id,
+                [step[:] for step in slice_idxs],
+                [step[:] for step in global_idxs],
+            ))
+            continue
+
+        template = cache.get(chunk_idx, chunk_piece_idx)
+        flat_slice_idxs, flat_global_idxs = template.instantiate(
+            m_block_iter, read_kwargs["slice_actual_idx"],
+            mm_block_unit_ht, slice_Wt, global_Wt
+        )
+        if tile_trace.sinks:
+            emit_step_events(flat_slice_idxs, flat_global_idxs, template.step_offsets)
+        slice_idxs = split_by_step_offsets(flat_slice_idxs, template.step_offsets)
+        global_idxs = split_by_step_offsets(flat_global_idxs, template.step_offsets)
+        if batch_size > 1:
+            first_batch_records[record_key] = (
+                flat_slice_idxs, flat_global_idxs, template.step_offsets, slice_idxs, global_idxs
+            )
+        iteration_history.append((iteration_id, slice_idxs, global_idxs))
+    return iteration_history
@@ -1,6 +1,11 @@
+import tile_trace
+from profiling import counted, timed
+from tile_trace import StepStarted, TileCoordinatesRead
+
 # chunk is a 2D array of mm_unit x chunk_width_in_mm_units units
 # so mm_block_unit_ht by chunk_width_in_mm_units * mm_block_unit_wt tiles
 
+@counted
 def get_next_tile_coordinates(
     tile_row_in_mm_M_block: int,
     chunk_col_in_tiles: int,
@@ -50,6 +55,7 @@ def get_next_tile_coordinates(
 
     return tile_row_in_mm_M_block, new_col, mm_core_idx
 
+@counted
 def get_next_tile_coordinates_optimized(
     tile_row_in_mm_M_block: int,
     chunk_col_in_tiles: int,
@@ -99,6 +105,7 @@ def get_next_tile_coordinates_optimized(
 
     return tile_row_in_mm_M_block, new_col, mm_core_idx
 
+@counted
 def get_next_tile_coordinates_2(
     tile_row_in_mm_M_block: int,
     chunk_col_in_tiles: int,
@@ -141,6 +148,7 @@ def get_next_tile_coordinates_2(
 
     return tile_row_in_mm_M_block, new_col, mm_core_idx
 
+@counted
 def get_next_tile_coordinates_flat(
     tile_row_in_mm_M_block: int,
     chunk_col_in_tiles: int,
@@ -170,6 +178,7 @@ def get_next_tile_coordinates_flat(
 
     return tile_row_in_mm_M_block, chunk_col_in_tiles, mm_core_idx
 
+@counted
 def how_many_tiles_to_read_formula(
     tile_row_in_mm_M_block: int,
     chunk_col_in_tiles: int,
@@ -192,6 +201,7 @@ def how_many_tiles_to_read_formula(
     all_tiles = current_block_tiles_remaining + future_blocks_tiles
     return 1 + all_tiles // advance_by_tiles
 
+@timed()
 def read_tiles_granular(
     worker_id: int,
     start_tile_row_in_mm_M_block: int,
@@ -243,18 +253,20 @@ def read_tiles_granular(
         chunk_width_in_tiles
     )
 
+    sinks = tile_trace.sinks
     while tiles_to_read > 0:
-        print(f"--------------------------------")
-        print(f"tiles_to_read: {tiles_to_read}")
         tiles_to_read_in_this_step = min(tiles_to_read, tile_granularity)
+        if sinks:
+            tile_trace.emit(StepStarted(tiles_to_read, tiles_to_read_in_this_step))
         tiles_to_read -= tiles_to_read_in_this_step
         for i in range(tiles_to_read_in_this_step):
-            read_tile_coords(
-                i,
-                first_tile_row_in_mm_M_block,
-                first_chunk_col_in_tiles,
-                first_mm_core_idx
-            )
+            if sinks:
+                read_tile_coords(
+                    i,
+                    first_tile_row_in_mm_M_block,
+                    first_chunk_col_in_tiles,
+                    first_mm_core_idx
+                )
             (
                 first_tile_row_in_mm_M_block,
                 first_chunk_col_in_tiles,
@@ -277,13 +289,11 @@ def read_tile_coords(
 ):
     """
     Read the this tile.
+    Emits a TileCoordinatesRead trace event.
     """
-    print(
-        f"i: {i}, "
-        f"tile_row_in_mm_M_block: {tile_row_in_mm_M_block}, "
-        f"chunk_col_in_tiles: {chunk_col_in_tiles}, "
-        f"mm_core_idx: {mm_core_idx}"
-    )
+    tile_trace.emit(TileCoordinatesRead(
+        i, tile_row_in_mm_M_block, chunk_col_in_tiles, mm_core_idx
+    ))
 
 if __name__ == "__main__":
     worker_id = 0
@@ -303,6 +313,8 @@ if __name__ == "__main__":
 
     assert worker_id < advance_by_tiles
 
+    tile_trace.add_sink(tile_trace.TextSink())
+
     read_tiles_granular(
         worker_id,
         tile_row_in_mm_M_block,
@@ -1,7 +1,14 @@
 from dataclasses import dataclass
 import config
-from config import GridConfig, reset_config
-from stride_fns import get_next_tile_coordinates_optimized, how_many_tiles_to_read_formula
+import tile_trace
+from config import GridConfig, GridConfigSnapshot, reset_config
+from profiling import count_step_lists, counted, timed
+from stride_fns import (
+    get_next_tile_coordinates_flat,
+    get_next_tile_coordinates_optimized,
+    how_many_tiles_to_read_formula,
+)
+from tile_trace import StepStarted, TileEmitted
 
 
 @dataclass
@@ -94,6 +101,7 @@ def read_tiles_granular_with_direction_based_on_num_workers_from_params(
         num_workers=params.num_workers
     )
 
+@counted
 def coordinates_to_slice_coordinates(
     tile_row_in_mm_M_block: int,
     chunk_col_in_tiles: int,
@@ -137,6 +145,7 @@ def coordinates_to_slice_coordinates_from_config(
         config.cfg.chunk_width_in_tiles
     )
 
+@counted
 def slice_coordinates_to_slice_tile_index(
     slice_row: int,
     slice_col: int,
@@ -160,6 +169,7 @@ def slice_coordinates_to_slice_tile_index_from_config(
         slice_row, slice_col, config.cfg.slice_Wt
     )
 
+@counted
 def slice_coordinates_to_global_tile_index(
     slice_row: int,
     slice_col: int,
@@ -187,6 +197,7 @@ def slice_coordinates_to_global_tile_index_from_config(
         config.cfg.slice_Wt, config.cfg.global_Wt
     )
 
+@timed(count_step_lists)
 def read_tiles_granular(
     worker_id: int,
     start_tile_row_in_mm_M_block: int,
@@ -195,11 +206,13 @@ def read_tiles_granular(
     advance_by_tiles: int,
     last_mm_core_idx: int,
     tile_granularity: int,
-    chunk_idx: int
+    chunk_idx: int,
+    cfg_snapshot: GridConfigSnapshot = None
     ) -> tuple[list[list[int]], list[list[int]]]:
     """
     Read the tiles granularly.
     Returns lists of lists where each sublist corresponds to one iteration of the outer while loop.
+    Config values come from cfg_snapshot, or the global config if not given.
     """
     if tile_granularity <= 0:
         raise ValueError("tile_granularity must be greater than 0")
@@ -213,17 +226,31 @@ def read_tiles_granular(
     slice_idxs = []
     global_idxs = []
 
+    if cfg_snapshot is None:
+        cfg_snapshot = config.cfg
+    # Bind config values to locals once per call
+    mm_block_unit_ht = cfg_snapshot.mm_block_unit_ht
+    chunk_width_in_tiles = cfg_snapshot.chunk_width_in_tiles
+    N_block_wt = cfg_snapshot.N_block_wt
+    N_block_idx = cfg_snapshot.N_block_idx
+    M_block_idx = cfg_snapshot.M_block_idx
+    tiles_ht_per_core = cfg_snapshot.tiles_ht_per_core
+    slice_Wt = cfg_snapshot.slice_Wt
+    slice_actual_idx = cfg_snapshot.slice_actual_idx
+    global_Wt = cfg_snapshot.global_Wt
+
     # Compute effective chunk dimensions for stride_fns
-    effective_chunk_width_in_tiles = get_effective_chunk_width_in_tiles_from_config(chunk_idx)
-    effective_chunk_piece_size = (config.cfg.mm_block_unit_ht *
-                                  effective_chunk_width_in_tiles)
+    effective_chunk_width_in_tiles = get_effective_chunk_width_in_tiles(
+        chunk_idx, chunk_width_in_tiles, N_block_wt
+    )
+    effective_chunk_piece_size = mm_block_unit_ht * effective_chunk_width_in_tiles
 
     (first_tile_row_in_mm_M_block,
      first_chunk_col_in_tiles,
      first_mm_core_idx) = get_next_tile_coordinates_optimized(
         start_tile_row_in_mm_M_block, start_chunk_col_in_tiles, start_mm_core_idx,
         worker_id, effective_chunk_piece_size, effective_chunk_width_in_tiles,
-        config.cfg.mm_block_unit_ht
+        mm_block_unit_ht
     )
     if first_mm_core_idx > last_mm_core_idx:
         return [], []
@@ -232,18 +259,20 @@ def read_tiles_granular(
         advance_by_tiles, last_mm_core_idx,
         effective_chunk_piece_size, effective_chunk_width_in_tiles
     )
+    sinks = tile_trace.sinks
     while tiles_to_read > 0:
-        print(f"--------------------------------")
-        print(f"tiles_to_read: {tiles_to_read}")
         tiles_to_read_in_this_step = min(tiles_to_read, tile_granularity)
+        if sinks:
+            tile_trace.emit(StepStarted(tiles_to_read, tiles_to_read_in_this_step))
         tiles_to_read -= tiles_to_read_in_this_step
         step_slice_idxs = []
         step_global_idxs = []
         for i in range(tiles_to_read_in_this_step):
-            slice_row, slice_col = coordinates_to_slice_coordinates_from_config(
+            slice_row, slice_col = coordinates_to_slice_coordinates(
                 first_tile_row_in_mm_M_block, first_chunk_col_in_tiles,
-                first_mm_core_idx, config.cfg.N_block_idx, config.cfg.M_block_idx,
-                chunk_idx, config.cfg.N_block_wt
+                first_mm_core_idx, N_block_idx, M_block_idx,
+                chunk_idx, N_block_wt, tiles_ht_per_core,
+                mm_block_unit_ht, chunk_width_in_tiles
             )
             # read_tile_coords(i, first_tile_row_in_mm_M_block,
             #                  first_chunk_col_in_tiles, first_mm_core_idx)
@@ -253,18 +282,24 @@ def read_tiles_granular(
              first_mm_core_idx) = get_next_tile_coordinates_optimized(
                 first_tile_row_in_mm_M_block, first_chunk_col_in_tiles,
                 first_mm_core_idx, advance_by_tiles, effective_chunk_piece_size,
-                effective_chunk_width_in_tiles, config.cfg.mm_block_unit_ht
+                effective_chunk_width_in_tiles, mm_block_unit_ht
+            )
+            slice_tile_idx = slice_coordinates_to_slice_tile_index(
+                slice_row, slice_col, slice_Wt
+            )
+            global_tile_idx = slice_coordinates_to_global_tile_index(
+                slice_row, slice_col, slice_actual_idx, slice_Wt, global_Wt
             )
-            slice_tile_idx = slice_coordinates_to_slice_tile_index_from_config(slice_row, slice_col)
-            global_tile_idx = slice_coordinates_to_global_tile_index_from_config(slice_row, slice_col)
             step_slice_idxs.append(slice_tile_idx)
             step_global_idxs.append(global_tile_idx)
-            print(f"slice_tile_idx: {slice_tile_idx}, global_tile_idx: {global_tile_idx}")
+            if sinks:
+                tile_trace.emit(TileEmitted(slice_tile_idx, global_tile_idx))
         slice_idxs.append(step_slice_idxs)
         global_idxs.append(step_global_idxs)
     return slice_idxs, global_idxs
 
 
+@timed(count_step_lists)
 def read_tiles_granular_with_direction(
     worker_id: int,
     start_tile_row_in_mm_M_block: int,
@@ -274,10 +309,12 @@ def read_tiles_granular_with_direction(
     last_mm_core_idx: int,
     tile_granularity: int,
     chunk_idx: int,
-    direction: int) -> tuple[list[list[int]], list[list[int]]]:
+    direction: int,
+    cfg_snapshot: GridConfigSnapshot = None) -> tuple[list[list[int]], list[list[int]]]:
     """
     Read the tiles granularly.
     Returns lists of lists where each sublist corresponds to one iteration of the outer while loop.
+    Config values come from cfg_snapshot, or the global config if not given.
     """
     if tile_granularity <= 0:
         raise ValueError("tile_granularity must be greater than 0")
@@ -288,10 +325,24 @@ def read_tiles_granular_with_direction(
             "last_mm_core_idx must be greater than or equal to start_mm_core_idx"
         )
 
+    if cfg_snapshot is None:
+        cfg_snapshot = config.cfg
+    # Bind config values to locals once per call
+    mm_block_unit_ht = cfg_snapshot.mm_block_unit_ht
+    chunk_width_in_tiles = cfg_snapshot.chunk_width_in_tiles
+    N_block_wt = cfg_snapshot.N_block_wt
+    N_block_idx = cfg_snapshot.N_block_idx
+    M_block_idx = cfg_snapshot.M_block_idx
+    tiles_ht_per_core = cfg_snapshot.tiles_ht_per_core
+    slice_Wt = cfg_snapshot.slice_Wt
+    slice_actual_idx = cfg_snapshot.slice_actual_idx
+    global_Wt = cfg_snapshot.global_Wt
+
     # Compute effective chunk dimensions for stride_fns
-    effective_chunk_width_in_tiles = get_effective_chunk_width_in_tiles_from_config(chunk_idx)
-    effective_chunk_piece_size = (config.cfg.mm_block_unit_ht *
-                                  effective_chunk_width_in_tiles)
+    effective_chunk_width_in_tiles = get_effective_chunk_width_in_tiles(
+        chunk_idx, chunk_width_in_tiles, N_block_wt
+    )
+    effective_chunk_piece_size = mm_block_unit_ht * effective_chunk_width_in_tiles
     slice_idxs = []
     global_idxs = []
 
@@ -300,7 +351,7 @@ def read_tiles_granular_with_direction(
      first_mm_core_idx) = get_next_tile_coordinates_optimized(
         start_tile_row_in_mm_M_block, start_chunk_col_in_tiles, start_mm_core_idx,
         worker_id, effective_chunk_piece_size, effective_chunk_width_in_tiles,
-        config.cfg.mm_block_unit_ht
+        mm_block_unit_ht
     )
     if first_mm_core_idx > last_mm_core_idx:
         return slice_idxs, global_idxs
@@ -313,43 +364,52 @@ def read_tiles_granular_with_direction(
     tiles_to_read_forward = (tiles_to_read + 1) // 2
     tiles_to_read_backward = tiles_to_read - tiles_to_read_forward
     tiles_to_read = tiles_to_read_forward if direction == 0 else tiles_to_read_backward
-    oddity_bool = True
+    if tiles_to_read == 0:
+        return slice_idxs, global_idxs
 
+    # Forward reads every even tile of the worker's sequence and backward every
+    # odd one, so backward starts one advance later and both skip the other's tiles
+    if direction != 0:
+        (first_tile_row_in_mm_M_block,
+         first_chunk_col_in_tiles,
+         first_mm_core_idx) = get_next_tile_coordinates_optimized(
+            first_tile_row_in_mm_M_block, first_chunk_col_in_tiles, first_mm_core_idx,
+            advance_by_tiles, effective_chunk_piece_size,
+            effective_chunk_width_in_tiles, mm_block_unit_ht
+        )
+    direction_advance_by_tiles = 2 * advance_by_tiles
+
+    sinks = tile_trace.sinks
     while tiles_to_read > 0:
-        print(f"--------------------------------")
-        print(f"tiles_to_read: {tiles_to_read}")
         tiles_to_read_in_this_step = min(tiles_to_read, tile_granularity)
-        tiles_read = 0
+        if sinks:
+            tile_trace.emit(StepStarted(tiles_to_read, tiles_to_read_in_this_step))
         step_slice_idxs = []
         step_global_idxs = []
-        while tiles_read < tiles_to_read_in_this_step:
-            # print(f"oddity_bool: {oddity_bool}")
-            # print(f"direction: {direction}")
-            # print(f"reading tile")
-            slice_row, slice_col = coordinates_to_slice_coordinates_from_config(
+        for _ in range(tiles_to_read_in_this_step):
+            slice_row, slice_col = coordinates_to_slice_coordinates(
                 first_tile_row_in_mm_M_block, first_chunk_col_in_tiles,
-                first_mm_core_idx, config.cfg.N_block_idx, config.cfg.M_block_idx,
-                chunk_idx, config.cfg.N_block_wt
+                first_mm_core_idx, N_block_idx, M_block_idx,
+                chunk_idx, N_block_wt, tiles_ht_per_core,
+                mm_block_unit_ht, chunk_width_in_tiles
             )
-            # read_tile_coords(i, first_tile_row_in_mm_M_block,
-            #                  first_chunk_col_in_tiles, first_mm_core_idx)
             (first_tile_row_in_mm_M_block,
              first_chunk_col_in_tiles,
              first_mm_core_idx) = get_next_tile_coordinates_optimized(
                 first_tile_row_in_mm_M_block, first_chunk_col_in_tiles,
-                first_mm_core_idx, advance_by_tiles, effective_chunk_piece_size,
-                effective_chunk_width_in_tiles, config.cfg.mm_block_unit_ht
+                first_mm_core_idx, direction_advance_by_tiles, effective_chunk_piece_size,
+                effective_chunk_width_in_tiles, mm_block_unit_ht
             )
-
-            if oddity_bool == (direction == 0):
-                slice_tile_idx = slice_coordinates_to_slice_tile_index_from_config(slice_row, slice_col)
-                global_tile_idx = slice_coordinates_to_global_tile_index_from_config(slice_row, slice_col)
-                # print(f"slice_row: {slice_row}, slice_col: {slice_col}") 
-                print(f"slice_tile_idx: {slice_tile_idx}, global_tile_idx: {global_tile_idx}")
-                tiles_read += 1
-                step_slice_idxs.append(slice_tile_idx)
-                step_global_idxs.append(global_tile_idx)
-            oddity_bool = not oddity_bool
+            slice_tile_idx = slice_coordinates_to_slice_tile_index(
+                slice_row, slice_col, slice_Wt
+            )
+            global_tile_idx = slice_coordinates_to_global_tile_index(
+                slice_row, slice_col, slice_actual_idx, slice_Wt, global_Wt
+            )
+            if sinks:
+                tile_trace.emit(TileEmitted(slice_tile_idx, global_tile_idx))
+            step_slice_idxs.append(slice_tile_idx)
+            step_global_idxs.append(global_tile_idx)
         slice_idxs.append(step_slice_idxs)
         global_idxs.append(step_global_idxs)
         tiles_to_read -= tiles_to_read_in_this_step
@@ -392,6 +452,7 @@ def read_tiles_granular_with_direction_based_on_num_workers_from_config(
     )
 
 
+@timed(count_step_lists)
 def read_tiles_granular_with_direction_based_on_num_workers(
     worker_id: int,
     start_tile_row_in_mm_M_block: int,
@@ -456,10 +517,11 @@ def read_tiles_granular_with_direction_based_on_num_workers(
         effective_advance_by_tiles, last_mm_core_idx,
         effective_chunk_piece_size, effective_chunk_width_in_tiles
     )
+    sinks = tile_trace.sinks
     while tiles_to_read > 0:
-        print(f"--------------------------------")
-        print(f"tiles_to_read: {tiles_to_read}")
         tiles_to_read_in_this_step = min(tiles_to_read, tile_granularity)
+        if sinks:
+            tile_trace.emit(StepStarted(tiles_to_read, tiles_to_read_in_this_step))
         tiles_to_read -= tiles_to_read_in_this_step
         step_slice_idxs = []
         step_global_idxs = []
@@ -486,12 +548,92 @@ def read_tiles_granular_with_direction_based_on_num_workers(
             )
             step_slice_idxs.append(slice_tile_idx)
             step_global_idxs.append(global_tile_idx)
-            print(f"slice_tile_idx: {slice_tile_idx}, global_tile_idx: {global_tile_idx}")
+            if sinks:
+                tile_trace.emit(TileEmitted(slice_tile_idx, global_tile_idx))
         slice_idxs.append(step_slice_idxs)
         global_idxs.append(step_global_idxs)
     return slice_idxs, global_idxs
 
 
+def get_kth_tile_with_direction_based_on_num_workers(
+    k: int,
+    worker_id: int,
+    start_tile_row_in_mm_M_block: int,
+    start_chunk_col_in_tiles: int,
+    start_mm_core_idx: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    chunk_idx: int,
+    direction: int,
+    num_workers: int,
+    # Config parameters
+    mm_block_unit_ht: int,
+    chunk_width_in_tiles: int,
+    N_block_wt: int,
+    N_block_idx: int,
+    M_block_idx: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    slice_actual_idx: int,
+    global_Wt: int,
+) -> tuple[int, int, int]:
+    """
+    Get the k-th tile read by read_tiles_granular_with_direction_based_on_num_workers
+    without replaying the loop.
+    Returns (slice_tile_idx, global_tile_idx, step_idx), where step_idx is the
+    granularity step (outer while iteration) the tile is read in.
+    """
+    if tile_granularity <= 0:
+        raise ValueError("tile_granularity must be greater than 0")
+    if last_mm_core_idx < start_mm_core_idx:
+        raise ValueError(
+            "last_mm_core_idx must be greater than or equal to start_mm_core_idx"
+        )
+    if num_workers <= 0:
+        raise ValueError("num_workers must be greater than 0")
+    if direction not in [0, 1]:
+        raise ValueError("direction must be 0 or 1")
+
+    effective_id = worker_id + direction * num_workers
+    effective_advance_by_tiles = 2 * num_workers
+
+    effective_chunk_width_in_tiles = get_effective_chunk_width_in_tiles(
+        chunk_idx, chunk_width_in_tiles, N_block_wt
+    )
+    effective_chunk_piece_size = mm_block_unit_ht * effective_chunk_width_in_tiles
+
+    (first_tile_row_in_mm_M_block,
+     first_chunk_col_in_tiles,
+     first_mm_core_idx) = get_next_tile_coordinates_flat(
+        start_tile_row_in_mm_M_block, start_chunk_col_in_tiles, start_mm_core_idx,
+        effective_id, effective_chunk_width_in_tiles, mm_block_unit_ht
+    )
+    tiles_to_read = 0
+    if first_mm_core_idx <= last_mm_core_idx:
+        tiles_to_read = how_many_tiles_to_read_formula(
+            first_tile_row_in_mm_M_block, first_chunk_col_in_tiles, first_mm_core_idx,
+            effective_advance_by_tiles, last_mm_core_idx,
+            effective_chunk_piece_size, effective_chunk_width_in_tiles
+        )
+    if k < 0 or k >= tiles_to_read:
+        raise ValueError(f"k must be in [0, {tiles_to_read}), got {k}")
+
+    tile_row_in_mm_M_block, chunk_col_in_tiles, mm_core_idx = get_next_tile_coordinates_flat(
+        first_tile_row_in_mm_M_block, first_chunk_col_in_tiles, first_mm_core_idx,
+        k * effective_advance_by_tiles, effective_chunk_width_in_tiles, mm_block_unit_ht
+    )
+    slice_row, slice_col = coordinates_to_slice_coordinates(
+        tile_row_in_mm_M_block, chunk_col_in_tiles, mm_core_idx,
+        N_block_idx, M_block_idx, chunk_idx, N_block_wt, tiles_ht_per_core,
+        mm_block_unit_ht, chunk_width_in_tiles
+    )
+    slice_tile_idx = slice_coordinates_to_slice_tile_index(slice_row, slice_col, slice_Wt)
+    global_tile_idx = slice_coordinates_to_global_tile_index(
+        slice_row, slice_col, slice_actual_idx, slice_Wt, global_Wt
+    )
+    return slice_tile_idx, global_tile_idx, k // tile_granularity
+
+
 if __name__ == "__main__":
     # Reset config with custom values
     # reset_config(GridConfig(
@@ -780,6 +922,8 @@ if __name__ == "__main__":
     # print(f"slice_idxs: {slice_idxs}")
     # print(f"global_idxs: {global_idxs}")
 
+    tile_trace.add_sink(tile_trace.TextSink())
+
     # Reset config with custom values
     reset_config(GridConfig(
         mm_block_unit_wt=4,
@@ -0,0 +1,145 @@
+from profiling import count_runs, timed
+from stride_fns import get_next_tile_coordinates_flat, how_many_tiles_to_read_formula
+from stride_idx_fns import (
+    coordinates_to_slice_coordinates,
+    get_effective_chunk_width_in_tiles,
+    slice_coordinates_to_global_tile_index,
+    slice_coordinates_to_slice_tile_index,
+)
+
+
+def append_run(
+    runs: list[tuple[int, int, int]],
+    start: int,
+    stride: int,
+    count: int
+) -> None:
+    """
+    Append a (start, stride, count) run, merging it into the previous run when
+    the combined indices still form one arithmetic sequence.
+    """
+    if runs:
+        last_start, last_stride, last_count = runs[-1]
+        if last_count == 1:
+            joined_stride = start - last_start
+            if joined_stride > 0 and (count == 1 or stride == joined_stride):
+                runs[-1] = (last_start, joined_stride, 1 + count)
+                return
+        elif (start == last_start + last_stride * last_count and
+              (count == 1 or stride == last_stride)):
+            runs[-1] = (last_start, last_stride, last_count + count)
+            return
+    runs.append((start, stride, count))
+
+
+def expand_runs(runs: list[tuple[int, int, int]]) -> list[int]:
+    """Expand (start, stride, count) runs back into the per-tile indices."""
+    return [start + stride * i for start, stride, count in runs for i in range(count)]
+
+
+@timed(count_runs)
+def read_tiles_granular_with_direction_based_on_num_workers_runs(
+    worker_id: int,
+    start_tile_row_in_mm_M_block: int,
+    start_chunk_col_in_tiles: int,
+    start_mm_core_idx: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    chunk_idx: int,
+    direction: int,
+    num_workers: int,
+    # Config parameters
+    mm_block_unit_ht: int,
+    chunk_width_in_tiles: int,
+    N_block_wt: int,
+    N_block_idx: int,
+    M_block_idx: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    slice_actual_idx: int,
+    global_Wt: int,
+) -> tuple[list[list[tuple[int, int, int]]], list[list[tuple[int, int, int]]]]:
+    """
+    Run-length form of read_tiles_granular_with_direction_based_on_num_workers.
+    Returns lists of (start, stride, count) runs over slice and global indices,
+    one list per granularity step.
+
+    Tiles in one chunk row are a single run, so the walk advances a row at a
+    time rather than a tile at a time; consecutive runs are merged whenever
+    they continue the same arithmetic sequence.
+    """
+    if tile_granularity <= 0:
+        raise ValueError("tile_granularity must be greater than 0")
+    if last_mm_core_idx < start_mm_core_idx:
+        raise ValueError(
+            "last_mm_core_idx must be greater than or equal to start_mm_core_idx"
+        )
+    if num_workers <= 0:
+        raise ValueError("num_workers must be greater than 0")
+    if direction not in [0, 1]:
+        raise ValueError("direction must be 0 or 1")
+
+    slice_runs = []
+    global_runs = []
+
+    effective_id = worker_id + direction * num_workers
+    effective_advance_by_tiles = 2 * num_workers
+
+    # Compute effective chunk dimensions for stride_fns
+    effective_chunk_width_in_tiles = get_effective_chunk_width_in_tiles(
+        chunk_idx, chunk_width_in_tiles, N_block_wt
+    )
+    effective_chunk_piece_size = mm_block_unit_ht * effective_chunk_width_in_tiles
+
+    (tile_row_in_mm_M_block,
+     chunk_col_in_tiles,
+     mm_core_idx) = get_next_tile_coordinates_flat(
+        start_tile_row_in_mm_M_block, start_chunk_col_in_tiles, start_mm_core_idx,
+        effective_id, effective_chunk_width_in_tiles, mm_block_unit_ht
+    )
+    if mm_core_idx > last_mm_core_idx:
+        return slice_runs, global_runs
+    tiles_to_read = how_many_tiles_to_read_formula(
+        tile_row_in_mm_M_block, chunk_col_in_tiles, mm_core_idx,
+        effective_advance_by_tiles, last_mm_core_idx,
+        effective_chunk_piece_size, effective_chunk_width_in_tiles
+    )
+    while tiles_to_read > 0:
+        tiles_to_read_in_this_step = min(tiles_to_read, tile_granularity)
+        tiles_to_read -= tiles_to_read_in_this_step
+        step_slice_runs = []
+        step_global_runs = []
+        while tiles_to_read_in_this_step > 0:
+            tiles_left_in_row = (
+                (effective_chunk_width_in_tiles - 1 - chunk_col_in_tiles) //
+                effective_advance_by_tiles + 1
+            )
+            run_count = min(tiles_left_in_row, tiles_to_read_in_this_step)
+            slice_row, slice_col = coordinates_to_slice_coordinates(
+                tile_row_in_mm_M_block, chunk_col_in_tiles, mm_core_idx,
+                N_block_idx, M_block_idx, chunk_idx, N_block_wt, tiles_ht_per_core,
+                mm_block_unit_ht, chunk_width_in_tiles
+            )
+            append_run(
+                step_slice_runs,
+                slice_coordinates_to_slice_tile_index(slice_row, slice_col, slice_Wt),
+                effective_advance_by_tiles, run_count
+            )
+            append_run(
+                step_global_runs,
+                slice_coordinates_to_global_tile_index(
+                    slice_row, slice_col, slice_actual_idx, slice_Wt, global_Wt
+                ),
+                effective_advance_by_tiles, run_count
+            )
+            (tile_row_in_mm_M_block,
+             chunk_col_in_tiles,
+             mm_core_idx) = get_next_tile_coordinates_flat(
+                tile_row_in_mm_M_block, chunk_col_in_tiles, mm_core_idx,
+                run_count * effective_advance_by_tiles,
+                effective_chunk_width_in_tiles, mm_block_unit_ht
+            )
+            tiles_to_read_in_this_step -= run_count
+        slice_runs.append(step_slice_runs)
+        global_runs.append(step_global_runs)
+    return slice_runs, global_runs
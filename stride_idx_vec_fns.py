@@ -0,0 +1,283 @@
+import numpy as np
+
+import config
+import tile_trace
+from config import GridConfigSnapshot
+from profiling import count_flat_array, count_step_lists, timed
+from stride_fns import get_next_tile_coordinates_flat, how_many_tiles_to_read_formula
+from stride_idx_fns import get_effective_chunk_width_in_tiles
+from tile_trace import StepStarted, TileEmitted
+
+
+def read_tiles_granular_with_direction_based_on_num_workers_coordinates(
+    worker_id: int,
+    start_tile_row_in_mm_M_block: int,
+    start_chunk_col_in_tiles: int,
+    start_mm_core_idx: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    chunk_idx: int,
+    direction: int,
+    num_workers: int,
+    # Config parameters
+    mm_block_unit_ht: int,
+    chunk_width_in_tiles: int,
+    N_block_wt: int,
+    N_block_idx: int,
+    M_block_idx: int,
+    tiles_ht_per_core: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized slice coordinates of every tile a worker reads.
+    Returns slice_row and slice_col arrays plus step_offsets, where the tiles of
+    step s are [step_offsets[s], step_offsets[s + 1]).
+
+    All tiles are computed at once from the flattened chunk index, using the
+    same decomposition as get_next_tile_coordinates_flat.
+    """
+    if tile_granularity <= 0:
+        raise ValueError("tile_granularity must be greater than 0")
+    if last_mm_core_idx < start_mm_core_idx:
+        raise ValueError(
+            "last_mm_core_idx must be greater than or equal to start_mm_core_idx"
+        )
+    if num_workers <= 0:
+        raise ValueError("num_workers must be greater than 0")
+    if direction not in [0, 1]:
+        raise ValueError("direction must be 0 or 1")
+
+    effective_id = worker_id + direction * num_workers
+    effective_advance_by_tiles = 2 * num_workers
+
+    # Compute effective chunk dimensions for stride_fns
+    effective_chunk_width_in_tiles = get_effective_chunk_width_in_tiles(
+        chunk_idx, chunk_width_in_tiles, N_block_wt
+    )
+    effective_chunk_piece_size = mm_block_unit_ht * effective_chunk_width_in_tiles
+
+    (first_tile_row_in_mm_M_block,
+     first_chunk_col_in_tiles,
+     first_mm_core_idx) = get_next_tile_coordinates_flat(
+        start_tile_row_in_mm_M_block, start_chunk_col_in_tiles, start_mm_core_idx,
+        effective_id, effective_chunk_width_in_tiles, mm_block_unit_ht
+    )
+    if first_mm_core_idx > last_mm_core_idx:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty.copy(), np.zeros(1, dtype=np.int64)
+    tiles_to_read = how_many_tiles_to_read_formula(
+        first_tile_row_in_mm_M_block, first_chunk_col_in_tiles, first_mm_core_idx,
+        effective_advance_by_tiles, last_mm_core_idx,
+        effective_chunk_piece_size, effective_chunk_width_in_tiles
+    )
+
+    first_chunk_index = (
+        first_mm_core_idx * effective_chunk_piece_size +
+        first_tile_row_in_mm_M_block * effective_chunk_width_in_tiles +
+        first_chunk_col_in_tiles
+    )
+    chunk_index = (
+        first_chunk_index +
+        effective_advance_by_tiles * np.arange(tiles_to_read, dtype=np.int64)
+    )
+    mm_core_idx, remaining_tiles = np.divmod(chunk_index, effective_chunk_piece_size)
+    tile_row_in_mm_M_block, chunk_col_in_tiles = np.divmod(
+        remaining_tiles, effective_chunk_width_in_tiles
+    )
+
+    # Same mapping as coordinates_to_slice_coordinates
+    slice_row = (mm_core_idx * tiles_ht_per_core +
+                 M_block_idx * mm_block_unit_ht +
+                 tile_row_in_mm_M_block)
+    slice_col = (N_block_idx * N_block_wt +
+                 chunk_idx * chunk_width_in_tiles +
+                 chunk_col_in_tiles)
+
+    step_offsets = np.append(
+        np.arange(0, tiles_to_read, tile_granularity, dtype=np.int64), tiles_to_read
+    )
+    return slice_row, slice_col, step_offsets
+
+
+@timed(count_flat_array)
+def read_tiles_granular_with_direction_based_on_num_workers_arrays(
+    worker_id: int,
+    start_tile_row_in_mm_M_block: int,
+    start_chunk_col_in_tiles: int,
+    start_mm_core_idx: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    chunk_idx: int,
+    direction: int,
+    num_workers: int,
+    # Config parameters
+    mm_block_unit_ht: int,
+    chunk_width_in_tiles: int,
+    N_block_wt: int,
+    N_block_idx: int,
+    M_block_idx: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    slice_actual_idx: int,
+    global_Wt: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized read_tiles_granular_with_direction_based_on_num_workers.
+    Returns flat slice_idxs and global_idxs arrays plus step_offsets, where the
+    tiles of step s are [step_offsets[s], step_offsets[s + 1]).
+    """
+    slice_row, slice_col, step_offsets = (
+        read_tiles_granular_with_direction_based_on_num_workers_coordinates(
+            worker_id=worker_id,
+            start_tile_row_in_mm_M_block=start_tile_row_in_mm_M_block,
+            start_chunk_col_in_tiles=start_chunk_col_in_tiles,
+            start_mm_core_idx=start_mm_core_idx,
+            last_mm_core_idx=last_mm_core_idx,
+            tile_granularity=tile_granularity,
+            chunk_idx=chunk_idx,
+            direction=direction,
+            num_workers=num_workers,
+            mm_block_unit_ht=mm_block_unit_ht,
+            chunk_width_in_tiles=chunk_width_in_tiles,
+            N_block_wt=N_block_wt,
+            N_block_idx=N_block_idx,
+            M_block_idx=M_block_idx,
+            tiles_ht_per_core=tiles_ht_per_core,
+        )
+    )
+    # Same mapping as the slice and global index conversions
+    slice_idxs = slice_row * slice_Wt + slice_col
+    global_idxs = slice_row * global_Wt + slice_col + slice_actual_idx * slice_Wt
+    if tile_trace.sinks:
+        emit_step_events(slice_idxs, global_idxs, step_offsets)
+    return slice_idxs, global_idxs, step_offsets
+
+
+def emit_step_events(
+    slice_idxs: np.ndarray,
+    global_idxs: np.ndarray,
+    step_offsets: np.ndarray
+) -> None:
+    """
+    Emit the same trace events the loop generators emit for a flat result.
+    """
+    tiles_to_read = int(step_offsets[-1])
+    bounds = step_offsets.tolist()
+    for s in range(len(bounds) - 1):
+        tile_trace.emit(StepStarted(tiles_to_read - bounds[s], bounds[s + 1] - bounds[s]))
+        for slice_tile_idx, global_tile_idx in zip(
+                slice_idxs[bounds[s]:bounds[s + 1]].tolist(),
+                global_idxs[bounds[s]:bounds[s + 1]].tolist()):
+            tile_trace.emit(TileEmitted(slice_tile_idx, global_tile_idx))
+
+
+def split_by_step_offsets(
+    idxs: np.ndarray,
+    step_offsets: np.ndarray
+) -> list[list[int]]:
+    """
+    Split a flat index array into one list per granularity step.
+    """
+    flat = idxs.tolist()
+    bounds = step_offsets.tolist()
+    return [flat[bounds[s]:bounds[s + 1]] for s in range(len(bounds) - 1)]
+
+
+@timed(count_step_lists)
+def read_tiles_granular_with_direction_based_on_num_workers_vec(
+    worker_id: int,
+    start_tile_row_in_mm_M_block: int,
+    start_chunk_col_in_tiles: int,
+    start_mm_core_idx: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    chunk_idx: int,
+    direction: int,
+    num_workers: int,
+    # Config parameters
+    mm_block_unit_ht: int,
+    chunk_width_in_tiles: int,
+    N_block_wt: int,
+    N_block_idx: int,
+    M_block_idx: int,
+    tiles_ht_per_core: int,
+    slice_Wt: int,
+    slice_actual_idx: int,
+    global_Wt: int,
+) -> tuple[list[list[int]], list[list[int]]]:
+    """
+    Drop-in vectorized replacement for read_tiles_granular_with_direction_based_on_num_workers.
+    Returns lists of lists where each sublist corresponds to one granularity step.
+    """
+    slice_idxs, global_idxs, step_offsets = (
+        read_tiles_granular_with_direction_based_on_num_workers_arrays(
+            worker_id=worker_id,
+            start_tile_row_in_mm_M_block=start_tile_row_in_mm_M_block,
+            start_chunk_col_in_tiles=start_chunk_col_in_tiles,
+            start_mm_core_idx=start_mm_core_idx,
+            last_mm_core_idx=last_mm_core_idx,
+            tile_granularity=tile_granularity,
+            chunk_idx=chunk_idx,
+            direction=direction,
+            num_workers=num_workers,
+            mm_block_unit_ht=mm_block_unit_ht,
+            chunk_width_in_tiles=chunk_width_in_tiles,
+            N_block_wt=N_block_wt,
+            N_block_idx=N_block_idx,
+            M_block_idx=M_block_idx,
+            tiles_ht_per_core=tiles_ht_per_core,
+            slice_Wt=slice_Wt,
+            slice_actual_idx=slice_actual_idx,
+            global_Wt=global_Wt,
+        )
+    )
+    return (split_by_step_offsets(slice_idxs, step_offsets),
+            split_by_step_offsets(global_idxs, step_offsets))
+
+
+@timed(count_flat_array)
+def read_tiles_granular_with_direction_arrays(
+    worker_id: int,
+    start_tile_row_in_mm_M_block: int,
+    start_chunk_col_in_tiles: int,
+    start_mm_core_idx: int,
+    advance_by_tiles: int,
+    last_mm_core_idx: int,
+    tile_granularity: int,
+    chunk_idx: int,
+    direction: int,
+    cfg_snapshot: GridConfigSnapshot = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized read_tiles_granular_with_direction.
+    Returns flat slice_idxs and global_idxs arrays plus step_offsets.
+
+    A worker's direction reads every other tile of its advance_by_tiles
+    sequence, i.e. the sequence of
+    read_tiles_granular_with_direction_based_on_num_workers with
+    num_workers=advance_by_tiles, so the whole computation is delegated there.
+    """
+    if advance_by_tiles <= 0:
+        raise ValueError("advance_by_tiles must be greater than 0")
+    if cfg_snapshot is None:
+        # Fields are read once below, so the live config needs no copy
+        cfg_snapshot = config.cfg
+    return read_tiles_granular_with_direction_based_on_num_workers_arrays(
+        worker_id=worker_id,
+        start_tile_row_in_mm_M_block=start_tile_row_in_mm_M_block,
+        start_chunk_col_in_tiles=start_chunk_col_in_tiles,
+        start_mm_core_idx=start_mm_core_idx,
+        last_mm_core_idx=last_mm_core_idx,
+        tile_granularity=tile_granularity,
+        chunk_idx=chunk_idx,
+        direction=0 if direction == 0 else 1,
+        num_workers=advance_by_tiles,
+        mm_block_unit_ht=cfg_snapshot.mm_block_unit_ht,
+        chunk_width_in_tiles=cfg_snapshot.chunk_width_in_tiles,
+        N_block_wt=cfg_snapshot.N_block_wt,
+        N_block_idx=cfg_snapshot.N_block_idx,
+        M_block_idx=cfg_snapshot.M_block_idx,
+        tiles_ht_per_core=cfg_snapshot.tiles_ht_per_core,
+        slice_Wt=cfg_snapshot.slice_Wt,
+        slice_actual_idx=cfg_snapshot.slice_actual_idx,
+        global_Wt=cfg_snapshot.global_Wt,
+    )
@@ -0,0 +1,52 @@
+import numpy as np
+
+
+def get_effective_chunk_width_in_tiles_many(
+    chunk_idx,
+    chunk_width_in_tiles: int,
+    N_block_wt: int
+) -> np.ndarray:
+    """
+    Array form of get_effective_chunk_width_in_tiles: the width of each chunk in
+    chunk_idx, with the tail chunk cut at N_block_wt.
+    """
+    chunk_idx = np.asarray(chunk_idx, dtype=np.int64)
+    return np.minimum(N_block_wt - chunk_idx * chunk_width_in_tiles, chunk_width_in_tiles)
+
+
+def get_next_tile_coordinates_many(
+    tile_row_in_mm_M_block,
+    chunk_col_in_tiles,
+    mm_core_idx,
+    advance_by_tiles,
+    chunk_width_in_tiles,
+    mm_block_unit_ht: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Batched get_next_tile_coordinates_flat.
+    Every argument except mm_block_unit_ht may be an array; arrays broadcast
+    against each other, so one advance or one chunk width can be shared by all
+    states, or given per element (e.g. tail chunks mixed with full ones).
+    Returns (tile_row_in_mm_M_block, chunk_col_in_tiles, mm_core_idx) arrays
+    with the same carry from column to row to core as the scalar version.
+    """
+    tile_row_in_mm_M_block = np.asarray(tile_row_in_mm_M_block, dtype=np.int64)
+    chunk_col_in_tiles = np.asarray(chunk_col_in_tiles, dtype=np.int64)
+    mm_core_idx = np.asarray(mm_core_idx, dtype=np.int64)
+    advance_by_tiles = np.asarray(advance_by_tiles, dtype=np.int64)
+    chunk_width_in_tiles = np.asarray(chunk_width_in_tiles, dtype=np.int64)
+    if np.any(advance_by_tiles < 0):
+        raise ValueError("advance_by_tiles must be greater than 0")
+    if np.any(chunk_width_in_tiles <= 0):
+        raise ValueError("chunk_width_in_tiles must be greater than 0")
+
+    chunk_piece_size = mm_block_unit_ht * chunk_width_in_tiles
+    target_chunk_index = (
+        mm_core_idx * chunk_piece_size +
+        tile_row_in_mm_M_block * chunk_width_in_tiles +
+        chunk_col_in_tiles +
+        advance_by_tiles
+    )
+    mm_core_idx, remaining_tiles = np.divmod(target_chunk_index, chunk_piece_size)
+    tile_row_in_mm_M_block, chunk_col_in_tiles = np.divmod(remaining_tiles, chunk_width_in_tiles)
+    return tile_row_in_mm_M_block, chunk_col_in_tiles, mm_core_idx
@@ -0,0 +1,61 @@
+import pytest
+
+from autotune import autotune_granularity_and_workers, chunk_piece_cost
+from config import GridConfig
+from cost_model import TransferCostModel, estimate_op_cost
+from loop_simulation import get_iteration_history
+
+
+def test_chunk_piece_cost_counts_all_tiles():
+    """Test that one chunk piece accounts for every tile once across workers and directions."""
+    cfg = GridConfig()
+    cost, num_steps, num_tiles = chunk_piece_cost(
+        cfg, chunk_idx=0, last_mm_core_idx=3, tile_granularity=4, num_workers=2,
+        cost_model=TransferCostModel(step_overhead=0.0, tile_size_bytes=1, link_bandwidth=1.0),
+        num_links=2,
+    )
+    assert num_tiles == 4 * cfg.chunk_piece_size
+    # Two links per direction, one worker each: the slowest worker sets the cost
+    assert cost == 12.0
+    assert num_steps == 4 * 3
+
+
+def test_autotune_prefers_large_steps_when_overhead_dominates():
+    """Test that a high step overhead pushes the tuner to the largest granularity."""
+    cfg = GridConfig()
+    result = autotune_granularity_and_workers(
+        cfg, ring_size=2,
+        cost_model=TransferCostModel(step_overhead=100.0, tile_size_bytes=1, link_bandwidth=100.0),
+        num_links=4,
+        last_mm_core_idx=3,
+        tile_granularities=[1, 4, 16],
+        worker_counts=[1, 2, 4],
+    )
+    assert result.tile_granularity == 16
+    assert result.num_workers == 4
+    assert len(result.candidates) == 9
+    assert result.total_cost == min(total for _, _, total in result.candidates)
+
+
+def test_chunk_piece_cost_matches_op_cost():
+    """Test that the tuner prices a chunk piece like estimate_op_cost prices the workers' schedules."""
+    cfg = GridConfig()
+    cost_model = TransferCostModel(step_overhead=1e-6, tile_size_bytes=2048, link_bandwidth=1e9)
+    for num_workers, num_links in [(1, 1), (3, 1), (4, 2), (3, 2)]:
+        cost, _, _ = chunk_piece_cost(
+            cfg, chunk_idx=0, last_mm_core_idx=3, tile_granularity=4, num_workers=num_workers,
+            cost_model=cost_model, num_links=num_links,
+        )
+        direction_costs = []
+        for direction in [0, 1]:
+            for link in range(num_links):
+                histories = [
+                    get_iteration_history(
+                        1, 1, 1, 0, direction, 1, 1, worker_id, 3, 4, num_workers,
+                        cfg.mm_block_unit_ht, cfg.history_chunk_width(), cfg.N_block_wt,
+                        cfg.tiles_ht_per_core, cfg.slice_Wt,
+                    )
+                    for worker_id in range(link, num_workers, num_links)
+                ]
+                direction_costs.append(estimate_op_cost(histories, cost_model, 1).total_time)
+        assert cost == pytest.approx(max(direction_costs))
@@ -0,0 +1,61 @@
+import itertools
+
+from balanced_assignment import get_balanced_iteration_history, worker_imbalance_report
+from coverage_check import verify_iteration_history_coverage
+from loop_simulation import get_iteration_history
+
+
+SCHEDULE_KWARGS = dict(
+    batch_size=1,
+    M_blocks_per_core=2,
+    chunks_per_mm_N_block=3,
+    ring_size=3,
+    mm_N_blocks_per_slice=2,
+    last_mm_core_idx=0,
+    num_workers=3,
+    mm_block_unit_ht=2,
+    chunk_width=1,
+    N_block_wt=5,
+)
+LOOP_KWARGS = dict(my_chip_id=1, tile_granularity=2, tiles_ht_per_core=4, slice_Wt=10)
+
+
+def _stream_tiles(get_history):
+    histories = {
+        (direction, worker_id): get_history(
+            direction=direction, worker_id=worker_id, **SCHEDULE_KWARGS, **LOOP_KWARGS
+        )
+        for direction, worker_id in itertools.product([0, 1], range(SCHEDULE_KWARGS["num_workers"]))
+    }
+    tiles = {
+        stream: sum(len(step) for _, slice_idxs, _ in history for step in slice_idxs)
+        for stream, history in histories.items()
+    }
+    return histories, tiles
+
+
+def test_balanced_mode_bounds_imbalance_and_keeps_tiles():
+    """Test the imbalance report against generated schedules in both modes."""
+    histories, tiles = _stream_tiles(get_iteration_history)
+    balanced_histories, balanced_tiles = _stream_tiles(get_balanced_iteration_history)
+
+    report = worker_imbalance_report(**SCHEDULE_KWARGS)
+    balanced_report = worker_imbalance_report(**SCHEDULE_KWARGS, balanced=True)
+    assert report.stream_tiles == tiles
+    assert balanced_report.stream_tiles == balanced_tiles
+    assert report.max_chunk_piece_spread <= 1
+    assert report.spread > 1
+    assert balanced_report.spread <= 1
+
+    # The streams of the chip read every tile of the global tensor exactly once
+    for stream_histories in (histories, balanced_histories):
+        report = verify_iteration_history_coverage(
+            stream_histories.values(), last_mm_core_idx=SCHEDULE_KWARGS["last_mm_core_idx"],
+            tiles_ht_per_core=LOOP_KWARGS["tiles_ht_per_core"], slice_Wt=LOOP_KWARGS["slice_Wt"],
+            ring_size=SCHEDULE_KWARGS["ring_size"], expected_reads_per_tile=SCHEDULE_KWARGS["batch_size"],
+        )
+        assert report.ok
+        assert report.num_reads == report.num_tiles
+    streams = list(histories)
+    assert [record[0] for record in balanced_histories[streams[0]]] == \
+        [record[0] for record in histories[streams[0]]]
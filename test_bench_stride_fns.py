@@ -0,0 +1,35 @@
+import pytest
+
+from bench_stride_fns import BENCH_SHAPES, _history_kwargs, compare_to_baseline
+from config import GridConfig
+
+
+def test_compare_to_baseline_flags_only_slowdowns_past_threshold():
+    """Test that only benchmarks slower than baseline by more than the threshold are reported."""
+    baseline = {
+        "a": {"ns_per_call": 100.0},
+        "b": {"ns_per_call": 100.0},
+        "c": {"ns_per_call": 100.0},
+    }
+    results = {
+        "a": {"ns_per_call": 130.0},
+        "b": {"ns_per_call": 120.0},
+        "c": {"ns_per_call": 50.0},
+        "new": {"ns_per_call": 1000.0},
+    }
+    regressions = compare_to_baseline(results, baseline, threshold=0.25)
+    assert regressions == ["a: 130 ns vs baseline 100 ns (30% slower)"]
+    assert compare_to_baseline(results, baseline, threshold=0.1) == [
+        "a: 130 ns vs baseline 100 ns (30% slower)",
+        "b: 120 ns vs baseline 100 ns (20% slower)",
+    ]
+    assert compare_to_baseline(results, {}, threshold=0.0) == []
+
+
+def test_history_kwargs_keep_chunk_width_in_tiles():
+    """Test that the history benchmarks use each shape's exact chunk width and reject inexpressible ones."""
+    for cfg in BENCH_SHAPES.values():
+        kwargs = _history_kwargs(cfg, num_workers=2)
+        assert kwargs["chunk_width"] * kwargs["mm_block_unit_ht"] == cfg.chunk_width_in_tiles
+    with pytest.raises(ValueError):
+        _history_kwargs(GridConfig(mm_block_unit_wt=3, mm_block_unit_ht=2), num_workers=2)
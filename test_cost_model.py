@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from cost_model import TransferCostModel, estimate_op_cost, get_iteration_history_with_cost
+from loop_simulation import get_iteration_history
+
+
+HISTORY_KWARGS = dict(
+    batch_size=1,
+    M_blocks_per_core=2,
+    chunks_per_mm_N_block=2,
+    my_chip_id=0,
+    direction=0,
+    ring_size=3,
+    mm_N_blocks_per_slice=2,
+    worker_id=0,
+    last_mm_core_idx=1,
+    tile_granularity=2,
+    num_workers=2,
+    mm_block_unit_ht=2,
+    chunk_width=1,
+    N_block_wt=3,
+    tiles_ht_per_core=4,
+    slice_Wt=6,
+)
+
+
+def test_iteration_history_cost():
+    """Test per-step, per-ring-iteration and total times against a hand computation."""
+    cost_model = TransferCostModel(step_overhead=1.0, tile_size_bytes=4, link_bandwidth=2.0)
+    iteration_history, estimate = get_iteration_history_with_cost(**HISTORY_KWARGS, cost_model=cost_model)
+    assert iteration_history == get_iteration_history(**HISTORY_KWARGS)
+
+    # Two workers share the link: 4 bytes at 1 byte/s per tile
+    for (_, slice_idxs, _), times in zip(iteration_history, estimate.step_times):
+        assert times.tolist() == [1.0 + 4.0 * len(step) for step in slice_idxs]
+    num_ring_iterations = 2 * 2 * 3
+    assert len(estimate.ring_iteration_times) == num_ring_iterations
+    assert estimate.total_time == pytest.approx(sum(t.sum() for t in estimate.step_times))
+    assert estimate.total_bytes == 4 * sum(
+        len(step) for _, slice_idxs, _ in iteration_history for step in slice_idxs
+    )
+
+
+def test_op_cost_takes_slowest_worker():
+    """Test that each ring iteration of the op takes as long as its slowest worker."""
+    cost_model = TransferCostModel()
+    histories = [
+        get_iteration_history(**{**HISTORY_KWARGS, "worker_id": worker_id}) for worker_id in range(2)
+    ]
+    op = estimate_op_cost(histories, cost_model, HISTORY_KWARGS["mm_N_blocks_per_slice"])
+    per_worker = [
+        estimate_op_cost([history], cost_model, HISTORY_KWARGS["mm_N_blocks_per_slice"], num_workers=2)
+        for history in histories
+    ]
+    assert np.allclose(
+        op.ring_iteration_times,
+        np.maximum(per_worker[0].ring_iteration_times, per_worker[1].ring_iteration_times)
+    )
@@ -0,0 +1,72 @@
+import itertools
+
+from coverage_check import verify_chunk_piece_partition, verify_iteration_history_coverage
+from loop_simulation import iter_iteration_history
+from stride_idx_vec_fns import read_tiles_granular_with_direction_based_on_num_workers_arrays
+
+
+def test_chunk_piece_partition_exact_cover():
+    """Test that all workers and both directions of the loop and array generators cover each chunk piece exactly once."""
+    read_tiles_fns = [None, read_tiles_granular_with_direction_based_on_num_workers_arrays]
+    for num_workers, chunk_idx, start_mm_core_idx, read_tiles_fn in itertools.product(
+            [1, 2, 3], [0, 1], [0, 1], read_tiles_fns):
+        fn_kwargs = {} if read_tiles_fn is None else dict(read_tiles_fn=read_tiles_fn)
+        slice_report, global_report = verify_chunk_piece_partition(
+            start_tile_row_in_mm_M_block=0,
+            start_chunk_col_in_tiles=0,
+            start_mm_core_idx=start_mm_core_idx,
+            last_mm_core_idx=3,
+            tile_granularity=4,
+            chunk_idx=chunk_idx,
+            num_workers=num_workers,
+            mm_block_unit_ht=2,
+            chunk_width_in_tiles=6,
+            N_block_wt=8,
+            N_block_idx=1,
+            M_block_idx=2,
+            tiles_ht_per_core=8,
+            slice_Wt=16,
+            slice_actual_idx=1,
+            global_Wt=32,
+            **fn_kwargs,
+        )
+        assert slice_report.ok and global_report.ok
+
+
+def test_iteration_history_coverage():
+    """Test that one chip's runs over all workers and directions cover the global tensor."""
+    shape = dict(
+        batch_size=2,
+        M_blocks_per_core=4,
+        chunks_per_mm_N_block=2,
+        my_chip_id=1,
+        ring_size=4,
+        mm_N_blocks_per_slice=2,
+        last_mm_core_idx=1,
+        tile_granularity=4,
+        num_workers=2,
+        mm_block_unit_ht=2,
+        chunk_width=2,
+        N_block_wt=8,
+        tiles_ht_per_core=8,
+        slice_Wt=16,
+    )
+    histories = [
+        iter_iteration_history(worker_id=worker_id, direction=direction, **shape)
+        for worker_id, direction in itertools.product(range(2), [0, 1])
+    ]
+    report = verify_iteration_history_coverage(
+        histories, last_mm_core_idx=1, tiles_ht_per_core=8, slice_Wt=16, ring_size=4,
+        expected_reads_per_tile=2,
+    )
+    assert report.ok
+    assert report.num_reads == report.num_tiles * 2
+
+    # Dropping a worker leaves gaps
+    report = verify_iteration_history_coverage(
+        [iter_iteration_history(worker_id=0, direction=0, **shape)],
+        last_mm_core_idx=1, tiles_ht_per_core=8, slice_Wt=16, ring_size=4,
+        expected_reads_per_tile=2,
+    )
+    assert not report.ok
+    assert len(report.missing) == report.num_tiles * 3 // 4
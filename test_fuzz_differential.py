@@ -0,0 +1,39 @@
+import random
+
+import fuzz_differential
+from fuzz_differential import MIN_CASE, fuzz, is_valid_case, run_check, sample_case, shrink_case
+
+
+def test_fuzz_finds_no_differences():
+    """Test that every check passes on 200 sampled cases, history engines included."""
+    assert fuzz(num_cases=200, seed=0, max_workers=1) == []
+
+
+def test_shrink_case_reaches_minimal_failing_config():
+    """Test shrinking with a check that fails whenever chunks are at least two mm units wide."""
+    def check(case):
+        return "too wide" if case["chunk_width_in_mm_units"] >= 2 else None
+
+    rng = random.Random(1)
+    case = sample_case(rng)
+    while check(case) is None:
+        case = sample_case(rng)
+    shrunk = shrink_case(case, check)
+    assert is_valid_case(shrunk)
+    assert shrunk == {**MIN_CASE, "chunk_width_in_mm_units": 2}
+
+
+def test_history_check_reports_differing_engine(monkeypatch):
+    """Test that the history check names an engine whose output differs."""
+    monkeypatch.setattr(fuzz_differential, "get_iteration_history_from_templates", lambda **kwargs: [])
+    message = run_check(fuzz_differential.check_history_engines, sample_case(random.Random(1)))
+    assert message.startswith("get_iteration_history_from_templates differs")
+
+
+def test_history_check_uses_history_chunk_width():
+    """Test that the history check passes with unequal block dims and skips chunks that are not whole ht units."""
+    case = {**MIN_CASE, "mm_block_unit_ht": 2, "mm_block_unit_wt": 3, "chunk_width_in_mm_units": 2}
+    assert fuzz_differential._history_params(case)["chunk_width"] == 3
+    assert run_check(fuzz_differential.check_history_engines, case) is None
+    case = {**MIN_CASE, "mm_block_unit_ht": 3, "mm_block_unit_wt": 2, "chunk_width_in_mm_units": 2}
+    assert run_check(fuzz_differential.check_history_engines, case) is None
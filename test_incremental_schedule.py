@@ -0,0 +1,57 @@
+import pytest
+
+from incremental_schedule import IncrementalSchedule
+from loop_simulation import get_iteration_history
+
+
+HISTORY_KWARGS = dict(
+    batch_size=2,
+    M_blocks_per_core=3,
+    chunks_per_mm_N_block=3,
+    my_chip_id=1,
+    direction=0,
+    ring_size=3,
+    mm_N_blocks_per_slice=2,
+    worker_id=1,
+    last_mm_core_idx=2,
+    tile_granularity=3,
+    num_workers=2,
+    mm_block_unit_ht=2,
+    chunk_width=1,
+    N_block_wt=5,
+    tiles_ht_per_core=6,
+    slice_Wt=10,
+)
+
+
+@pytest.mark.parametrize("changes,rebuilds_templates", [
+    ({"tile_granularity": 2}, False),
+    ({"my_chip_id": 2}, False),
+    ({"ring_size": 4}, False),
+    ({"slice_Wt": 12}, False),
+    ({"batch_size": 3}, False),
+    ({"direction": 1}, True),
+    ({"num_workers": 3}, True),
+    ({"N_block_wt": 6}, True),
+])
+def test_incremental_update_matches_full_recompute(changes, rebuilds_templates):
+    """Test that a patched schedule equals a fresh get_iteration_history run."""
+    schedule = IncrementalSchedule(**HISTORY_KWARGS)
+    assert schedule.iteration_history == get_iteration_history(**HISTORY_KWARGS)
+    template_builds = schedule.template_builds
+
+    schedule.update(**changes)
+    assert schedule.iteration_history == get_iteration_history(**{**HISTORY_KWARGS, **changes})
+    assert (schedule.template_builds > template_builds) == rebuilds_templates
+
+
+def test_incremental_update_rejects_unknown_field():
+    """Test that unknown arguments and a non-positive tile_granularity raise ValueError."""
+    schedule = IncrementalSchedule(**HISTORY_KWARGS)
+    with pytest.raises(ValueError):
+        schedule.update(slice_actual_idx=1)
+    with pytest.raises(ValueError):
+        schedule.update(tile_granularity=0)
+    assert schedule.params["tile_granularity"] == HISTORY_KWARGS["tile_granularity"]
+    with pytest.raises(ValueError):
+        IncrementalSchedule(**{**HISTORY_KWARGS, "tile_granularity": 0})
@@ -0,0 +1,49 @@
+import numpy as np
+
+from inverse_index import TileProducer, build_inverse_tile_index
+from ring_schedule_pool import get_ring_schedules
+
+
+RING_KWARGS = dict(
+    M_blocks_per_core=2,
+    chunks_per_mm_N_block=2,
+    ring_size=3,
+    mm_N_blocks_per_slice=2,
+    last_mm_core_idx=1,
+    tile_granularity=3,
+    num_workers=2,
+    mm_block_unit_ht=2,
+    chunk_width=1,
+    N_block_wt=3,
+    tiles_ht_per_core=4,
+    slice_Wt=6,
+)
+
+
+def test_inverse_index_matches_forward_schedules():
+    """Test every indexed tile against the forward schedules, and batch lookups."""
+    index = build_inverse_tile_index(**RING_KWARGS, max_workers=1)
+    schedules = get_ring_schedules(batch_size=1, **RING_KWARGS, max_workers=1)
+    pieces = RING_KWARGS["mm_N_blocks_per_slice"]
+
+    num_reads = np.zeros(index.read_counts.shape, dtype=np.int32)
+    for (chip, direction, worker_id), iteration_history in schedules.items():
+        for n, ((_, m_block_iter, chunk_idx, chunk_piece_idx), _, global_idxs) in enumerate(iteration_history):
+            for step_idx, step in enumerate(global_idxs):
+                for global_tile_idx in step:
+                    num_reads[chip, global_tile_idx] += 1
+                    assert index.lookup(chip, global_tile_idx) == TileProducer(
+                        direction, worker_id, n // pieces % RING_KWARGS["ring_size"],
+                        m_block_iter, chunk_idx, chunk_piece_idx, step_idx
+                    )
+    assert index.read_counts.tolist() == num_reads.tolist()
+    # Each chip gathers the whole global tensor exactly once per batch
+    assert np.all(index.read_counts == 1)
+    assert len(index.duplicated_tiles(0)) == 0
+
+    tiles = np.arange(index.num_global_tiles)
+    many = index.lookup_many(1, tiles)
+    for global_tile_idx in tiles[::7]:
+        producer = index.lookup(1, int(global_tile_idx))
+        assert producer.worker_id == many["worker_id"][global_tile_idx]
+        assert producer.step_idx == many["step_idx"][global_tile_idx]
@@ -0,0 +1,66 @@
+from iteration_table import build_iteration_history_table
+from loop_simulation import get_iteration_history
+
+
+HISTORY_KWARGS = dict(
+    batch_size=1,
+    M_blocks_per_core=4,
+    chunks_per_mm_N_block=2,
+    my_chip_id=0,
+    direction=0,
+    ring_size=2,
+    mm_N_blocks_per_slice=2,
+    worker_id=0,
+    last_mm_core_idx=3,
+    tile_granularity=3,
+    num_workers=2,
+    mm_block_unit_ht=2,
+    chunk_width=2,
+    N_block_wt=8,
+    tiles_ht_per_core=8,
+    slice_Wt=16,
+)
+
+
+def test_table_matches_iteration_history():
+    """Test that the table rows flatten get_iteration_history in order."""
+    table = build_iteration_history_table(**HISTORY_KWARGS)
+    iteration_history = get_iteration_history(**HISTORY_KWARGS)
+
+    expected_rows = [
+        (iteration_id, step_idx, slice_idx, global_idx)
+        for iteration_id, slice_idxs, global_idxs in iteration_history
+        for step_idx, (step_slice_idxs, step_global_idxs) in enumerate(zip(slice_idxs, global_idxs))
+        for slice_idx, global_idx in zip(step_slice_idxs, step_global_idxs)
+    ]
+    rows = list(zip(
+        zip(table.batch.tolist(), table.m_block_iter.tolist(),
+            table.chunk_idx.tolist(), table.chunk_piece_idx.tolist()),
+        table.step_idx.tolist(), table.slice_idx.tolist(), table.global_idx.tolist()
+    ))
+    assert rows == expected_rows
+
+
+def test_table_filter_and_group_by():
+    """Test filter and group_by queries against the record list."""
+    table = build_iteration_history_table(**HISTORY_KWARGS)
+    iteration_history = get_iteration_history(**HISTORY_KWARGS)
+
+    # Ring iteration 1 is every second group of mm_N_blocks_per_slice records
+    records_per_ring = HISTORY_KWARGS["mm_N_blocks_per_slice"]
+    expected = [
+        global_idx
+        for n, (iteration_id, _, global_idxs) in enumerate(iteration_history)
+        if (n // records_per_ring) % 2 == 1 and iteration_id[1] == 2
+        for step in global_idxs
+        for global_idx in step
+    ]
+    selected = table.filter(ring_iteration=1, m_block_iter=2)
+    assert selected.global_idx.tolist() == expected
+    assert set(selected.actual_slice_idx.tolist()) == {0}
+
+    groups = table.group_by("ring_iteration", "chunk_idx")
+    assert sorted(groups) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+    assert sum(len(group) for group in groups.values()) == len(table)
+    assert table.count_by("ring_iteration") == {(0,): len(table) // 2, (1,): len(table) // 2}
+    assert len(table.filter(chunk_piece_idx=[0, 1], step_idx=0)) == len(table.filter(step_idx=0))
@@ -0,0 +1,89 @@
+import inspect
+import sys
+
+import pytest
+
+import coverage_check
+import loop_simulation
+import profiling as profiling_module
+import stride_fns
+import stride_idx_fns
+import tile_trace
+from loop_simulation import get_iteration_history
+from profiling import profiling
+
+
+HISTORY_ARGS = (2, 4, 2, 0, 0, 2, 2, 0, 3, 4, 2, 2, 2, 8, 8, 16)
+
+
+def test_profiling_counts_and_restores():
+    """Test call counts and tile counts through a from-import, and that everything is restored."""
+    iteration_history = get_iteration_history(*HISTORY_ARGS)
+    num_tiles = sum(len(step) for _, slice_idxs, _ in iteration_history for step in slice_idxs)
+    helper = stride_idx_fns.coordinates_to_slice_coordinates
+
+    with profiling() as profile:
+        assert get_iteration_history(*HISTORY_ARGS) == iteration_history
+        assert "cfg_snapshot" in inspect.signature(stride_idx_fns.read_tiles_granular).parameters
+
+    history_name = "loop_simulation.get_iteration_history"
+    generator_name = "stride_idx_fns.read_tiles_granular_with_direction_based_on_num_workers"
+    assert profile.calls[history_name] == 1
+    assert profile.tiles[history_name] == num_tiles
+    assert profile.seconds[history_name] > 0
+    assert profile.calls[generator_name] == len(iteration_history)
+    assert profile.tiles[generator_name] == num_tiles
+    assert profile.calls["stride_idx_fns.coordinates_to_slice_coordinates"] == num_tiles
+    assert profile.level_seconds == {}
+    assert "tiles/s" in profile.report()
+
+    assert stride_idx_fns.coordinates_to_slice_coordinates is helper
+    calls = profile.calls["stride_fns.how_many_tiles_to_read_formula"]
+    stride_fns.how_many_tiles_to_read_formula(0, 0, 0, 1, 2, 8, 4)
+    assert profile.calls["stride_fns.how_many_tiles_to_read_formula"] == calls
+    assert tile_trace.sinks == []
+
+
+def test_profiling_levels():
+    """Test that levels=True times every get_iteration_history level."""
+    iteration_history = get_iteration_history(*HISTORY_ARGS)
+
+    with profiling(levels=True) as profile:
+        get_iteration_history(*HISTORY_ARGS)
+
+    assert profile.level_calls["chunk_piece_idx"] == len(iteration_history)
+    assert profile.level_calls["batch"] == HISTORY_ARGS[0]
+    assert profile.level_seconds["batch"] <= profile.seconds["loop_simulation.get_iteration_history"]
+    assert tile_trace.sinks == []
+
+
+def test_profiling_rejects_nesting():
+    """Test that a second profiling() inside an active one is rejected."""
+    with profiling():
+        with pytest.raises(ValueError):
+            with profiling():
+                pass
+
+
+def test_profiling_restores_on_exception():
+    """Test that globals, from-imports and defaults are bound back when the with block raises."""
+    history = get_iteration_history
+    generator = stride_idx_fns.read_tiles_granular_with_direction_based_on_num_workers
+    defaults = loop_simulation.iter_iteration_history.__defaults__
+    with pytest.raises(RuntimeError):
+        with profiling(levels=True):
+            assert get_iteration_history is not history
+            assert loop_simulation.get_iteration_history is not history
+            assert coverage_check.read_tiles_granular_with_direction_based_on_num_workers is not generator
+            assert loop_simulation.iter_iteration_history.__defaults__ != defaults
+            raise RuntimeError
+
+    assert get_iteration_history is history
+    assert loop_simulation.get_iteration_history is history
+    assert coverage_check.read_tiles_granular_with_direction_based_on_num_workers is generator
+    assert loop_simulation.iter_iteration_history.__defaults__ == defaults
+    assert defaults[-1] is generator
+    for fn in profiling_module._registry:
+        assert getattr(sys.modules[fn.__module__], fn.__name__) is fn
+    assert profiling_module.active is None
+    assert tile_trace.sinks == []
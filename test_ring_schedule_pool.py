@@ -0,0 +1,29 @@
+from loop_simulation import get_iteration_history
+from ring_schedule_pool import get_ring_schedules
+
+
+def test_ring_schedules_match_sequential():
+    """Test that the pooled schedules match per-combination get_iteration_history calls."""
+    kwargs = dict(
+        batch_size=1,
+        M_blocks_per_core=2,
+        chunks_per_mm_N_block=1,
+        ring_size=4,
+        mm_N_blocks_per_slice=1,
+        last_mm_core_idx=0,
+        tile_granularity=8,
+        num_workers=2,
+        mm_block_unit_ht=2,
+        chunk_width=2,
+        N_block_wt=4,
+        tiles_ht_per_core=4,
+        slice_Wt=4,
+    )
+    schedules = get_ring_schedules(**kwargs, max_workers=2)
+
+    assert len(schedules) == 4 * 2 * 2
+    for (my_chip_id, direction, worker_id), iteration_history in schedules.items():
+        assert iteration_history == get_iteration_history(
+            my_chip_id=my_chip_id, direction=direction, worker_id=worker_id, **kwargs
+        )
+    assert get_ring_schedules(**kwargs, max_workers=1) == schedules
@@ -0,0 +1,63 @@
+import numpy as np
+
+from loop_simulation import iter_iteration_params
+from ring_schedule_pool import get_ring_schedules
+from ring_simulator import ring_slice_order, simulate_ring
+
+
+RING_KWARGS = dict(
+    batch_size=1,
+    M_blocks_per_core=2,
+    chunks_per_mm_N_block=2,
+    ring_size=4,
+    mm_N_blocks_per_slice=2,
+    last_mm_core_idx=1,
+    tile_granularity=3,
+    num_workers=2,
+    mm_block_unit_ht=2,
+    chunk_width=1,
+    N_block_wt=3,
+    tiles_ht_per_core=4,
+    slice_Wt=6,
+)
+
+
+def test_ring_slice_order_matches_loop_wrap():
+    """Test that the modular slice order matches the slice_idx wrap of iter_iteration_params."""
+    for ring_size in [1, 2, 5]:
+        for my_chip_id in range(ring_size):
+            for direction in [0, 1]:
+                loop_order = [
+                    read_kwargs["slice_actual_idx"]
+                    for _, _, read_kwargs in iter_iteration_params(
+                        1, 1, 1, my_chip_id, direction, ring_size, 1, 0, 0, 1, 1, 1, 1, 1, 1, 1
+                    )
+                ]
+                assert ring_slice_order(my_chip_id, direction, ring_size).tolist() == loop_order
+
+
+def test_ring_timeline_matches_per_chip_schedules():
+    """Test link totals and carried slices against the per-chip iteration histories."""
+    timeline = simulate_ring(**RING_KWARGS)
+    schedules = get_ring_schedules(**RING_KWARGS, max_workers=1)
+    ring_size = RING_KWARGS["ring_size"]
+
+    expected_totals = np.zeros((ring_size, 2), dtype=np.int64)
+    for (chip, direction, _), iteration_history in schedules.items():
+        expected_totals[chip, direction] += sum(
+            len(step) for _, slice_idxs, _ in iteration_history for step in slice_idxs
+        )
+    assert timeline.link_totals().tolist() == expected_totals.tolist()
+    assert timeline.tiles.shape == (len(timeline.slots), ring_size, 2)
+
+    for s, (_, ring_iteration, _, _) in enumerate(timeline.slots):
+        for chip in range(ring_size):
+            for direction in [0, 1]:
+                if timeline.tiles[s, chip, direction] > 0:
+                    assert timeline.slice_ids[s, chip, direction] == \
+                        ring_slice_order(chip, direction, ring_size)[ring_iteration]
+                else:
+                    assert timeline.slice_ids[s, chip, direction] == -1
+    assert np.all((timeline.busy_fraction() > 0) & (timeline.busy_fraction() <= 1))
+    # Chips differ only in the slice they carry
+    assert np.array_equal(timeline.tiles, np.broadcast_to(timeline.tiles[:, :1], timeline.tiles.shape))
@@ -0,0 +1,105 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from coverage_check import verify_iteration_history_coverage
+from loop_simulation import get_iteration_history
+from schedule_cli import HISTORY_COLUMNS, history_params, main
+from stride_idx_fns import read_tiles_granular_with_direction_based_on_num_workers
+
+
+def _flatten_history(iteration_history, ring_size, mm_N_blocks_per_slice):
+    rows = []
+    for n, (iteration_id, slice_idxs, global_idxs) in enumerate(iteration_history):
+        ring_iteration = n // mm_N_blocks_per_slice % ring_size
+        for step_idx, (step_slice, step_global) in enumerate(zip(slice_idxs, global_idxs)):
+            rows.extend([*iteration_id, ring_iteration, step_idx, s, g]
+                        for s, g in zip(step_slice, step_global))
+    return rows
+
+
+def test_history_formats_match_get_iteration_history(tmp_path):
+    """Test csv, binary and jsonl history output against get_iteration_history."""
+    config_path = tmp_path / "shape.json"
+    config_path.write_text(json.dumps({"ring_size": 3, "batch_size": 2, "num_workers": 4}))
+    argv = ["history", "--config", str(config_path), "--num-workers", "2", "--tile-granularity", "3"]
+    params = history_params({"ring_size": 3, "batch_size": 2, "num_workers": 2, "tile_granularity": 3})
+    iteration_history = get_iteration_history(**params)
+    expected_rows = _flatten_history(iteration_history, params["ring_size"], params["mm_N_blocks_per_slice"])
+
+    assert main(argv + ["--format", "csv", "-o", str(tmp_path / "out.csv")]) == 0
+    with open(tmp_path / "out.csv") as f:
+        rows = list(csv.reader(f))
+    assert tuple(rows[0]) == HISTORY_COLUMNS
+    assert [[int(v) for v in row] for row in rows[1:]] == expected_rows
+
+    assert main(argv + ["--format", "binary", "-o", str(tmp_path / "out.bin")]) == 0
+    binary_rows = np.fromfile(tmp_path / "out.bin", dtype="<i8").reshape(-1, len(HISTORY_COLUMNS))
+    assert binary_rows.tolist() == expected_rows
+
+    assert main(argv + ["--format", "jsonl", "-o", str(tmp_path / "out.jsonl")]) == 0
+    with open(tmp_path / "out.jsonl") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["slice_idxs"] for line in lines] == [
+        step for _, slice_idxs, _ in iteration_history for step in slice_idxs
+    ]
+
+
+def test_generator_jsonl(tmp_path, capsysbinary):
+    """Test generator jsonl output on stdout against the loop generator."""
+    assert main(["generator", "--num-workers", "2", "--direction", "1", "--last-mm-core-idx", "1"]) == 0
+    lines = [json.loads(line) for line in capsysbinary.readouterr().out.splitlines()]
+    slice_idxs, global_idxs = read_tiles_granular_with_direction_based_on_num_workers(
+        worker_id=0, start_tile_row_in_mm_M_block=0, start_chunk_col_in_tiles=0,
+        start_mm_core_idx=0, last_mm_core_idx=1, tile_granularity=8, chunk_idx=0,
+        direction=1, num_workers=2, mm_block_unit_ht=2, chunk_width_in_tiles=6,
+        N_block_wt=8, N_block_idx=0, M_block_idx=0, tiles_ht_per_core=8,
+        slice_Wt=16, slice_actual_idx=0, global_Wt=32,
+    )
+    assert [line["slice_idxs"] for line in lines] == slice_idxs
+    assert [line["global_idxs"] for line in lines] == global_idxs
+
+
+def test_history_params_chunk_width_with_unequal_block_dims():
+    """Test that a chunk width that is not a multiple of mm_block_unit_ht is rejected unless given."""
+    shape = {"mm_block_unit_ht": 3, "mm_block_unit_wt": 2, "chunk_width_in_mm_units": 2}
+    with pytest.raises(ValueError):
+        history_params(shape)
+    with pytest.raises(SystemExit):
+        main(["history", "--mm-block-unit-ht", "3", "--mm-block-unit-wt", "2",
+              "--chunk-width-in-mm-units", "2"])
+
+    shape = {"mm_block_unit_ht": 2, "mm_block_unit_wt": 3, "chunk_width_in_mm_units": 2}
+    params = history_params(shape)
+    assert params["chunk_width"] * params["mm_block_unit_ht"] == 6
+    assert params["chunks_per_mm_N_block"] == 2
+
+    # An explicit chunk_width also sets the chunk count, so every tile is read
+    params = history_params({"mm_block_unit_ht": 3, "mm_block_unit_wt": 2, "chunk_width": 1})
+    assert params["chunks_per_mm_N_block"] == 3
+    histories = [
+        get_iteration_history(**{**params, "direction": direction, "worker_id": worker_id})
+        for direction in [0, 1] for worker_id in range(params["num_workers"])
+    ]
+    report = verify_iteration_history_coverage(
+        histories, params["last_mm_core_idx"], params["tiles_ht_per_core"],
+        params["slice_Wt"], params["ring_size"]
+    )
+    assert report.ok
+
+
+@pytest.mark.parametrize("argv", [
+    ["history", "--tile-granularity", "0"],
+    ["history", "--worker-id", "4", "--num-workers", "4"],
+    ["history", "--n-block-idx", "1"],
+    ["generator", "--tile-granularity", "0"],
+    ["generator", "--start-mm-core-idx", "2", "--last-mm-core-idx", "1"],
+])
+def test_invalid_params_are_rejected_before_output(tmp_path, argv):
+    """Test that bad parameters exit through the parser before the output file is opened."""
+    out_path = tmp_path / "out.csv"
+    with pytest.raises(SystemExit):
+        main(argv + ["--format", "csv", "-o", str(out_path)])
+    assert not out_path.exists()
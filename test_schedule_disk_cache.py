@@ -0,0 +1,138 @@
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+import config
+import tile_trace
+from config import GridConfig, reset_config
+from loop_simulation import get_iteration_history
+from schedule_disk_cache import ScheduleDiskCache, _decode, _encode
+from stride_idx_fns import read_tiles_granular_with_direction
+from tile_trace import StepStarted, TileEmitted
+
+
+HISTORY_KWARGS = dict(
+    batch_size=1, M_blocks_per_core=2, chunks_per_mm_N_block=2, my_chip_id=0,
+    direction=1, ring_size=2, mm_N_blocks_per_slice=2, worker_id=0,
+    last_mm_core_idx=1, tile_granularity=3, num_workers=2, mm_block_unit_ht=2,
+    chunk_width=1, N_block_wt=3, tiles_ht_per_core=4, slice_Wt=6,
+)
+
+
+def test_cache_hits_return_same_history(tmp_path):
+    """Test that hits, by keyword or position and from a new instance, return the computed history."""
+    cache = ScheduleDiskCache(str(tmp_path))
+    expected = get_iteration_history(**HISTORY_KWARGS)
+    assert cache.call(get_iteration_history, **HISTORY_KWARGS) == expected
+    assert ScheduleDiskCache(str(tmp_path)).call(get_iteration_history, **HISTORY_KWARGS) == expected
+    assert cache.call(get_iteration_history, **{**HISTORY_KWARGS, "batch_size": 0}) == []
+    assert (cache.hits, cache.misses) == (0, 2)
+    positional = ScheduleDiskCache(str(tmp_path))
+    assert positional.call(get_iteration_history, *HISTORY_KWARGS.values()) == expected
+    assert positional.hits == 1
+
+
+def test_cache_keys_include_global_config(tmp_path):
+    """Test that generators reading the global config are keyed by its values."""
+    cache = ScheduleDiskCache(str(tmp_path))
+    args = (0, 0, 0, 0, 2, 1, 4, 0, 0)
+    try:
+        for cfg in [GridConfig(), GridConfig(mm_block_unit_ht=3)]:
+            config.cfg = cfg
+            assert cache.call(read_tiles_granular_with_direction, *args) == \
+                read_tiles_granular_with_direction(*args)
+    finally:
+        reset_config()
+    assert cache.misses == 2
+    with pytest.raises(ValueError):
+        cache.call(print, "not a schedule")
+
+
+def test_cache_entries_are_compressed_and_narrow(tmp_path):
+    """Test that entries are deflated and store indices in the narrowest dtype that fits."""
+    cache = ScheduleDiskCache(str(tmp_path))
+    cache.call(get_iteration_history, **HISTORY_KWARGS)
+    [name] = [name for name in os.listdir(tmp_path) if name.endswith(".npz")]
+    with zipfile.ZipFile(tmp_path / name) as entry:
+        assert all(info.compress_type == zipfile.ZIP_DEFLATED for info in entry.infolist())
+    with np.load(tmp_path / name) as arrays:
+        assert all(arrays[name].dtype == np.uint8 for name in arrays.files)
+
+    records = [((0, 1, 2, 3), [[0, 70000], [255]], [[1 << 40, 2], [3]])]
+    arrays = _encode(records)
+    assert arrays["slice_idxs"].dtype == np.uint32
+    assert arrays["global_idxs"].dtype == np.int64
+    assert arrays["step_offsets"].dtype == np.uint8
+    assert _decode(arrays) == records
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that eviction removes the entry read longest ago and keeps recently read ones."""
+    cache = ScheduleDiskCache(str(tmp_path))
+    kwargs_a, kwargs_b, kwargs_c = [{**HISTORY_KWARGS, "worker_id": worker_id} for worker_id in range(3)]
+    for age, kwargs in [(200, kwargs_a), (100, kwargs_b)]:
+        cache.call(get_iteration_history, **kwargs)
+        path = tmp_path / (cache.key(get_iteration_history, cache._bind(get_iteration_history, (), kwargs)) + ".npz")
+        mtime = os.path.getmtime(path) - age
+        os.utime(path, (mtime, mtime))
+    # Reading A makes B the least recently used entry
+    cache.call(get_iteration_history, **kwargs_a)
+    cache.max_bytes = cache.size_bytes() * 5 // 4
+    cache.call(get_iteration_history, **kwargs_c)
+    assert cache.size_bytes() <= cache.max_bytes
+
+    hits, misses = cache.hits, cache.misses
+    cache.call(get_iteration_history, **kwargs_a)
+    cache.call(get_iteration_history, **kwargs_c)
+    assert cache.hits == hits + 2
+    cache.call(get_iteration_history, **kwargs_b)
+    assert cache.misses == misses + 1
+
+
+def test_cache_recomputes_corrupt_entries(tmp_path):
+    """Test that an unreadable entry is removed and recomputed instead of raising."""
+    cache = ScheduleDiskCache(str(tmp_path))
+    expected = cache.call(get_iteration_history, **HISTORY_KWARGS)
+    [path] = tmp_path.glob("*.npz")
+    for contents in [path.read_bytes()[:100], b"not an npz file"]:
+        path.write_bytes(contents)
+        assert cache.call(get_iteration_history, **HISTORY_KWARGS) == expected
+        assert cache.call(get_iteration_history, **HISTORY_KWARGS) == expected
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_cache_hits_replay_trace_events(tmp_path):
+    """Test that a hit emits the same step and tile events as the generator."""
+    cache = ScheduleDiskCache(str(tmp_path))
+    args = (0, 0, 0, 0, 2, 1, 4, 0, 1)
+    cache.call(read_tiles_granular_with_direction, *args)
+    cache.call(get_iteration_history, **HISTORY_KWARGS)
+
+    def step_events(events):
+        return [event for event in events if isinstance(event, (StepStarted, TileEmitted))]
+
+    for fn, fn_args, fn_kwargs in [(read_tiles_granular_with_direction, args, {}),
+                                   (get_iteration_history, (), HISTORY_KWARGS)]:
+        expected, cached = [], []
+        with tile_trace.tracing(expected.append):
+            fn(*fn_args, **fn_kwargs)
+        with tile_trace.tracing(cached.append):
+            cache.call(fn, *fn_args, **fn_kwargs)
+        assert step_events(cached) == step_events(expected)
+        assert len(cached) == len(step_events(expected)) > 0
+    assert cache.hits == 2
+
+
+def _cached_history(directory):
+    return ScheduleDiskCache(directory).call(get_iteration_history, **HISTORY_KWARGS)
+
+
+def test_cache_concurrent_processes(tmp_path):
+    """Test that processes sharing a directory all get the history and leave one entry."""
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(_cached_history, [str(tmp_path)] * 8))
+    assert all(result == get_iteration_history(**HISTORY_KWARGS) for result in results)
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".npz")]) == 1
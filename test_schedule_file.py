@@ -0,0 +1,53 @@
+from config import GridConfig
+from loop_simulation import get_iteration_history
+from schedule_file import ScheduleFile, write_schedule_file
+
+
+HISTORY_KWARGS = dict(
+    batch_size=2,
+    M_blocks_per_core=4,
+    chunks_per_mm_N_block=2,
+    my_chip_id=0,
+    direction=1,
+    ring_size=2,
+    mm_N_blocks_per_slice=2,
+    worker_id=1,
+    last_mm_core_idx=3,
+    tile_granularity=3,
+    num_workers=2,
+    mm_block_unit_ht=2,
+    chunk_width=2,
+    N_block_wt=8,
+    tiles_ht_per_core=8,
+    slice_Wt=16,
+)
+
+
+def test_schedule_file_round_trip(tmp_path):
+    """Test that a written schedule file reads back as the same iteration history."""
+    path = str(tmp_path / "schedule.bin")
+    cfg = GridConfig(ring_size=2)
+    write_schedule_file(path, **HISTORY_KWARGS, cfg=cfg)
+
+    schedule = ScheduleFile(path)
+    assert schedule.history_params == HISTORY_KWARGS
+    assert schedule.grid_config == cfg.snapshot()
+    assert schedule.to_iteration_history() == get_iteration_history(**HISTORY_KWARGS)
+
+
+def test_schedule_file_random_access(tmp_path):
+    """Test direct lookup of one (iteration_id, ring step) record."""
+    path = str(tmp_path / "schedule.bin")
+    write_schedule_file(path, **HISTORY_KWARGS)
+    iteration_history = get_iteration_history(**HISTORY_KWARGS)
+
+    schedule = ScheduleFile(path)
+    assert schedule.grid_config is None
+    n = schedule.find((1, 2, 1, 0), ring_iteration=1)
+    iteration_id, slice_idxs, global_idxs, step_offsets = schedule.record(n)
+    assert iteration_id == (1, 2, 1, 0)
+    expected = iteration_history[n]
+    assert expected[0] == iteration_id
+    assert [slice_idxs[step_offsets[s]:step_offsets[s + 1]].tolist()
+            for s in range(len(step_offsets) - 1)] == expected[1]
+    assert global_idxs.tolist() == [i for step in expected[2] for i in step]
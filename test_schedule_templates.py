@@ -0,0 +1,47 @@
+import itertools
+
+import tile_trace
+
+from loop_simulation import get_iteration_history
+from schedule_templates import get_iteration_history_from_templates
+
+
+def test_templates_match_get_iteration_history():
+    """Test get_iteration_history_from_templates against get_iteration_history."""
+    shapes = [
+        dict(M_blocks_per_core=4, chunks_per_mm_N_block=2, ring_size=2, mm_N_blocks_per_slice=2,
+             last_mm_core_idx=3, mm_block_unit_ht=2, chunk_width=2, N_block_wt=8,
+             tiles_ht_per_core=8, slice_Wt=16),
+        dict(M_blocks_per_core=2, chunks_per_mm_N_block=2, ring_size=4, mm_N_blocks_per_slice=1,
+             last_mm_core_idx=1, mm_block_unit_ht=2, chunk_width=2, N_block_wt=6,
+             tiles_ht_per_core=4, slice_Wt=6),
+    ]
+    for shape, my_chip_id, direction, worker_id, batch_size in itertools.product(
+            shapes, [0, 1], [0, 1], [0, 1], [1, 3]):
+        kwargs = dict(
+            batch_size=batch_size,
+            my_chip_id=my_chip_id,
+            direction=direction,
+            worker_id=worker_id,
+            tile_granularity=3,
+            num_workers=2,
+            **shape,
+        )
+        assert get_iteration_history_from_templates(**kwargs) == get_iteration_history(**kwargs)
+
+
+def test_templates_emit_same_trace_events():
+    """Test that the template path emits the same trace events as get_iteration_history."""
+    kwargs = dict(
+        batch_size=2, M_blocks_per_core=2, chunks_per_mm_N_block=2, my_chip_id=1,
+        direction=1, ring_size=4, mm_N_blocks_per_slice=1, worker_id=1,
+        last_mm_core_idx=1, tile_granularity=3, num_workers=2, mm_block_unit_ht=2,
+        chunk_width=2, N_block_wt=6, tiles_ht_per_core=4, slice_Wt=6,
+    )
+    loop_events, template_events = [], []
+    with tile_trace.tracing(loop_events.append):
+        get_iteration_history(**kwargs)
+    with tile_trace.tracing(template_events.append):
+        get_iteration_history_from_templates(**kwargs)
+    assert template_events == loop_events
+    assert any(isinstance(event, tile_trace.TileEmitted) for event in loop_events)
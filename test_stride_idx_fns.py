@@ -1,3 +1,7 @@
+import dataclasses
+
+import pytest
+
 import config
 from config import GridConfig, reset_config
 from stride_idx_fns import (
@@ -6,8 +10,15 @@ from stride_idx_fns import (
     read_tiles_granular_from_params_with_direction,
     read_tiles_granular_with_direction_based_on_num_workers_from_params,
     read_tiles_granular_with_direction_based_on_num_workers,
+    read_tiles_granular,
+    read_tiles_granular_with_direction,
+)
+from loop_simulation import (
+    get_iteration_history,
+    iter_iteration_history,
+    iter_iteration_history_steps,
 )
-from loop_simulation import get_iteration_history
+from stride_idx_vec_fns import read_tiles_granular_with_direction_based_on_num_workers_vec
 
 
 def test_basic_configuration():
@@ -644,3 +655,80 @@ def test_get_iteration_history_current_example():
     ]
 
     assert iteration_history == expected_iteration_history, "iteration_history mismatch"
+
+
+def test_iter_iteration_history_streams_same_records():
+    """Test iter_iteration_history and iter_iteration_history_steps against get_iteration_history."""
+    kwargs = dict(
+        batch_size=2,
+        M_blocks_per_core=4,
+        chunks_per_mm_N_block=2,
+        my_chip_id=0,
+        direction=0,
+        ring_size=2,
+        mm_N_blocks_per_slice=2,
+        worker_id=0,
+        last_mm_core_idx=3,
+        tile_granularity=3,
+        num_workers=2,
+        mm_block_unit_ht=2,
+        chunk_width=2,
+        N_block_wt=8,
+        tiles_ht_per_core=8,
+        slice_Wt=16,
+    )
+    iteration_history = get_iteration_history(**kwargs)
+
+    assert list(iter_iteration_history(**kwargs)) == iteration_history
+    assert list(iter_iteration_history(
+        **kwargs, read_tiles_fn=read_tiles_granular_with_direction_based_on_num_workers_vec
+    )) == iteration_history
+
+    expected_steps = [
+        (iteration_id, step_idx, step_slice_idxs, step_global_idxs)
+        for iteration_id, slice_idxs, global_idxs in iteration_history
+        for step_idx, (step_slice_idxs, step_global_idxs) in enumerate(zip(slice_idxs, global_idxs))
+    ]
+    assert list(iter_iteration_history_steps(**kwargs)) == expected_steps
+
+
+def test_config_snapshot_passed_explicitly():
+    """Test that an explicit GridConfigSnapshot replaces the global config and is hashable."""
+    cfg = GridConfig(
+        mm_block_unit_wt=2,
+        mm_blocks_per_N_block=4,
+        chunk_width_in_mm_units=2,
+        mm_block_unit_ht=2,
+        mm_M_unit_blocks_per_core=4,
+        mm_N_blocks_per_slice=2,
+        ring_size=2,
+        N_block_idx=0,
+        M_block_idx=0,
+        slice_actual_idx=0,
+    )
+    snapshot = cfg.snapshot()
+    assert hash(snapshot) == hash(cfg.snapshot())
+    assert snapshot.global_Wt == 32
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.ring_size = 4
+
+    # The global config is deliberately different; the snapshot must win
+    reset_config(GridConfig(ring_size=8, slice_actual_idx=3))
+    try:
+        slice_idxs, global_idxs = read_tiles_granular(
+            worker_id=0, start_tile_row_in_mm_M_block=0, start_chunk_col_in_tiles=0,
+            start_mm_core_idx=0, advance_by_tiles=2, last_mm_core_idx=3,
+            tile_granularity=4, chunk_idx=0, cfg_snapshot=snapshot,
+        )
+        assert slice_idxs == [[0, 2, 16, 18], [128, 130, 144, 146], [256, 258, 272, 274], [384, 386, 400, 402]]
+        assert global_idxs == [[0, 2, 32, 34], [256, 258, 288, 290], [512, 514, 544, 546], [768, 770, 800, 802]]
+
+        slice_idxs, global_idxs = read_tiles_granular_with_direction(
+            worker_id=1, start_tile_row_in_mm_M_block=0, start_chunk_col_in_tiles=0,
+            start_mm_core_idx=0, advance_by_tiles=2, last_mm_core_idx=3,
+            tile_granularity=4, chunk_idx=0, direction=1, cfg_snapshot=snapshot,
+        )
+        assert slice_idxs == [[3, 19, 131, 147], [259, 275, 387, 403]]
+        assert global_idxs == [[3, 35, 259, 291], [515, 547, 771, 803]]
+    finally:
+        reset_config()
@@ -0,0 +1,70 @@
+import itertools
+
+from stride_idx_fns import read_tiles_granular_with_direction_based_on_num_workers
+from stride_idx_run_fns import (
+    expand_runs,
+    read_tiles_granular_with_direction_based_on_num_workers_runs,
+)
+
+
+def test_runs_golden_num_workers_2():
+    """Test the run-length output for the configuration of test_direction_based_on_num_workers."""
+    slice_runs, global_runs = read_tiles_granular_with_direction_based_on_num_workers_runs(
+        worker_id=0,
+        start_tile_row_in_mm_M_block=0,
+        start_chunk_col_in_tiles=0,
+        start_mm_core_idx=0,
+        last_mm_core_idx=3,
+        tile_granularity=4,
+        chunk_idx=0,
+        direction=0,
+        num_workers=2,
+        mm_block_unit_ht=2,
+        chunk_width_in_tiles=4,
+        N_block_wt=8,
+        N_block_idx=0,
+        M_block_idx=0,
+        tiles_ht_per_core=8,
+        slice_Wt=16,
+        slice_actual_idx=0,
+        global_Wt=32,
+    )
+    # [[0, 16, 128, 144], [256, 272, 384, 400]]
+    assert slice_runs == [[(0, 16, 2), (128, 16, 2)], [(256, 16, 2), (384, 16, 2)]]
+    # [[0, 32, 256, 288], [512, 544, 768, 800]]
+    assert global_runs == [[(0, 32, 2), (256, 32, 2)], [(512, 32, 2), (768, 32, 2)]]
+
+
+def test_runs_expand_to_loop_output():
+    """Test that expanded runs reproduce the per-tile output over a parameter sweep."""
+    for (worker_id, num_workers, direction, chunk_idx, tile_granularity,
+         chunk_width_in_tiles, mm_block_unit_ht) in itertools.product(
+            range(3), [1, 2, 3], [0, 1], [0, 1], [1, 3, 7, 100], [2, 6, 16], [1, 2, 4]):
+        N_block_wt = 16
+        if worker_id >= num_workers or chunk_idx * chunk_width_in_tiles >= N_block_wt:
+            continue
+        slice_Wt = 32
+        kwargs = dict(
+            worker_id=worker_id,
+            start_tile_row_in_mm_M_block=0,
+            start_chunk_col_in_tiles=0,
+            start_mm_core_idx=0,
+            last_mm_core_idx=2,
+            tile_granularity=tile_granularity,
+            chunk_idx=chunk_idx,
+            direction=direction,
+            num_workers=num_workers,
+            mm_block_unit_ht=mm_block_unit_ht,
+            chunk_width_in_tiles=chunk_width_in_tiles,
+            N_block_wt=N_block_wt,
+            N_block_idx=1,
+            M_block_idx=1,
+            tiles_ht_per_core=2 * mm_block_unit_ht,
+            slice_Wt=slice_Wt,
+            slice_actual_idx=1,
+            global_Wt=2 * slice_Wt,
+        )
+        slice_idxs, global_idxs = read_tiles_granular_with_direction_based_on_num_workers(**kwargs)
+        slice_runs, global_runs = read_tiles_granular_with_direction_based_on_num_workers_runs(**kwargs)
+        assert [expand_runs(step) for step in slice_runs] == slice_idxs
+        assert [expand_runs(step) for step in global_runs] == global_idxs
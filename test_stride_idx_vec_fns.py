@@ -0,0 +1,146 @@
+import itertools
+
+import pytest
+
+from config import GridConfig
+from stride_idx_fns import (
+    get_kth_tile_with_direction_based_on_num_workers,
+    read_tiles_granular_with_direction,
+    read_tiles_granular_with_direction_based_on_num_workers,
+)
+from stride_idx_vec_fns import (
+    read_tiles_granular_with_direction_arrays,
+    read_tiles_granular_with_direction_based_on_num_workers_arrays,
+    read_tiles_granular_with_direction_based_on_num_workers_vec,
+    split_by_step_offsets,
+)
+
+
+def _explicit_params(mm_block_unit_wt, mm_blocks_per_N_block, chunk_width_in_mm_units,
+                     mm_block_unit_ht, mm_M_unit_blocks_per_core, mm_N_blocks_per_slice,
+                     ring_size, N_block_idx, M_block_idx, slice_actual_idx):
+    N_block_wt = mm_block_unit_wt * mm_blocks_per_N_block
+    slice_Wt = N_block_wt * mm_N_blocks_per_slice
+    return dict(
+        mm_block_unit_ht=mm_block_unit_ht,
+        chunk_width_in_tiles=chunk_width_in_mm_units * mm_block_unit_wt,
+        N_block_wt=N_block_wt,
+        N_block_idx=N_block_idx,
+        M_block_idx=M_block_idx,
+        tiles_ht_per_core=mm_block_unit_ht * mm_M_unit_blocks_per_core,
+        slice_Wt=slice_Wt,
+        slice_actual_idx=slice_actual_idx,
+        global_Wt=slice_Wt * ring_size,
+    )
+
+
+def test_vec_matches_golden_num_workers_3():
+    """Test the vectorized engine against the golden values of test_direction_based_on_num_workers_3."""
+    slice_idxs, global_idxs = read_tiles_granular_with_direction_based_on_num_workers_vec(
+        worker_id=1,
+        start_tile_row_in_mm_M_block=0,
+        start_chunk_col_in_tiles=0,
+        start_mm_core_idx=0,
+        last_mm_core_idx=3,
+        tile_granularity=4,
+        chunk_idx=0,
+        direction=1,
+        num_workers=3,
+        **_explicit_params(4, 2, 2, 4, 2, 2, 2, 0, 0, 0),
+    )
+
+    expected_slice_idxs = [[4, 18, 32, 38], [52, 130, 144, 150], [164, 178, 256, 262], [276, 290, 304, 310], [388, 402, 416, 422], [436]]
+    expected_global_idxs = [[4, 34, 64, 70], [100, 258, 288, 294], [324, 354, 512, 518], [548, 578, 608, 614], [772, 802, 832, 838], [868]]
+
+    assert slice_idxs == expected_slice_idxs, "slice_idxs mismatch"
+    assert global_idxs == expected_global_idxs, "global_idxs mismatch"
+
+
+def test_vec_matches_loop_sweep():
+    """Test the vectorized engine against the loop implementation over a parameter sweep."""
+    shapes = [
+        (2, 4, 2, 2, 4, 2, 2, 0, 0, 0),
+        (2, 4, 3, 2, 4, 2, 2, 1, 2, 1),
+        (4, 2, 2, 4, 2, 2, 2, 0, 1, 0),
+        (2, 1, 1, 2, 1, 1, 8, 0, 0, 5),
+        (3, 5, 2, 3, 2, 3, 4, 2, 1, 3),
+    ]
+    for shape in shapes:
+        explicit = _explicit_params(*shape)
+        chunks = -(-explicit["N_block_wt"] // explicit["chunk_width_in_tiles"])
+        for (worker_id, num_workers, direction, chunk_idx,
+             tile_granularity, start_core, last_core) in itertools.product(
+                range(3), [1, 2, 3], [0, 1], range(chunks), [1, 3, 8], [0, 1], [1, 3]):
+            if worker_id >= num_workers:
+                continue
+            kwargs = dict(
+                worker_id=worker_id,
+                start_tile_row_in_mm_M_block=0,
+                start_chunk_col_in_tiles=0,
+                start_mm_core_idx=start_core,
+                last_mm_core_idx=last_core,
+                tile_granularity=tile_granularity,
+                chunk_idx=chunk_idx,
+                direction=direction,
+                num_workers=num_workers,
+                **explicit,
+            )
+            expected = read_tiles_granular_with_direction_based_on_num_workers(**kwargs)
+            assert read_tiles_granular_with_direction_based_on_num_workers_vec(**kwargs) == expected
+
+            slice_idxs, global_idxs, step_offsets = (
+                read_tiles_granular_with_direction_based_on_num_workers_arrays(**kwargs)
+            )
+            assert slice_idxs.tolist() == [i for step in expected[0] for i in step]
+            assert global_idxs.tolist() == [i for step in expected[1] for i in step]
+            assert len(step_offsets) == len(expected[0]) + 1
+
+
+def test_kth_tile_matches_loop():
+    """Test get_kth_tile_with_direction_based_on_num_workers against every tile of the loop output."""
+    explicit = _explicit_params(4, 2, 2, 4, 2, 2, 2, 1, 1, 1)
+    for worker_id, direction in itertools.product(range(3), [0, 1]):
+        kwargs = dict(
+            worker_id=worker_id,
+            start_tile_row_in_mm_M_block=0,
+            start_chunk_col_in_tiles=0,
+            start_mm_core_idx=0,
+            last_mm_core_idx=3,
+            tile_granularity=4,
+            chunk_idx=0,
+            direction=direction,
+            num_workers=3,
+            **explicit,
+        )
+        slice_idxs, global_idxs = read_tiles_granular_with_direction_based_on_num_workers(**kwargs)
+        k = 0
+        for step_idx, (step_slice_idxs, step_global_idxs) in enumerate(zip(slice_idxs, global_idxs)):
+            for slice_tile_idx, global_tile_idx in zip(step_slice_idxs, step_global_idxs):
+                assert get_kth_tile_with_direction_based_on_num_workers(k, **kwargs) == (
+                    slice_tile_idx, global_tile_idx, step_idx
+                )
+                k += 1
+        with pytest.raises(ValueError):
+            get_kth_tile_with_direction_based_on_num_workers(k, **kwargs)
+
+
+def test_with_direction_arrays_match_loop():
+    """Test the vectorized read_tiles_granular_with_direction and its forward/backward split."""
+    cfg_snapshot = GridConfig(
+        mm_block_unit_wt=3, chunk_width_in_mm_units=2, mm_block_unit_ht=3,
+        N_block_idx=1, M_block_idx=1, slice_actual_idx=1
+    ).snapshot()
+    for chunk_idx, advance_by_tiles, tile_granularity in itertools.product([0, 1], [1, 2, 5], [1, 3]):
+        for worker_id in range(advance_by_tiles):
+            args = (worker_id, 0, 1, 0, advance_by_tiles, 2, tile_granularity, chunk_idx)
+            forward = read_tiles_granular_with_direction(*args, 0, cfg_snapshot=cfg_snapshot)
+            backward = read_tiles_granular_with_direction(*args, 1, cfg_snapshot=cfg_snapshot)
+            num_forward = sum(len(step) for step in forward[0])
+            num_backward = sum(len(step) for step in backward[0])
+            assert num_backward <= num_forward <= num_backward + 1
+            for direction, expected in [(0, forward), (1, backward)]:
+                slice_idxs, global_idxs, step_offsets = read_tiles_granular_with_direction_arrays(
+                    *args, direction, cfg_snapshot=cfg_snapshot
+                )
+                assert (split_by_step_offsets(slice_idxs, step_offsets),
+                        split_by_step_offsets(global_idxs, step_offsets)) == expected
@@ -0,0 +1,42 @@
+import random
+
+import numpy as np
+
+from stride_fns import get_next_tile_coordinates_flat, get_next_tile_coordinates_optimized
+from stride_idx_fns import get_effective_chunk_width_in_tiles
+from stride_vec_fns import get_effective_chunk_width_in_tiles_many, get_next_tile_coordinates_many
+
+
+def test_advance_many_matches_scalar_variants():
+    """Test batched advances with mixed tail and full chunk widths against the scalar versions."""
+    rng = random.Random(0)
+    mm_block_unit_ht = 3
+    chunk_width_in_tiles = 5
+    N_block_wt = 12
+    chunk_idx = np.array([rng.randrange(3) for _ in range(500)])
+    widths = get_effective_chunk_width_in_tiles_many(chunk_idx, chunk_width_in_tiles, N_block_wt)
+    assert widths.tolist() == [
+        get_effective_chunk_width_in_tiles(c, chunk_width_in_tiles, N_block_wt) for c in chunk_idx
+    ]
+
+    rows = np.array([rng.randrange(mm_block_unit_ht) for _ in widths])
+    cols = np.array([rng.randrange(w) for w in widths])
+    cores = np.array([rng.randrange(4) for _ in widths])
+    advances = np.array([rng.randrange(100) for _ in widths])
+    new_rows, new_cols, new_cores = get_next_tile_coordinates_many(
+        rows, cols, cores, advances, widths, mm_block_unit_ht
+    )
+    for i in range(len(widths)):
+        w = int(widths[i])
+        args = (int(rows[i]), int(cols[i]), int(cores[i]), int(advances[i]))
+        expected = get_next_tile_coordinates_flat(*args, w, mm_block_unit_ht)
+        assert (new_rows[i], new_cols[i], new_cores[i]) == expected
+        assert expected == get_next_tile_coordinates_optimized(*args, mm_block_unit_ht * w, w, mm_block_unit_ht)
+
+
+def test_advance_many_broadcasts_scalars():
+    """Test that one state can be advanced by many amounts."""
+    rows, cols, cores = get_next_tile_coordinates_many(0, 1, 0, np.arange(6), 2, 2)
+    assert list(zip(rows.tolist(), cols.tolist(), cores.tolist())) == [
+        get_next_tile_coordinates_flat(0, 1, 0, a, 2, 2) for a in range(6)
+    ]
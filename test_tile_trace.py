@@ -0,0 +1,83 @@
+import json
+
+import tile_trace
+from loop_simulation import get_iteration_history
+from stride_idx_fns import read_tiles_granular_with_direction_based_on_num_workers
+from stride_idx_vec_fns import read_tiles_granular_with_direction_based_on_num_workers_vec
+
+
+READ_KWARGS = dict(
+    worker_id=1,
+    start_tile_row_in_mm_M_block=0,
+    start_chunk_col_in_tiles=0,
+    start_mm_core_idx=0,
+    last_mm_core_idx=3,
+    tile_granularity=4,
+    chunk_idx=0,
+    direction=1,
+    num_workers=3,
+    mm_block_unit_ht=4,
+    chunk_width_in_tiles=8,
+    N_block_wt=8,
+    N_block_idx=0,
+    M_block_idx=0,
+    tiles_ht_per_core=8,
+    slice_Wt=16,
+    slice_actual_idx=0,
+    global_Wt=32,
+)
+
+
+def test_no_output_without_sinks(capsys):
+    """Test that the generators are silent when no sink is attached."""
+    read_tiles_granular_with_direction_based_on_num_workers(**READ_KWARGS)
+    assert capsys.readouterr().out == ""
+
+
+def test_loop_and_vec_emit_same_events():
+    """Test that the loop generator and the vectorized engine emit identical events."""
+    loop_events = []
+    vec_events = []
+    with tile_trace.tracing(loop_events.append):
+        read_tiles_granular_with_direction_based_on_num_workers(**READ_KWARGS)
+    with tile_trace.tracing(vec_events.append):
+        read_tiles_granular_with_direction_based_on_num_workers_vec(**READ_KWARGS)
+    assert loop_events == vec_events
+    assert loop_events[0] == tile_trace.StepStarted(21, 4)
+    assert loop_events[1] == tile_trace.TileEmitted(4, 4)
+    assert tile_trace.sinks == []
+
+
+def test_counter_and_json_lines_sinks(tmp_path):
+    """Test the counter and JSON-lines sinks on a get_iteration_history run."""
+    path = tmp_path / "trace.jsonl"
+    counter = tile_trace.CounterSink()
+    with tile_trace.JsonLinesSink(str(path)) as json_sink:
+        with tile_trace.tracing(counter, json_sink):
+            get_iteration_history(
+                batch_size=1,
+                M_blocks_per_core=1,
+                chunks_per_mm_N_block=1,
+                my_chip_id=7,
+                direction=1,
+                ring_size=8,
+                mm_N_blocks_per_slice=1,
+                worker_id=0,
+                last_mm_core_idx=0,
+                tile_granularity=8,
+                num_workers=2,
+                mm_block_unit_ht=2,
+                chunk_width=2,
+                N_block_wt=4,
+                tiles_ht_per_core=2,
+                slice_Wt=4,
+            )
+
+    assert counter.counts["RingIterationStarted"] == 8
+    assert counter.counts["RingIterationDone"] == 8
+    assert counter.counts["StepStarted"] == 8
+    assert counter.counts["TileEmitted"] == 16
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == sum(counter.counts.values())
+    assert records[0] == {"event": "LoopLevelStarted", "level": "batch", "index": 0}
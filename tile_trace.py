@@ -0,0 +1,164 @@
+import json
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+
+# Registered sinks. Call sites check this list before building an event, so
+# tracing costs a single truthiness check when no sink is attached.
+# Mutated in place only, so callers may bind it to a local once per call.
+sinks = []
+
+
+@dataclass(frozen=True)
+class StepStarted:
+    """A granularity step (one outer while iteration) starts."""
+    tiles_to_read: int
+    tiles_in_step: int
+
+
+@dataclass(frozen=True)
+class TileEmitted:
+    """A tile index pair is produced by a generator."""
+    slice_tile_idx: int
+    global_tile_idx: int
+
+
+@dataclass(frozen=True)
+class TileCoordinatesRead:
+    """A tile is read at chunk coordinates (stride_fns.read_tiles_granular)."""
+    i: int
+    tile_row_in_mm_M_block: int
+    chunk_col_in_tiles: int
+    mm_core_idx: int
+
+
+@dataclass(frozen=True)
+class LoopLevelStarted:
+    """A level of get_iteration_history (batch, m_block_iter, chunk_idx, chunk_piece_idx) starts."""
+    level: str
+    index: int
+
+
+@dataclass(frozen=True)
+class LoopLevelDone:
+    """A level of get_iteration_history finishes."""
+    level: str
+    index: int
+
+
+@dataclass(frozen=True)
+class RingIterationStarted:
+    """A ring iteration of get_iteration_history starts."""
+    ring_iteration: int
+    slice_idx: int
+    direction: int
+    actual_slice_idx: int
+    m_block_iter: int
+    chunk_idx: int
+
+
+@dataclass(frozen=True)
+class RingIterationDone:
+    """A ring iteration of get_iteration_history finishes."""
+    ring_iteration: int
+
+
+def add_sink(sink) -> None:
+    """Register a sink. A sink is any callable taking one event."""
+    sinks.append(sink)
+
+
+def remove_sink(sink) -> None:
+    """Unregister a previously added sink."""
+    sinks.remove(sink)
+
+
+def emit(event) -> None:
+    """Send an event to every registered sink."""
+    for sink in sinks:
+        sink(event)
+
+
+@contextmanager
+def tracing(*new_sinks):
+    """Attach sinks for the duration of a with block."""
+    for sink in new_sinks:
+        add_sink(sink)
+    try:
+        yield new_sinks[0] if len(new_sinks) == 1 else new_sinks
+    finally:
+        for sink in new_sinks:
+            remove_sink(sink)
+
+
+def format_event(event) -> str:
+    """Format an event the way the generators used to print it."""
+    if isinstance(event, StepStarted):
+        return f"--------------------------------\ntiles_to_read: {event.tiles_to_read}"
+    if isinstance(event, TileEmitted):
+        return f"slice_tile_idx: {event.slice_tile_idx}, global_tile_idx: {event.global_tile_idx}"
+    if isinstance(event, TileCoordinatesRead):
+        return (
+            f"i: {event.i}, "
+            f"tile_row_in_mm_M_block: {event.tile_row_in_mm_M_block}, "
+            f"chunk_col_in_tiles: {event.chunk_col_in_tiles}, "
+            f"mm_core_idx: {event.mm_core_idx}"
+        )
+    if isinstance(event, LoopLevelStarted):
+        return f"{event.level}: {event.index} started"
+    if isinstance(event, LoopLevelDone):
+        return f"{event.level}: {event.index} done"
+    if isinstance(event, RingIterationStarted):
+        return (
+            f"ring iteration: {event.ring_iteration} started\n"
+            f"slice_idx: {event.slice_idx}\n"
+            f"direction: {event.direction}\n"
+            f"actual_slice_idx: {event.actual_slice_idx}, "
+            f"m_block_iter: {event.m_block_iter}, chunk_idx: {event.chunk_idx}"
+        )
+    if isinstance(event, RingIterationDone):
+        return f"ring iteration: {event.ring_iteration} done"
+    return repr(event)
+
+
+class TextSink:
+    """Write events as text lines to a stream (stdout by default)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def __call__(self, event) -> None:
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write(format_event(event) + "\n")
+
+
+class CounterSink:
+    """Count events by type name."""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def __call__(self, event) -> None:
+        self.counts[type(event).__name__] += 1
+
+
+class JsonLinesSink:
+    """Write one JSON object per event to a file."""
+
+    def __init__(self, path: str):
+        self.file = open(path, "w")
+
+    def __call__(self, event) -> None:
+        record = {"event": type(event).__name__, **asdict(event)}
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()